@@ -0,0 +1,260 @@
+"""Contains the batch engine for running many tic-tac-toe games at once with NumPy.
+	- BatchTicTacToe: holds N games as arrays of bitboards and advances all of them with one call.
+	- bestMoves: picks the perfect-play bot's move for an array of 3x3 positions in one call.
+"""
+
+from typing import Optional, Union
+
+import numpy as np
+
+from TicTacSolver import PerfectPlayTable
+from TicTacToe import TicTacBitboard
+
+# Move value for positions without a move (finished games, or games that should not be played this call)
+NO_MOVE = -1
+# Number of best moves in every 9-bit best-move mask of the PerfectPlayTable
+MASK_COUNTS = np.array([bin(mask).count("1") for mask in range(0, 512)], dtype=np.int64)
+# The spaces set in every 9-bit mask, in order, padded with NO_MOVE
+MASK_SPACES = np.array(
+	[
+		[space for space in range(0, 9) if mask >> space & 1] + [NO_MOVE] * (9 - bin(mask).count("1"))
+		for mask in range(0, 512)
+	],
+	dtype=np.int64
+)
+# Base-3 weight of each space in a PerfectPlayTable position index
+SPACE_WEIGHTS = 3 ** np.arange(0, 9, dtype=np.int64)
+# Base-3 value of every 9-bit stone pattern, as in TicTacBitboard.TERNARY_VALUES
+TERNARY_VALUES = np.array(TicTacBitboard.TERNARY_VALUES, dtype=np.int64)
+
+# The PerfectPlayTable entries viewed as a NumPy array, built on first use
+_table_entries = None
+
+
+def tableEntries() -> np.ndarray:
+	"""Views the shared PerfectPlayTable's entries as a NumPy array, without copying them.
+
+	:return: the uint16 array of 2 * 3 ** 9 entries, player 0 to move first, then player 1 to move.
+	"""
+
+	global _table_entries
+	if _table_entries is None:
+		_table_entries = np.frombuffer(PerfectPlayTable.shared().entries, dtype=np.uint16)
+
+	return _table_entries
+
+
+def pickBestMoves(indexes: np.ndarray, sides: np.ndarray, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+	"""Looks up the best moves of many positions in the PerfectPlayTable and picks one for each.
+
+	:param indexes: an array of base-3 position indexes (see TicTacToe.positionIndex).
+	:param sides: an array of 0 where player 0 is to move and 1 where player 1 is to move.
+	:param rng: the NumPy random generator used to pick among equally good moves, as botMove does;
+		if None, the lowest best space is always picked.
+	:return: an array of space indexes (row * 3 + col), NO_MOVE where the game is over.
+	"""
+
+	masks = tableEntries()[sides.astype(np.int64) * PerfectPlayTable.NUM_POSITIONS + indexes] & 0x1FF
+	if rng is None:
+		return MASK_SPACES[masks, 0]
+
+	picks = (rng.random(len(masks)) * MASK_COUNTS[masks]).astype(np.int64)
+
+	return MASK_SPACES[masks, np.minimum(picks, 8)]
+
+
+def bestMoves(
+	boards: np.ndarray, players: Union[int, np.ndarray], rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+	"""Picks the perfect-play bot's move (see TicTacToe.botMove) for many 3x3 positions with one table lookup,
+	rather than a Python call per position.
+
+	:param boards: an (N, 3, 3) or (N, 9) array of BLANK_POS, PLAYER_0 and PLAYER_1 values, in the TicTacToe format.
+	:param players: the player to move (PLAYER_0 or PLAYER_1) in every position, or an array of one per position.
+	:param rng: the NumPy random generator used to pick among equally good moves;
+		if None, the lowest best space is always picked.
+	:return: an array of N space indexes (row * 3 + col), NO_MOVE for positions where the game is over.
+	"""
+
+	boards = np.asarray(boards)
+	if boards.ndim < 2 or boards.shape[1:] not in ((3, 3), (9,)):
+		raise ValueError(f"Expected an (N, 3, 3) or (N, 9) array of boards, got an array of shape {boards.shape}")
+	boards = boards.reshape(len(boards), 9)
+	player_0 = boards == BatchTicTacToe.PLAYER_0
+	player_1 = boards == BatchTicTacToe.PLAYER_1
+	if not np.all(player_0 | player_1 | (boards == BatchTicTacToe.BLANK_POS)):
+		raise ValueError("Boards can only hold BLANK_POS, PLAYER_0 and PLAYER_1 values")
+
+	players = np.broadcast_to(np.asarray(players), (len(boards),))
+	if not np.all((players == BatchTicTacToe.PLAYER_0) | (players == BatchTicTacToe.PLAYER_1)):
+		raise ValueError("The players to move must be PLAYER_0 or PLAYER_1")
+
+	indexes = (player_0 * SPACE_WEIGHTS).sum(axis=1) + 2 * (player_1 * SPACE_WEIGHTS).sum(axis=1)
+
+	return pickBestMoves(indexes, players == BatchTicTacToe.PLAYER_1, rng)
+
+
+##########################################################################################
+
+class BatchTicTacToe:
+	"""Runs N tic-tac-toe games side by side, storing each player's stones as an array of 9-bit bitboards
+	(in the same layout as TicTacBitboard, bit (row * 3 + col) for each space).
+
+	Every game starts with player 0 to move and the players alternate.  The game states use the same
+	codes as TicTacToe (GAME_IN_PROGRESS, PLAYER_0_WINNER, PLAYER_1_WINNER and DRAW_GAME).
+
+	Included methods:
+		- __init__(self, num_games)
+		- boards - property returning the games as an (N, 3, 3) array of player values, in the TicTacToe format
+		- resetGames(self, games=None) - resets all games, or only the selected ones
+		- legalMoves(self) - returns an (N, 9) boolean array of the open spaces in each game
+		- applyMoves(self, moves) - plays one move in every game and returns the game states
+		- randomMoves(self, rng) - picks a random open space for every game still in progress
+		- botMoves(self, rng=None) - picks the perfect-play bot's move for every game still in progress
+	"""
+
+	# Player values and game states, matching TicTacToe
+	BLANK_POS = 0x0
+	PLAYER_0 = -0x1
+	PLAYER_1 = 0x1
+	GAME_IN_PROGRESS = 0x10
+	PLAYER_0_WINNER = 0x20
+	PLAYER_1_WINNER = 0x30
+	DRAW_GAME = 0x40
+
+	# Move value for games that should not be played this call
+	NO_MOVE = NO_MOVE
+
+	FULL_BOARD = TicTacBitboard.FULL_BOARD
+	# True for every 9-bit stone pattern that contains a full line
+	WINNING_PATTERNS = np.array(TicTacBitboard.WINNING_PATTERNS, dtype=bool)
+	# Number of open spaces, and the open spaces in order (padded to 9), for every 9-bit pattern of taken spaces
+	OPEN_COUNTS = np.array([9 - bin(taken).count("1") for taken in range(0, 512)], dtype=np.int64)
+	OPEN_SPACES = np.array(
+		[
+			[space for space in range(0, 9) if not taken >> space & 1] + [0] * bin(taken).count("1")
+			for taken in range(0, 512)
+		],
+		dtype=np.int64
+	)
+
+	def __init__(self, num_games: int) -> None:
+		"""Initializes num_games empty games.
+
+		:param num_games: the number of games (N) to run side by side.
+		"""
+
+		self.num_games = num_games
+		# player_bits[0] is player 0's bitboard for every game, player_bits[1] is player 1's
+		self.player_bits = np.zeros((2, num_games), dtype=np.uint16)
+		# 0 when player 0 is to move, 1 when player 1 is to move
+		self.to_move = np.zeros(num_games, dtype=np.uint8)
+		self.game_state = np.full(num_games, self.GAME_IN_PROGRESS, dtype=np.uint8)
+
+	@property
+	def boards(self) -> np.ndarray:
+		"""Builds the games in the TicTacToe board format.
+
+		:return: an (N, 3, 3) int8 array of BLANK_POS, PLAYER_0 and PLAYER_1 values.
+		"""
+
+		shifts = np.arange(0, 9, dtype=np.uint16)
+		player_0 = (self.player_bits[0][:, None] >> shifts) & 1
+		player_1 = (self.player_bits[1][:, None] >> shifts) & 1
+		boards = player_0.astype(np.int8) * self.PLAYER_0 + player_1.astype(np.int8) * self.PLAYER_1
+
+		return boards.reshape(self.num_games, 3, 3)
+
+	def resetGames(self, games: Optional[np.ndarray] = None) -> None:
+		"""Resets all games, or only the selected ones, to an empty board with player 0 to move.
+		Makes no return.
+
+		:param games: an optional boolean mask or index array of the games to reset.
+		"""
+
+		if games is None:
+			games = slice(None)
+
+		self.player_bits[:, games] = 0
+		self.to_move[games] = 0
+		self.game_state[games] = self.GAME_IN_PROGRESS
+
+	def legalMoves(self) -> np.ndarray:
+		"""Finds the open spaces of every game; finished games have none.
+
+		:return: an (N, 9) boolean array, True where space (row * 3 + col) is a legal move.
+		"""
+
+		open_bits = ~(self.player_bits[0] | self.player_bits[1]) & self.FULL_BOARD
+		open_bits[self.game_state != self.GAME_IN_PROGRESS] = 0
+
+		return ((open_bits[:, None] >> np.arange(0, 9, dtype=np.uint16)) & 1).astype(bool)
+
+	def applyMoves(self, moves: np.ndarray) -> np.ndarray:
+		"""Plays one move for the player to move in every game, then checks the moved games for wins and draws.
+
+		:param moves: an array of N space indexes (row * 3 + col), or NO_MOVE to skip a game.
+			Finished games must be given NO_MOVE.
+		:return: the array of N game states after the moves.
+		"""
+
+		moves = np.asarray(moves, dtype=np.int64)
+		if moves.shape != (self.num_games,):
+			raise ValueError(f"Expected {self.num_games} moves, got an array of shape {moves.shape}")
+
+		playing = moves != self.NO_MOVE
+		games = np.flatnonzero(playing)
+		spaces = moves[games]
+		if np.any((spaces < 0) | (spaces > 8)):
+			raise ValueError("Moves must be space indexes from 0 to 8, or NO_MOVE")
+		if np.any(self.game_state[games] != self.GAME_IN_PROGRESS):
+			raise ValueError("Tried to move in a game that is already over")
+
+		bits = (np.uint16(1) << spaces.astype(np.uint16))
+		taken = self.player_bits[0, games] | self.player_bits[1, games]
+		if np.any(taken & bits):
+			raise ValueError("Tried to move on a space that is already taken")
+
+		sides = self.to_move[games]
+		mover_bits = self.player_bits[sides, games] | bits
+		self.player_bits[sides, games] = mover_bits
+
+		won = self.WINNING_PATTERNS[mover_bits]
+		full = (taken | bits) == self.FULL_BOARD
+		self.game_state[games] = np.where(
+			won,
+			np.where(sides == 0, self.PLAYER_0_WINNER, self.PLAYER_1_WINNER),
+			np.where(full, self.DRAW_GAME, self.GAME_IN_PROGRESS)
+		)
+		self.to_move[games] = 1 - sides
+
+		return self.game_state
+
+	def randomMoves(self, rng: np.random.Generator) -> np.ndarray:
+		"""Picks a uniformly random open space for every game still in progress.
+
+		:param rng: the NumPy random generator to draw from.
+		:return: an array of N space indexes, with NO_MOVE for finished games.
+		"""
+
+		taken = self.player_bits[0] | self.player_bits[1]
+		counts = self.OPEN_COUNTS[taken]
+		picks = (rng.random(self.num_games) * counts).astype(np.int64)
+		moves = self.OPEN_SPACES[taken, np.minimum(picks, 8)]
+		moves[self.game_state != self.GAME_IN_PROGRESS] = self.NO_MOVE
+
+		return moves
+
+	def botMoves(self, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+		"""Picks the perfect-play bot's move for every game still in progress, with one PerfectPlayTable lookup.
+
+		:param rng: the NumPy random generator used to pick among equally good moves;
+			if None, the lowest best space is always picked.
+		:return: an array of N space indexes, with NO_MOVE for finished games.
+		"""
+
+		indexes = TERNARY_VALUES[self.player_bits[0]] + 2 * TERNARY_VALUES[self.player_bits[1]]
+		moves = pickBestMoves(indexes, self.to_move, rng)
+		moves[self.game_state != self.GAME_IN_PROGRESS] = self.NO_MOVE
+
+		return moves
@@ -0,0 +1,457 @@
+"""Self-play benchmark suite for the tic-tac-toe engine.
+
+Plays headless games between the bot and a random player, and reports games/sec,
+botMove latency percentiles and updateBoard cost.  Results can be saved as JSON and
+compared against a saved baseline, failing (exit code 1) when a regression threshold is crossed.
+
+Usage:
+	python TicTacBench.py [--games N] [--engine list|bitboard] [--output results.json]
+		[--baseline baseline.json] [--threshold 0.25]
+	python TicTacBench.py --memory 10000
+	python TicTacBench.py --replay sessions.jsonl [--update-replay]
+	python TicTacBench.py --startup [--startup-runs 10]
+"""
+
+import argparse
+import io
+import json
+import platform
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import TicTacToe
+
+# Engines that can be benchmarked, by name
+ENGINES = {
+	"list": TicTacToe.TicTacToe,
+	"bitboard": TicTacToe.TicTacBitboard
+}
+
+
+class BaselineGame:
+	"""A copy of the state TicTacToe games held before games were made compact, measured by measureMemory as the
+	"baseline" engine so the saving can be reproduced: the player values and game states stored on every instance
+	in a __dict__, the 3x3 board as a list of lists, the game state and the move history as a list of (row, col).
+	It only places stones (without looking for wins, which allocated nothing), which is all measureMemory needs.
+
+	Included methods:
+		- __init__(self)
+		- legalMoves(self) - lists every open space
+		- updateBoard(self, row, col, player_value) - places a stone and records the move
+	"""
+
+	def __init__(self) -> None:
+		"""Sets the attributes the original TicTacToe.__init__ set, with the same values."""
+
+		# Player values
+		self.BLANK_POS = 0x0
+		self.PLAYER_0 = -0x1
+		self.PLAYER_1 = 0x1
+		# Game States
+		self.GAME_IN_PROGRESS = 0x10
+		self.PLAYER_0_WINNER = 0x20
+		self.PLAYER_1_WINNER = 0x30
+		self.DRAW_GAME = 0x40
+
+		self.board = [
+			[self.BLANK_POS, self.BLANK_POS, self.BLANK_POS],
+			[self.BLANK_POS, self.BLANK_POS, self.BLANK_POS],
+			[self.BLANK_POS, self.BLANK_POS, self.BLANK_POS]
+		]
+		self.game_state = self.GAME_IN_PROGRESS
+		self.move_history = []
+
+	def legalMoves(self) -> List[Tuple[int, int]]:
+		"""Lists every open space, in row order.
+
+		:return: a list of (row, col) for each open space.
+		"""
+
+		return [(row, col) for row in range(0, 3) for col in range(0, 3) if self.board[row][col] == self.BLANK_POS]
+
+	def updateBoard(self, row: int, col: int, player_value: int) -> None:
+		"""Places a stone and records the move.
+		Makes no return.
+
+		:param row: the row of the space.
+		:param col: the column of the space.
+		:param player_value: the player placing the stone.
+		"""
+
+		self.board[row][col] = player_value
+		self.move_history.append((row, col))
+
+
+# Engines whose memory can be measured: the ENGINES, and the BaselineGame they are compared against
+MEMORY_ENGINES = {
+	**ENGINES,
+	"baseline": BaselineGame
+}
+
+# Scenarios, as the (player 0, player 1) move kinds
+SCENARIOS = {
+	"bot-vs-bot": ("bot", "bot"),
+	"bot-vs-random": ("bot", "random"),
+	"random-vs-random": ("random", "random")
+}
+
+# Metrics compared against a baseline, and whether a higher value is better
+COMPARED_METRICS = {
+	"games_per_sec": True,
+	"bot_move_p50_us": False,
+	"bot_move_p99_us": False,
+	"update_board_mean_us": False
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+	"""Returns the nearest-rank percentile of an already sorted list.
+
+	:param sorted_values: the values, sorted in ascending order.
+	:param fraction: the percentile as a fraction, ex 0.99 for p99.
+	:return: the percentile value, or None if there are no values.
+	"""
+
+	if not sorted_values:
+		return None
+
+	rank = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+	return sorted_values[rank]
+
+
+def randomMove(game: TicTacToe.TicTacToe, rng: random.Random) -> Tuple[int, int]:
+	"""Picks a random open space.
+
+	:param game: the game to move in.
+	:param rng: the random generator to pick with.
+	:return: (row, col) of the chosen space.
+	"""
+
+	return rng.choice(game.legalMoves())
+
+
+def runScenario(
+	scenario: str, num_games: int, engine: str = "list", seed: int = 0, instrument: bool = False
+) -> Dict[str, object]:
+	"""Plays num_games games of one scenario and measures them.
+
+	:param scenario: a key of SCENARIOS.
+	:param num_games: the number of games to play.
+	:param engine: a key of ENGINES.
+	:param seed: the seed for the game's random generator, so runs play the same games.
+	:param instrument: also collect the game's instrumentation (timings and bot branch counters).
+	:return: a dict of results, including the COMPARED_METRICS and the game outcomes,
+		and the "instrumentation" snapshot if instrument is set.
+	"""
+
+	game = ENGINES[engine](rng=random.Random(seed))
+	stats = game.enableInstrumentation() if instrument else None
+	bot_move_ns = []
+	update_board_ns = []
+	outcomes = {"player_0_wins": 0, "player_1_wins": 0, "draws": 0}
+
+	move_kinds = SCENARIOS[scenario]
+	perf_counter_ns = time.perf_counter_ns
+	start = perf_counter_ns()
+	for _ in range(0, num_games):
+		game.resetGame()
+		player = game.PLAYER_0
+		while game.game_state == game.GAME_IN_PROGRESS:
+			if move_kinds[0 if player == game.PLAYER_0 else 1] == "bot":
+				move_start = perf_counter_ns()
+				row, col = game.botMove(player)
+				bot_move_ns.append(perf_counter_ns() - move_start)
+			else:
+				row, col = randomMove(game, game.rng)
+
+			update_start = perf_counter_ns()
+			game.updateBoard(row, col, player)
+			update_board_ns.append(perf_counter_ns() - update_start)
+			player = game.PLAYER_1 if player == game.PLAYER_0 else game.PLAYER_0
+
+		if game.game_state == game.PLAYER_0_WINNER:
+			outcomes["player_0_wins"] += 1
+		elif game.game_state == game.PLAYER_1_WINNER:
+			outcomes["player_1_wins"] += 1
+		else:
+			outcomes["draws"] += 1
+	elapsed = (perf_counter_ns() - start) / 1e9
+
+	bot_move_ns.sort()
+	update_board_ns.sort()
+
+	def toMicroseconds(nanoseconds: Optional[float]) -> Optional[float]:
+		return None if nanoseconds is None else round(nanoseconds / 1000, 3)
+
+	return {
+		"scenario": scenario,
+		"engine": engine,
+		"games": num_games,
+		"seconds": round(elapsed, 6),
+		"games_per_sec": round(num_games / elapsed, 1),
+		"bot_moves": len(bot_move_ns),
+		"bot_move_p50_us": toMicroseconds(percentile(bot_move_ns, 0.50)),
+		"bot_move_p99_us": toMicroseconds(percentile(bot_move_ns, 0.99)),
+		"update_board_mean_us": toMicroseconds(sum(update_board_ns) / len(update_board_ns)),
+		"update_board_p99_us": toMicroseconds(percentile(update_board_ns, 0.99)),
+		**outcomes,
+		**({"instrumentation": stats.snapshot()} if stats is not None else {})
+	}
+
+
+def runSuite(num_games: int, engine: str = "list", seed: int = 0, instrument: bool = False) -> Dict[str, object]:
+	"""Runs every scenario and collects the results with details of the machine they ran on.
+
+	:param num_games: the number of games to play per scenario.
+	:param engine: a key of ENGINES.
+	:param seed: the seed for the random generator of each scenario's game, so runs play the same games.
+	:param instrument: also collect the instrumentation of every scenario (see runScenario).
+	:return: a JSON-serializable dict of results.
+	"""
+
+	return {
+		"python": platform.python_version(),
+		"implementation": platform.python_implementation(),
+		"machine": platform.machine(),
+		"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+		"results": {scenario: runScenario(scenario, num_games, engine, seed, instrument) for scenario in SCENARIOS}
+	}
+
+
+def measureMemory(num_games: int, engine: str = "list", moves_per_game: int = 4, seed: int = 0) -> Dict[str, object]:
+	"""Measures the memory held by live games, as a server holding many sessions would keep them.
+
+	:param num_games: the number of games to create and keep alive.
+	:param engine: a key of MEMORY_ENGINES, ex "baseline" for the layout games had before they were made compact.
+	:param moves_per_game: the number of random moves played in each game before measuring.
+	:param seed: the seed for the random moves.
+	:return: a dict with the total and per-game bytes allocated for the games.
+	"""
+
+	rng = random.Random(seed)
+	MEMORY_ENGINES[engine]()
+	tracemalloc.start()
+	try:
+		before = tracemalloc.get_traced_memory()[0]
+		games = []
+		for _ in range(0, num_games):
+			game = MEMORY_ENGINES[engine]()
+			player = game.PLAYER_0
+			for _ in range(0, moves_per_game):
+				row, col = randomMove(game, rng)
+				game.updateBoard(row, col, player)
+				player = -player
+			games.append(game)
+		used = tracemalloc.get_traced_memory()[0] - before
+	finally:
+		tracemalloc.stop()
+
+	return {
+		"engine": engine,
+		"games": len(games),
+		"moves_per_game": moves_per_game,
+		"total_bytes": used,
+		"bytes_per_game": round(used / num_games, 1)
+	}
+
+
+def replaySession(inputs: List[str], seed: int = 0) -> Tuple[str, bool]:
+	"""Plays one scripted terminal session through TicTacTerminal.terminalGame.
+
+	:param inputs: the lines typed during the session.
+	:param seed: the seed for the game's random generator, which the bots draw from.
+	:return: the transcript of everything printed (with the typed lines echoed), and
+		whether the session finished before the script ran out of lines.
+	"""
+
+	transcript = io.StringIO()
+	game = TicTacToe.TicTacTerminal(input_source=inputs, output=transcript, rng=random.Random(seed))
+	try:
+		game.terminalGame()
+		finished = True
+	except EOFError:
+		finished = False
+
+	return transcript.getvalue(), finished
+
+
+def replaySessions(sessions: List[dict]) -> Dict[str, object]:
+	"""Replays recorded terminal sessions and checks their transcripts.
+
+	:param sessions: dicts with the "input" lines, an optional "seed", and the expected "output" transcript if recorded.
+	:return: a dict with the session count, sessions_per_sec, and the indexes of sessions whose transcript
+		differed from the recorded one ("mismatched") or whose script ran out of lines ("unfinished").
+	"""
+
+	mismatched = []
+	unfinished = []
+	start = time.perf_counter()
+	for index, session in enumerate(sessions):
+		transcript, finished = replaySession(session["input"], session.get("seed", 0))
+		if "output" in session and transcript != session["output"]:
+			mismatched.append(index)
+		if not finished:
+			unfinished.append(index)
+	elapsed = time.perf_counter() - start
+
+	return {
+		"sessions": len(sessions),
+		"seconds": round(elapsed, 6),
+		"sessions_per_sec": round(len(sessions) / elapsed, 1) if elapsed else None,
+		"mismatched": mismatched,
+		"unfinished": unfinished
+	}
+
+
+def measureStartup(runs: int = 10) -> Dict[str, float]:
+	"""Measures how long the launcher (main.py) takes to start and print its menu, in fresh interpreters.
+	For comparison, also times a fresh interpreter that only imports and builds the tic-tac-toe game,
+	which the launcher used to do at startup, and one that does nothing.
+
+	:param runs: the number of times each command is run; the fastest run is reported.
+	:return: a dict of the fastest times in milliseconds for "launcher", "eager_game_load" and "empty_interpreter".
+	"""
+
+	directory = os.path.dirname(os.path.abspath(__file__))
+	commands = {
+		"launcher": [sys.executable, "main.py", "--print-menu"],
+		"eager_game_load": [sys.executable, "-c", "import TicTacToe; TicTacToe.TicTacTerminal()"],
+		"empty_interpreter": [sys.executable, "-c", "pass"]
+	}
+
+	results = {}
+	for name, command in commands.items():
+		times = []
+		for _ in range(0, runs):
+			start = time.perf_counter()
+			subprocess.run(command, cwd=directory, check=True, stdout=subprocess.DEVNULL)
+			times.append(time.perf_counter() - start)
+		results[f"{name}_ms"] = round(min(times) * 1000, 2)
+
+	return results
+
+
+def compareResults(current: dict, baseline: dict, threshold: float) -> List[str]:
+	"""Compares a suite run with a baseline run.
+
+	:param current: the results of runSuite.
+	:param baseline: earlier results of runSuite, ex loaded from a saved JSON file.
+	:param threshold: the allowed relative change, ex 0.25 allows metrics to be 25% worse.
+	:return: a list of messages, one for each metric that regressed past the threshold.
+	"""
+
+	regressions = []
+	for scenario, results in current["results"].items():
+		baseline_results = baseline.get("results", {}).get(scenario)
+		if baseline_results is None:
+			continue
+
+		for metric, higher_is_better in COMPARED_METRICS.items():
+			new, old = results.get(metric), baseline_results.get(metric)
+			if not new or not old:
+				continue
+
+			change = (old - new) / old if higher_is_better else (new - old) / old
+			if change > threshold:
+				regressions.append(f"{scenario} {metric}: {old} -> {new} ({change:+.0%} worse)")
+
+	return regressions
+
+
+def printResults(suite: dict, output: Callable[[str], None] = print) -> None:
+	"""Prints the results of a suite run as a table.
+
+	:param suite: the results of runSuite.
+	:param output: the function used to print each line.
+	"""
+
+	def show(value: Optional[float]) -> str:
+		return "-" if value is None else f"{value:.2f}us"
+
+	output(f"{'scenario':<18}{'games/sec':>12}{'botMove p50':>14}{'botMove p99':>14}{'updateBoard':>14}")
+	for scenario, results in suite["results"].items():
+		output(
+			f"{scenario:<18}{results['games_per_sec']:>12.0f}{show(results['bot_move_p50_us']):>14}"
+			f"{show(results['bot_move_p99_us']):>14}{show(results['update_board_mean_us']):>14}"
+		)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	"""Runs the benchmark suite from the command line.
+
+	:param argv: the command line arguments, defaults to sys.argv.
+	:return: the exit code, 1 if a regression was found and 0 otherwise.
+	"""
+
+	parser = argparse.ArgumentParser(description="Self-play benchmark for the tic-tac-toe engine.")
+	parser.add_argument("--games", type=int, default=2000, help="games to play per scenario")
+	parser.add_argument("--engine", choices=sorted(ENGINES), default="list", help="board engine to benchmark")
+	parser.add_argument("--seed", type=int, default=0, help="seed for each game's random generator (default 0)")
+	parser.add_argument("--output", help="write the results to this JSON file")
+	parser.add_argument("--baseline", help="compare against the results in this JSON file")
+	parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression (default 0.25)")
+	parser.add_argument("--instrument", action="store_true", help="also report the bot branch counters")
+	parser.add_argument("--memory", type=int, metavar="GAMES", help="only measure the bytes held per live game")
+	parser.add_argument("--startup", action="store_true", help="only measure the launcher's startup time")
+	parser.add_argument("--startup-runs", type=int, default=10, help="runs of each startup command (default 10)")
+	parser.add_argument("--replay", metavar="FILE", help="only replay the terminal sessions in a JSON lines file")
+	parser.add_argument("--update-replay", action="store_true", help="record the transcripts of the replayed sessions")
+	args = parser.parse_args(argv)
+
+	if args.startup:
+		for name, milliseconds in measureStartup(args.startup_runs).items():
+			print(f"{name:<22}{milliseconds:>10.2f}")
+		return 0
+
+	if args.replay:
+		with open(args.replay) as file:
+			sessions = [json.loads(line) for line in file if line.strip()]
+		if args.update_replay:
+			for session in sessions:
+				session["output"] = replaySession(session["input"], session.get("seed", 0))[0]
+			with open(args.replay, "w") as file:
+				file.writelines(json.dumps(session) + "\n" for session in sessions)
+		replay = replaySessions(sessions)
+		print(f"Replayed {replay['sessions']} sessions at {replay['sessions_per_sec']} sessions/sec")
+		for index in replay["mismatched"]:
+			print(f"MISMATCH session {index} printed a different transcript")
+		for index in replay["unfinished"]:
+			print(f"UNFINISHED session {index} ran out of input lines")
+		return 1 if replay["mismatched"] or replay["unfinished"] else 0
+
+	if args.memory:
+		for engine in sorted(MEMORY_ENGINES):
+			memory = measureMemory(args.memory, engine, seed=args.seed)
+			print(f"{engine:<10}{memory['bytes_per_game']:>10.0f} bytes per live game ({memory['games']} games)")
+		return 0
+
+	suite = runSuite(args.games, args.engine, args.seed, args.instrument)
+	printResults(suite)
+	if args.instrument:
+		for scenario, results in suite["results"].items():
+			counters = results["instrumentation"]["counters"]
+			print(f"{scenario}: " + ", ".join(f"{name}={hits}" for name, hits in sorted(counters.items())))
+
+	if args.output:
+		with open(args.output, "w") as file:
+			json.dump(suite, file, indent=2)
+
+	if args.baseline:
+		with open(args.baseline) as file:
+			baseline = json.load(file)
+		regressions = compareResults(suite, baseline, args.threshold)
+		for regression in regressions:
+			print(f"REGRESSION {regression}")
+		if regressions:
+			return 1
+
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,218 @@
+"""Load generator for the tic-tac-toe HTTP server (TicTacServer.py).
+
+Opens many keep-alive connections that each play whole games against the server's bot with random moves,
+optionally after filling the server with idle games, and reports requests/sec and latency percentiles.
+Without --port an in-process server is started on a free local port.
+
+Usage:
+	python TicTacLoad.py [--host 127.0.0.1] [--port 8080] [--clients 50] [--games 20]
+		[--idle-sessions 10000] [--seed 0]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from TicTacBench import percentile
+from TicTacServer import TicTacServer
+
+
+class HttpClient:
+	"""A minimal HTTP/1.1 client that sends JSON requests over one kept-alive connection.
+
+	Included methods:
+		- __init__(self, reader, writer)
+		- connect(cls, host, port) - opens a connection
+		- request(self, method, path, payload=None) - sends a request and returns (status, payload)
+		- close(self) - closes the connection
+	"""
+
+	def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		"""Initializes a client around an open connection.
+
+		:param reader: the stream of the connection's incoming bytes.
+		:param writer: the stream for the connection's outgoing bytes.
+		"""
+
+		self.reader = reader
+		self.writer = writer
+
+	@classmethod
+	async def connect(cls, host: str, port: int) -> "HttpClient":
+		"""Opens a connection to the server.
+
+		:param host: the server address.
+		:param port: the server port.
+		:return: the connected client.
+		"""
+
+		return cls(*await asyncio.open_connection(host, port))
+
+	async def request(self, method: str, path: str, payload: Optional[dict] = None) -> Tuple[int, dict]:
+		"""Sends one request and waits for its response.
+
+		:param method: the HTTP method, ex "POST".
+		:param path: the request path, ex "/games".
+		:param payload: the optional JSON-serializable request body.
+		:return: the status code and the decoded response body.
+		"""
+
+		body = b"" if payload is None else json.dumps(payload).encode()
+		head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+		self.writer.write(head.encode("latin-1") + body)
+		await self.writer.drain()
+
+		response_head = (await self.reader.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+		status = int(response_head[0].split()[1])
+		length = 0
+		for line in response_head[1:]:
+			name, _, value = line.partition(":")
+			if name.strip().lower() == "content-length":
+				length = int(value)
+
+		return status, json.loads(await self.reader.readexactly(length)) if length else {}
+
+	async def close(self) -> None:
+		"""Closes the connection.
+		Makes no return.
+		"""
+
+		self.writer.close()
+		await self.writer.wait_closed()
+
+
+async def playGames(client: HttpClient, num_games: int, rng: random.Random, latencies: List[int]) -> int:
+	"""Plays whole games against the server's bot with random moves, timing every request.
+
+	:param client: the connected client to play over.
+	:param num_games: the number of games to play.
+	:param rng: the random generator used to pick moves.
+	:param latencies: the list the request latencies (in nanoseconds) are appended to.
+	:return: the number of requests that got an unexpected status code.
+	"""
+
+	errors = 0
+	perf_counter_ns = time.perf_counter_ns
+
+	async def timedRequest(method: str, path: str, payload: Optional[dict], expected: int) -> dict:
+		nonlocal errors
+		start = perf_counter_ns()
+		status, response = await client.request(method, path, payload)
+		latencies.append(perf_counter_ns() - start)
+		errors += status != expected
+		return response
+
+	for _ in range(0, num_games):
+		game = await timedRequest("POST", "/games", {"bot": rng.choice(("player_0", "player_1"))}, 201)
+		while game.get("state") == "in_progress":
+			open_spaces = [
+				(row, col) for row, board_row in enumerate(game["board"]) for col, value in enumerate(board_row) if value == 0
+			]
+			row, col = rng.choice(open_spaces)
+			game = await timedRequest("POST", f"/games/{game['id']}/moves", {"row": row, "col": col}, 200)
+		if "id" in game:
+			await timedRequest("DELETE", f"/games/{game['id']}", None, 200)
+
+	return errors
+
+
+async def runLoad(
+	host: str, port: int, num_clients: int, games_per_client: int, idle_sessions: int = 0, seed: int = 0
+) -> Dict[str, object]:
+	"""Runs the load test against a running server.
+
+	:param host: the server address.
+	:param port: the server port.
+	:param num_clients: the number of concurrent connections.
+	:param games_per_client: the number of games each connection plays.
+	:param idle_sessions: the number of games to create (and leave open) before measuring.
+	:param seed: the seed for the move choices.
+	:return: a dict of results, including requests_per_sec and latency percentiles.
+	"""
+
+	setup = await HttpClient.connect(host, port)
+	for _ in range(0, idle_sessions):
+		await setup.request("POST", "/games", {"bot": None})
+
+	clients = [await HttpClient.connect(host, port) for _ in range(0, num_clients)]
+	latencies = []
+	start = time.perf_counter_ns()
+	errors = await asyncio.gather(
+		*(playGames(client, games_per_client, random.Random(seed + idx), latencies) for idx, client in enumerate(clients))
+	)
+	elapsed = (time.perf_counter_ns() - start) / 1e9
+	_, stats = await setup.request("GET", "/stats")
+
+	for client in clients + [setup]:
+		await client.close()
+
+	latencies.sort()
+
+	def toMicroseconds(nanoseconds: Optional[float]) -> Optional[float]:
+		return None if nanoseconds is None else round(nanoseconds / 1000, 1)
+
+	return {
+		"clients": num_clients,
+		"games": num_clients * games_per_client,
+		"idle_sessions": idle_sessions,
+		"hosted_sessions": stats.get("sessions"),
+		"requests": len(latencies),
+		"errors": sum(errors),
+		"seconds": round(elapsed, 6),
+		"requests_per_sec": round(len(latencies) / elapsed, 1),
+		"latency_p50_us": toMicroseconds(percentile(latencies, 0.50)),
+		"latency_p90_us": toMicroseconds(percentile(latencies, 0.90)),
+		"latency_p99_us": toMicroseconds(percentile(latencies, 0.99)),
+		"latency_max_us": toMicroseconds(latencies[-1] if latencies else None)
+	}
+
+
+async def runLoadInProcess(num_clients: int, games_per_client: int, idle_sessions: int = 0, seed: int = 0) -> dict:
+	"""Starts a server on a free local port in this process, then runs the load test against it.
+
+	:param num_clients: the number of concurrent connections.
+	:param games_per_client: the number of games each connection plays.
+	:param idle_sessions: the number of games to create (and leave open) before measuring.
+	:param seed: the seed for the move choices.
+	:return: the results of runLoad.
+	"""
+
+	server = await TicTacServer(max_sessions=max(100000, idle_sessions + num_clients)).start("127.0.0.1", 0)
+	async with server:
+		port = server.sockets[0].getsockname()[1]
+		return await runLoad("127.0.0.1", port, num_clients, games_per_client, idle_sessions, seed)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	"""Runs the load test from the command line and prints the results.
+
+	:param argv: the command line arguments, defaults to sys.argv.
+	:return: the exit code, 1 if any request failed and 0 otherwise.
+	"""
+
+	parser = argparse.ArgumentParser(description="Load generator for the tic-tac-toe HTTP server.")
+	parser.add_argument("--host", default="127.0.0.1", help="server address (default 127.0.0.1)")
+	parser.add_argument("--port", type=int, help="server port; without it an in-process server is started")
+	parser.add_argument("--clients", type=int, default=50, help="concurrent connections")
+	parser.add_argument("--games", type=int, default=20, help="games played by each connection")
+	parser.add_argument("--idle-sessions", type=int, default=0, help="games created and left open before measuring")
+	parser.add_argument("--seed", type=int, default=0, help="seed for the move choices")
+	args = parser.parse_args(argv)
+
+	if args.port is None:
+		results = asyncio.run(runLoadInProcess(args.clients, args.games, args.idle_sessions, args.seed))
+	else:
+		results = asyncio.run(runLoad(args.host, args.port, args.clients, args.games, args.idle_sessions, args.seed))
+
+	for name, value in results.items():
+		print(f"{name:<18}{value}")
+
+	return 1 if results["errors"] else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
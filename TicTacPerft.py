@@ -0,0 +1,214 @@
+"""Counts the game tree of tic-tac-toe positions ("perft", after the chess engine test), to check and time the engines.
+
+From a starting position every legal move is made with updateBoard, counted, searched and taken back with undoMove,
+down to a depth or to the end of every game.  The counts are the positions visited ("nodes", including the start),
+the games that ended in each player's win or a draw, and the positions left unfinished at the depth limit.  As
+every count is fixed by the rules, a wrong total points at a bug in move making, win detection or undo, and the
+positions walked per second compare the board engines.  "divide" splits the counts by the first move, to narrow
+a mismatch down to a line of play.
+
+Usage:
+	python TicTacPerft.py [--engine all] [--board 3x3x3] [--depth N] [--moves "1,1 0,0"] [--divide]
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import TicTacToe
+from TicTacRunner import parseBoardSize
+
+# Board engines that can be counted, by name
+ENGINES = {
+	"list": TicTacToe.TicTacToe,
+	"bitboard": TicTacToe.TicTacBitboard
+}
+# Counts returned by perft
+COUNT_KEYS = ("nodes", "player_0_wins", "player_1_wins", "draws", "unfinished")
+# Counts of the whole game tree from the empty board, by (width, height, win_length)
+KNOWN_TOTALS = {
+	(3, 3, 3): {"nodes": 549946, "player_0_wins": 131184, "player_1_wins": 77904, "draws": 46080, "unfinished": 0},
+	(2, 2, 2): {"nodes": 41, "player_0_wins": 24, "player_1_wins": 0, "draws": 0, "unfinished": 0},
+	(4, 1, 3): {"nodes": 65, "player_0_wins": 0, "player_1_wins": 0, "draws": 24, "unfinished": 0}
+}
+
+
+def perft(game: TicTacToe.TicTacToe, player_value: int, depth: Optional[int] = None) -> Dict[str, int]:
+	"""Counts the game tree below a position.  The game is left as it was given.
+
+	:param game: the game to count from, in the position to start at.
+	:param player_value: the player to move, either game.PLAYER_0 or game.PLAYER_1.
+	:param depth: the most moves to look ahead, or None to play every game to its end.
+	:return: a dict of the COUNT_KEYS: the positions visited including this one, the games won by each player and
+		drawn within depth moves, and the positions still in progress at the depth limit.
+	"""
+
+	if depth is not None and depth < 0:
+		raise ValueError(f"The depth must be at least 0, was given {depth}")
+
+	# Counts in the order of COUNT_KEYS, with the finished games indexed by game state
+	counts = [0, 0, 0, 0, 0]
+	state_counts = {game.PLAYER_0_WINNER: 1, game.PLAYER_1_WINNER: 2, game.DRAW_GAME: 3}
+	in_progress = game.GAME_IN_PROGRESS
+	legal_moves = game.legalMoves
+	update_board = game.updateBoard
+	undo_move = game.undoMove
+
+	def count(player: int, remaining: int) -> None:
+		counts[0] += 1
+		if game.game_state != in_progress:
+			counts[state_counts[game.game_state]] += 1
+			return
+		if remaining == 0:
+			counts[4] += 1
+			return
+
+		for row, col in legal_moves():
+			update_board(row, col, player)
+			count(-player, remaining - 1)
+			undo_move()
+
+	count(player_value, -1 if depth is None else depth)
+
+	return dict(zip(COUNT_KEYS, counts))
+
+
+def divide(game: TicTacToe.TicTacToe, player_value: int, depth: Optional[int] = None) -> Dict[Tuple[int, int], Dict[str, int]]:
+	"""Counts the game tree below each legal move of a position separately (see perft).
+
+	:param game: the game to count from, in the position to start at.
+	:param player_value: the player to move.
+	:param depth: the most moves to look ahead, counting the first move, or None to play every game to its end.
+	:return: a dict from each (row, col) move to the perft counts of the position after it.
+	"""
+
+	if depth == 0:
+		return {}
+
+	counts = {}
+	for row, col in game.legalMoves():
+		game.updateBoard(row, col, player_value)
+		counts[(row, col)] = perft(game, -player_value, None if depth is None else depth - 1)
+		game.undoMove()
+
+	return counts
+
+
+def startingGame(
+	engine: str, size: Tuple[int, int, int], moves: Sequence[Tuple[int, int]] = ()
+) -> Tuple[TicTacToe.TicTacToe, int]:
+	"""Sets up the position to count from.
+
+	:param engine: a key of ENGINES.
+	:param size: the (width, height, win_length) of the board.
+	:param moves: the (row, col) moves played from the empty board, player 0 first.
+	:return: the game and the player to move.
+	"""
+
+	game = ENGINES[engine](*size)
+	player = game.PLAYER_0
+	for row, col in moves:
+		if game.game_state != game.GAME_IN_PROGRESS:
+			raise ValueError(f"The game is already over before the move {row},{col}")
+		if not (0 <= row < game.height and 0 <= col < game.width and game.checkValidMove(row, col)):
+			raise ValueError(f"{row},{col} is not an open space")
+		game.updateBoard(row, col, player)
+		player = -player
+
+	return game, player
+
+
+def runPerft(
+	engine: str = "list", size: Tuple[int, int, int] = (3, 3, 3), depth: Optional[int] = None,
+	moves: Sequence[Tuple[int, int]] = ()
+) -> Dict[str, object]:
+	"""Counts the game tree from a position and times it.
+
+	:param engine: a key of ENGINES.
+	:param size: the (width, height, win_length) of the board.
+	:param depth: the most moves to look ahead, or None to play every game to its end.
+	:param moves: the (row, col) moves played from the empty board before counting.
+	:return: a dict with the perft counts, "seconds", "nodes_per_sec", and "expected": the KNOWN_TOTALS the counts
+		must match, when the whole tree of a known board is counted from the empty board, otherwise None.
+	"""
+
+	game, player = startingGame(engine, size, moves)
+	start = time.perf_counter()
+	counts = perft(game, player, depth)
+	elapsed = time.perf_counter() - start
+
+	known = KNOWN_TOTALS.get(tuple(size)) if depth is None and not moves else None
+
+	return {
+		"engine": engine,
+		"board": "x".join(str(value) for value in size),
+		"depth": depth,
+		**counts,
+		"seconds": round(elapsed, 6),
+		"nodes_per_sec": round(counts["nodes"] / elapsed, 1) if elapsed else None,
+		"expected": known
+	}
+
+
+def parseMoves(text: str) -> List[Tuple[int, int]]:
+	"""Reads a list of moves from the command line.
+
+	:param text: moves as "row,col" pairs separated by spaces, ex "1,1 0,0".
+	:return: the list of (row, col) moves.
+	"""
+
+	moves = []
+	for move in text.split():
+		try:
+			row, col = (int(value) for value in move.split(","))
+		except ValueError:
+			raise argparse.ArgumentTypeError(f"Expected moves like \"1,1 0,0\", was given {text!r}")
+		moves.append((row, col))
+
+	return moves
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	"""Runs perft from the command line and prints the counts and speed of each engine.
+
+	:param argv: the command line arguments, defaults to sys.argv.
+	:return: the exit code: 0 if every known total matched (or none applied), 1 otherwise.
+	"""
+
+	parser = argparse.ArgumentParser(description="Count the tic-tac-toe game tree to check and time the engines.")
+	parser.add_argument("--engine", choices=[*ENGINES, "all"], default="all", help="the board engine (default: all)")
+	parser.add_argument("--board", type=parseBoardSize, default=(3, 3, 3), help="board size as WxHxK (default 3x3x3)")
+	parser.add_argument("--depth", type=int, help="most moves to look ahead (default: to the end of every game)")
+	parser.add_argument("--moves", type=parseMoves, default=[], help="moves played before counting, ex \"1,1 0,0\"")
+	parser.add_argument("--divide", action="store_true", help="also print the counts below each first move")
+	args = parser.parse_args(argv)
+
+	# Checks the board size, depth and moves before any counting starts
+	try:
+		if args.depth is not None and args.depth < 0:
+			raise ValueError(f"--depth must be at least 0, was given {args.depth}")
+		startingGame("list", args.board, args.moves)
+	except ValueError as error:
+		parser.error(str(error))
+
+	mismatched = False
+	for engine in ENGINES if args.engine == "all" else [args.engine]:
+		results = runPerft(engine, args.board, args.depth, args.moves)
+		counts = ", ".join(f"{key} {results[key]}" for key in COUNT_KEYS)
+		print(f"{engine}: {counts} in {results['seconds']:.3f}s, {results['nodes_per_sec']} nodes/sec")
+		expected = results["expected"]
+		if expected is not None and any(results[key] != expected[key] for key in COUNT_KEYS):
+			mismatched = True
+			print(f"  expected {', '.join(f'{key} {expected[key]}' for key in COUNT_KEYS)}")
+
+	if args.divide:
+		game, player = startingGame(args.engine if args.engine != "all" else "list", args.board, args.moves)
+		for (row, col), counts in divide(game, player, args.depth).items():
+			print(f"  {row},{col}: " + ", ".join(f"{key} {counts[key]}" for key in COUNT_KEYS))
+
+	return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,343 @@
+"""Contains the compact on-disk format for archiving finished tic-tac-toe games.
+	- GameRecordWriter: appends one fixed-size packed record per game to a record file.
+	- GameRecordReader: memory-maps a record file to iterate, filter and count records without loading them all.
+	- readOpeningStats: adds up the opening statistics of several record files.
+
+File layout: a 12-byte header (FILE_MAGIC, then the width, height and win length as bytes, then a zero byte),
+followed by fixed-size records.  Each record is the final game state (1 byte), the number of moves (1 byte),
+then one byte per space on the board holding the space index (row * width + col) of each move in order,
+padded with NO_MOVE.  A 3x3 game is 11 bytes.  Boards are limited to 255 spaces so every index fits in a byte.
+"""
+
+import mmap
+import os
+import struct
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import TicTacToe
+
+FILE_MAGIC = b"TTTREC01"
+# Magic, width, height, win length, padding byte
+HEADER = struct.Struct("<8sBBBx")
+# Move byte padding the unused end of a record
+NO_MOVE = 0xFF
+# Largest board whose space indexes fit in a byte (leaving NO_MOVE free)
+MAX_SPACES = 255
+
+
+def recordSize(width: int, height: int) -> int:
+	"""Returns the number of bytes in each record for a board size.
+
+	:param width: the number of columns on the board.
+	:param height: the number of rows on the board.
+	:return: the record size in bytes.
+	"""
+
+	return 2 + width * height
+
+
+##########################################################################################
+
+class GameRecordWriter:
+	"""Appends finished games to a record file, buffering records in memory and writing them in batches.
+	Every record in a file is for the same board size, which is stored in the file's header.
+
+	Included methods:
+		- __init__(self, path, width=3, height=3, win_length=3, buffer_records=4096)
+		- writeGame(self, game) - appends a record of a game's moves and final state
+		- writeRecord(self, moves, game_state) - appends a record of space indexes and a game state
+		- flush(self) - writes the buffered records to the file
+		- close(self) - flushes and closes the file
+	"""
+
+	def __init__(self, path: str, width: int = 3, height: int = 3, win_length: int = 3, buffer_records: int = 4096) -> None:
+		"""Opens a record file for appending, writing its header if the file is new or empty.  A partial record at the
+		end of the file, left by a crash while it was being written, is cut off so the records appended stay aligned.
+
+		:param path: the record file.
+		:param width: the number of columns on the board.
+		:param height: the number of rows on the board.
+		:param win_length: the number in a row needed to win.
+		:param buffer_records: the number of records buffered before they are written.
+		"""
+
+		if width * height > MAX_SPACES:
+			raise ValueError(f"Records hold boards of up to {MAX_SPACES} spaces, was given {width}x{height}")
+
+		self.width = width
+		self.height = height
+		self.win_length = win_length
+		self.num_spaces = width * height
+		self.record_size = recordSize(width, height)
+		self.buffer_size = buffer_records * self.record_size
+		self.buffer = bytearray()
+		self.padding = bytes([NO_MOVE]) * self.num_spaces
+
+		self.file = open(path, "ab")
+		try:
+			if self.file.tell() == 0:
+				self.file.write(HEADER.pack(FILE_MAGIC, width, height, win_length))
+			else:
+				with open(path, "rb") as existing:
+					header = GameRecordReader.readHeader(existing.read(HEADER.size))
+				if header != (width, height, win_length):
+					raise ValueError(f"{path} holds records for {header}, not {(width, height, win_length)}")
+				file_size = self.file.tell()
+				records_end = file_size - (file_size - HEADER.size) % self.record_size
+				if records_end != file_size:
+					os.ftruncate(self.file.fileno(), records_end)
+					self.file.seek(records_end)
+		except Exception:
+			self.file.close()
+			raise
+
+	def writeGame(self, game: TicTacToe.TicTacToe) -> None:
+		"""Appends a record of a game's moves and final state.
+		Makes no return.
+
+		:param game: the game to record; its board size must match the file's.
+		"""
+
+		if (game.width, game.height, game.win_length) != (self.width, self.height, self.win_length):
+			raise ValueError(f"Cannot record a {game.width}x{game.height} game in a {self.width}x{self.height} file")
+
+		self.writeRecord([row * self.width + col for row, col in game.move_history], game.game_state)
+
+	def writeRecord(self, moves: Sequence[int], game_state: int) -> None:
+		"""Appends a record of space indexes and a game state.
+		Makes no return.
+
+		:param moves: the space index (row * width + col) of every move, in order.
+		:param game_state: the game state code, ex TicTacToe.PLAYER_0_WINNER.
+		"""
+
+		if len(moves) > self.num_spaces:
+			raise ValueError(f"A record holds at most {self.num_spaces} moves, was given {len(moves)}")
+
+		self.buffer.append(game_state)
+		self.buffer.append(len(moves))
+		self.buffer += bytes(moves)
+		self.buffer += self.padding[len(moves):]
+		if len(self.buffer) >= self.buffer_size:
+			self.flush()
+
+	def flush(self) -> None:
+		"""Writes the buffered records to the file.
+		Makes no return.
+		"""
+
+		self.file.write(self.buffer)
+		self.file.flush()
+		self.buffer.clear()
+
+	def close(self) -> None:
+		"""Writes the buffered records and closes the file.
+		Makes no return.
+		"""
+
+		if not self.file.closed:
+			self.flush()
+			self.file.close()
+
+	def __enter__(self) -> "GameRecordWriter":
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		self.close()
+
+
+##########################################################################################
+
+class GameRecordReader:
+	"""Reads a record file through a read-only memory map, so records are only decoded when they are used.
+	A partly written record at the end of the file (ex after a crash) is ignored.
+
+	Included methods:
+		- __init__(self, path)
+		- readHeader(data) - checks a file header and returns the board size it holds
+		- record(self, index) - decodes one record as (moves, game_state)
+		- records(self, opening=(), game_state=None) - iterates over the records, optionally filtered
+		- gameStates(self) - returns the game state of every record, as bytes
+		- movesAt(self, ply) - returns the move played at one ply of every record, as bytes
+		- openingStats(self, depth=1) - counts the results of every opening of depth moves
+		- toArray(self) - returns the records as a NumPy array backed by the memory map
+		- close(self) - closes the memory map and file
+	"""
+
+	def __init__(self, path: str) -> None:
+		"""Opens and memory-maps a record file.
+
+		:param path: the record file.
+		"""
+
+		self.file = open(path, "rb")
+		try:
+			self.width, self.height, self.win_length = self.readHeader(self.file.read(HEADER.size))
+			self.num_spaces = self.width * self.height
+			self.record_size = recordSize(self.width, self.height)
+			file_size = os.fstat(self.file.fileno()).st_size
+			self.num_records = (file_size - HEADER.size) // self.record_size
+			self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+		except Exception:
+			self.file.close()
+			raise
+
+	@staticmethod
+	def readHeader(data: bytes) -> Tuple[int, int, int]:
+		"""Checks a record file header.
+
+		:param data: the first HEADER.size bytes of the file.
+		:return: the (width, height, win_length) of the games in the file.
+		"""
+
+		if len(data) < HEADER.size or not data.startswith(FILE_MAGIC):
+			raise ValueError("Not a game record file")
+
+		return HEADER.unpack_from(data)[1:]
+
+	def __len__(self) -> int:
+		return self.num_records
+
+	def record(self, index: int) -> Tuple[Tuple[int, ...], int]:
+		"""Decodes one record.
+
+		:param index: the record number, from 0.
+		:return: the tuple of space indexes of every move, and the final game state.
+		"""
+
+		if not 0 <= index < self.num_records:
+			raise IndexError(f"Record {index} is out of range for {self.num_records} records")
+
+		offset = HEADER.size + index * self.record_size
+		game_state, num_moves = self.data[offset], self.data[offset + 1]
+
+		return tuple(self.data[offset + 2:offset + 2 + num_moves]), game_state
+
+	def __iter__(self) -> Iterator[Tuple[Tuple[int, ...], int]]:
+		return self.records()
+
+	def records(self, opening: Sequence[int] = (), game_state: Optional[int] = None) -> Iterator[Tuple[Tuple[int, ...], int]]:
+		"""Iterates over the records, only decoding the ones that match the filters.
+
+		:param opening: only records whose first moves are these space indexes.
+		:param game_state: only records that ended in this game state.
+		:return: an iterator of (moves, game_state), as from record.
+		"""
+
+		data = self.data
+		prefix = bytes(opening)
+		for offset in range(HEADER.size, HEADER.size + self.num_records * self.record_size, self.record_size):
+			if game_state is not None and data[offset] != game_state:
+				continue
+			if prefix and (data[offset + 1] < len(prefix) or data[offset + 2:offset + 2 + len(prefix)] != prefix):
+				continue
+			yield tuple(data[offset + 2:offset + 2 + data[offset + 1]]), data[offset]
+
+	def gameStates(self) -> bytes:
+		"""Reads the final game state of every record in one strided slice of the memory map.
+
+		:return: bytes holding one game state per record.
+		"""
+
+		end = HEADER.size + self.num_records * self.record_size
+
+		return self.data[HEADER.size:end:self.record_size]
+
+	def movesAt(self, ply: int) -> bytes:
+		"""Reads the move played at one ply of every record in one strided slice of the memory map.
+
+		:param ply: the move number, from 0 for the first move.
+		:return: bytes holding one space index per record, NO_MOVE for games that ended before that ply.
+		"""
+
+		if not 0 <= ply < self.num_spaces:
+			raise ValueError(f"Records hold plies 0 to {self.num_spaces - 1}, was given {ply}")
+
+		start = HEADER.size + 2 + ply
+		end = HEADER.size + self.num_records * self.record_size
+
+		return self.data[start:end:self.record_size]
+
+	def openingStats(self, depth: int = 1) -> Dict[Tuple[int, ...], Dict[str, int]]:
+		"""Counts how the games that started with each opening ended.
+		Works column by column on strided slices of the file rather than decoding each record.
+
+		:param depth: the number of moves in an opening.
+		:return: a dict from each opening (a tuple of space indexes) to its counts of
+			"player_0_wins", "player_1_wins", "draws" and "unfinished" games.
+		"""
+
+		columns = [self.movesAt(ply) for ply in range(0, depth)]
+		counts = Counter(zip(self.gameStates(), *columns))
+		names = {
+			TicTacToe.TicTacToe.PLAYER_0_WINNER: "player_0_wins",
+			TicTacToe.TicTacToe.PLAYER_1_WINNER: "player_1_wins",
+			TicTacToe.TicTacToe.DRAW_GAME: "draws"
+		}
+
+		stats = {}
+		for (game_state, *opening), count in counts.items():
+			if NO_MOVE in opening:
+				continue
+			opening_stats = stats.setdefault(
+				tuple(opening), {"player_0_wins": 0, "player_1_wins": 0, "draws": 0, "unfinished": 0}
+			)
+			opening_stats[names.get(game_state, "unfinished")] += count
+
+		return stats
+
+	def toArray(self) -> "numpy.ndarray":  # noqa: F821
+		"""Views the records as a NumPy structured array backed by the memory map, without copying them.
+		Requires NumPy.  The reader cannot be closed while the array (or any view of it) is alive, so delete it,
+		or keep a copy with records.copy(), before calling close.
+
+		:return: an array of num_records records with "game_state", "num_moves" and "moves" fields.
+		"""
+
+		import numpy as np
+
+		dtype = np.dtype([("game_state", np.uint8), ("num_moves", np.uint8), ("moves", np.uint8, (self.num_spaces,))])
+
+		return np.frombuffer(self.data, dtype=dtype, count=self.num_records, offset=HEADER.size)
+
+	def close(self) -> None:
+		"""Closes the memory map and file.
+		Makes no return.
+
+		:raise BufferError: if an array from toArray still views the memory map; the reader stays open.
+		"""
+
+		try:
+			self.data.close()
+		except BufferError:
+			raise BufferError(
+				"Cannot close the record file while an array from toArray still views it, delete the array "
+				"(or keep a copy of it) first"
+			) from None
+		self.file.close()
+
+	def __enter__(self) -> "GameRecordReader":
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		self.close()
+
+
+def readOpeningStats(paths: List[str], depth: int = 1) -> Dict[Tuple[int, ...], Dict[str, int]]:
+	"""Adds up the openingStats of several record files.
+
+	:param paths: the record files.
+	:param depth: the number of moves in an opening.
+	:return: the combined counts, as from GameRecordReader.openingStats.
+	"""
+
+	totals = {}
+	for path in paths:
+		with GameRecordReader(path) as reader:
+			for opening, counts in reader.openingStats(depth).items():
+				opening_totals = totals.setdefault(opening, dict.fromkeys(counts, 0))
+				for name, count in counts.items():
+					opening_totals[name] += count
+
+	return totals
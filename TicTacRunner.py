@@ -0,0 +1,323 @@
+"""Headless self-play and tournament runner that spreads games over a pool of worker processes.
+
+Games are split into chunks of games; every chunk is played by one worker with its own seeded random generators,
+so the results for a seed are the same however many workers play them.  The statistics of the chunks are merged
+into win/draw/loss totals for each match, and into standings for a tournament.
+
+Players are named by a spec string: "bot" (botMove), "greedy" (greedyBotMove), "heuristic" (heuristicBotMove),
+"random", "alphabeta:DEPTH" (AlphaBetaBot searching DEPTH moves ahead, or to the end without DEPTH), or
+"mcts:ITERATIONS" (MCTSBot making ITERATIONS playouts per move, 1000 without ITERATIONS).
+
+Usage:
+	python TicTacRunner.py [--players bot random] [--games 10000] [--workers N] [--chunk-size 500]
+		[--board 3x3x3] [--engine list|bitboard] [--seed 0] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import TicTacToe
+from TicTacSearch import AlphaBetaBot, MCTSBot
+
+# Engines that games can be played on, by name
+ENGINES = {
+	"list": TicTacToe.TicTacToe,
+	"bitboard": TicTacToe.TicTacBitboard
+}
+
+# Statistics kept for every match, from player 0's point of view
+RESULT_KEYS = ("games", "player_0_wins", "player_1_wins", "draws")
+
+
+def makePlayer(spec: str, game: TicTacToe.TicTacToe, rng: random.Random) -> Callable[[int], Tuple[int, int]]:
+	"""Builds a move function from a player spec.
+
+	:param spec: the player spec, ex "bot", "random" or "alphabeta:4".
+	:param game: the game the player moves in.
+	:param rng: the random generator used by the random and MCTS players.
+	:return: a function taking the player value and returning the (row, col) to move on.
+	"""
+
+	name, _, argument = spec.partition(":")
+	if name == "bot":
+		return game.botMove
+	if name == "greedy":
+		return game.greedyBotMove
+	if name == "heuristic":
+		return game.heuristicBotMove
+	if name == "random":
+		return lambda player_value: rng.choice(game.legalMoves())
+	if name == "alphabeta":
+		return AlphaBetaBot(game, time_limit=None, max_depth=int(argument) if argument else None)
+	if name == "mcts":
+		return MCTSBot(game, time_limit=None, max_iterations=int(argument) if argument else 1000, rng=rng)
+
+	raise ValueError(f"Unknown player {spec!r}, expected bot, greedy, heuristic, random, alphabeta[:DEPTH] or mcts[:ITERATIONS]")
+
+
+def playChunk(task: Tuple[str, str, int, Tuple[int, int, int], str, int, int]) -> Dict[str, int]:
+	"""Plays one chunk of games of a match.  Runs in a worker process, so it takes and returns plain data.
+
+	:param task: (player 0 spec, player 1 spec, number of games, (width, height, win_length), engine, seed, chunk index).
+	:return: a dict of the RESULT_KEYS counts for the chunk.
+	"""
+
+	player_0_spec, player_1_spec, num_games, size, engine, seed, chunk_index = task
+	# The bots draw from the game's generator, which is seeded for the chunk along with the random player's generator
+	rng = random.Random(f"{seed}-{chunk_index}-moves")
+
+	game = ENGINES[engine](*size, rng=random.Random(f"{seed}-{chunk_index}"))
+	moves = {
+		game.PLAYER_0: makePlayer(player_0_spec, game, rng),
+		game.PLAYER_1: makePlayer(player_1_spec, game, rng)
+	}
+	results = dict.fromkeys(RESULT_KEYS, 0)
+	for _ in range(0, num_games):
+		game.resetGame()
+		player = game.PLAYER_0
+		while game.game_state == game.GAME_IN_PROGRESS:
+			row, col = moves[player](player)
+			game.updateBoard(row, col, player)
+			player = -player
+
+		results["games"] += 1
+		if game.game_state == game.PLAYER_0_WINNER:
+			results["player_0_wins"] += 1
+		elif game.game_state == game.PLAYER_1_WINNER:
+			results["player_1_wins"] += 1
+		else:
+			results["draws"] += 1
+
+	return results
+
+
+def mergeResults(chunk_results: List[Dict[str, int]]) -> Dict[str, int]:
+	"""Adds up the statistics of several chunks.
+
+	:param chunk_results: the results of playChunk.
+	:return: the total of every RESULT_KEYS count.
+	"""
+
+	totals = dict.fromkeys(RESULT_KEYS, 0)
+	for results in chunk_results:
+		for key in RESULT_KEYS:
+			totals[key] += results[key]
+
+	return totals
+
+
+class GameRunner:
+	"""Plays matches and tournaments, spreading the chunks of games over a process pool.
+
+	Included methods:
+		- __init__(self, workers=None, chunk_size=500, size=(3, 3, 3), engine="list", seed=0)
+		- playMatch(self, player_0, player_1, num_games) - plays a match and returns its merged statistics
+		- playTournament(self, players, num_games) - plays every ordered pairing and returns the standings
+		- close(self) - shuts down the process pool
+	"""
+
+	def __init__(
+		self, workers: Optional[int] = None, chunk_size: int = 500, size: Tuple[int, int, int] = (3, 3, 3),
+		engine: str = "list", seed: int = 0
+	) -> None:
+		"""Initializes a runner; the process pool is started on first use.
+
+		:param workers: the number of worker processes, defaults to the number of CPUs; 1 plays in this process.
+		:param chunk_size: the number of games in each chunk handed to a worker.
+		:param size: the (width, height, win_length) of the board.
+		:param engine: a key of ENGINES.
+		:param seed: the seed the chunk seeds are derived from.
+		"""
+
+		if engine not in ENGINES:
+			raise ValueError(f"Unknown engine {engine!r}, expected one of {sorted(ENGINES)}")
+		if chunk_size < 1:
+			raise ValueError(f"The chunk size must be at least 1, was given {chunk_size}")
+
+		self.workers = workers or os.cpu_count() or 1
+		self.chunk_size = chunk_size
+		self.size = tuple(size)
+		self.engine = engine
+		self.seed = seed
+		self.pool = None
+		# Chunk indexes keep counting across matches, so every chunk of a run gets its own seed
+		self.chunks_started = 0
+
+	def _map(self, tasks: list) -> List[Dict[str, int]]:
+		"""Plays chunks, in the pool if there is more than one worker.
+
+		:param tasks: the playChunk tasks.
+		:return: the results of every task, in order.
+		"""
+
+		if self.workers == 1:
+			return [playChunk(task) for task in tasks]
+
+		if self.pool is None:
+			self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+		return list(self.pool.map(playChunk, tasks))
+
+	def _tasks(self, player_0: str, player_1: str, num_games: int) -> list:
+		"""Splits a match into chunk tasks.
+
+		:param player_0: the spec of the player moving first.
+		:param player_1: the spec of the player moving second.
+		:param num_games: the number of games in the match.
+		:return: the playChunk tasks.
+		"""
+
+		# Players are built once here so unknown specs fail before any work is sent to the pool
+		game = ENGINES[self.engine](*self.size)
+		makePlayer(player_0, game, random.Random())
+		makePlayer(player_1, game, random.Random())
+
+		tasks = []
+		for start in range(0, num_games, self.chunk_size):
+			games = min(self.chunk_size, num_games - start)
+			tasks.append((player_0, player_1, games, self.size, self.engine, self.seed, self.chunks_started))
+			self.chunks_started += 1
+
+		return tasks
+
+	def playMatch(self, player_0: str, player_1: str, num_games: int) -> Dict[str, object]:
+		"""Plays a match of num_games games with the same player moving first in every game.
+
+		:param player_0: the spec of the player moving first.
+		:param player_1: the spec of the player moving second.
+		:param num_games: the number of games to play.
+		:return: the merged RESULT_KEYS counts, with the players, seconds and games_per_sec.
+		"""
+
+		start = time.perf_counter()
+		results = mergeResults(self._map(self._tasks(player_0, player_1, num_games)))
+		elapsed = time.perf_counter() - start
+
+		return {
+			"player_0": player_0,
+			"player_1": player_1,
+			**results,
+			"seconds": round(elapsed, 6),
+			"games_per_sec": round(num_games / elapsed, 1) if elapsed else None
+		}
+
+	def playTournament(self, players: List[str], num_games: int) -> Dict[str, object]:
+		"""Plays num_games games for every ordered pair of different players, so each pairing is played from both sides.
+		All chunks of all matches are sent to the pool together.
+
+		:param players: the player specs.
+		:param num_games: the number of games for each ordered pairing.
+		:return: a dict with the "matches" and the "standings" (wins, draws and losses of every player).
+		"""
+
+		pairings = [(player_0, player_1) for player_0 in players for player_1 in players if player_0 != player_1]
+		match_tasks = [self._tasks(player_0, player_1, num_games) for player_0, player_1 in pairings]
+
+		start = time.perf_counter()
+		chunk_results = self._map([task for tasks in match_tasks for task in tasks])
+		elapsed = time.perf_counter() - start
+
+		matches = []
+		standings = {player: {"wins": 0, "draws": 0, "losses": 0} for player in players}
+		position = 0
+		for (player_0, player_1), tasks in zip(pairings, match_tasks):
+			results = mergeResults(chunk_results[position:position + len(tasks)])
+			position += len(tasks)
+			matches.append({"player_0": player_0, "player_1": player_1, **results})
+
+			for player, wins, losses in (
+				(player_0, results["player_0_wins"], results["player_1_wins"]),
+				(player_1, results["player_1_wins"], results["player_0_wins"])
+			):
+				standings[player]["wins"] += wins
+				standings[player]["losses"] += losses
+				standings[player]["draws"] += results["draws"]
+
+		total_games = num_games * len(pairings)
+		return {
+			"matches": matches,
+			"standings": standings,
+			"games": total_games,
+			"seconds": round(elapsed, 6),
+			"games_per_sec": round(total_games / elapsed, 1) if elapsed else None
+		}
+
+	def close(self) -> None:
+		"""Shuts down the process pool, if one was started.
+		Makes no return.
+		"""
+
+		if self.pool is not None:
+			self.pool.shutdown()
+			self.pool = None
+
+	def __enter__(self) -> "GameRunner":
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		self.close()
+
+
+def parseBoardSize(text: str) -> Tuple[int, int, int]:
+	"""Parses a board size given as WIDTHxHEIGHTxWIN_LENGTH, ex "15x15x5".
+
+	:param text: the board size.
+	:return: (width, height, win_length).
+	"""
+
+	try:
+		width, height, win_length = (int(part) for part in text.lower().split("x"))
+	except ValueError:
+		raise argparse.ArgumentTypeError(f"Expected a board size like 3x3x3, was given {text!r}")
+
+	return width, height, win_length
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	"""Runs a tournament from the command line and prints the results.
+
+	:param argv: the command line arguments, defaults to sys.argv.
+	:return: the exit code.
+	"""
+
+	parser = argparse.ArgumentParser(description="Headless parallel tic-tac-toe self-play and tournament runner.")
+	parser.add_argument("--players", nargs="+", default=["bot", "random"], help="player specs (default: bot random)")
+	parser.add_argument("--games", type=int, default=10000, help="games for each ordered pairing of players")
+	parser.add_argument("--workers", type=int, help="worker processes (default: the number of CPUs)")
+	parser.add_argument("--chunk-size", type=int, default=500, help="games handed to a worker at a time")
+	parser.add_argument("--board", type=parseBoardSize, default=(3, 3, 3), help="board size as WxHxK (default 3x3x3)")
+	parser.add_argument("--engine", choices=sorted(ENGINES), default="list", help="board engine to play on")
+	parser.add_argument("--seed", type=int, default=0, help="seed for every player's random choices")
+	parser.add_argument("--output", help="write the results to this JSON file")
+	args = parser.parse_args(argv)
+
+	with GameRunner(args.workers, args.chunk_size, args.board, args.engine, args.seed) as runner:
+		tournament = runner.playTournament(args.players, args.games)
+		workers = runner.workers
+
+	print(f"{'player 0':<16}{'player 1':<16}{'P0 wins':>9}{'P1 wins':>9}{'draws':>9}")
+	for match in tournament["matches"]:
+		print(
+			f"{match['player_0']:<16}{match['player_1']:<16}{match['player_0_wins']:>9}"
+			f"{match['player_1_wins']:>9}{match['draws']:>9}"
+		)
+	print(f"\n{'player':<16}{'wins':>9}{'draws':>9}{'losses':>9}")
+	for player, standing in tournament["standings"].items():
+		print(f"{player:<16}{standing['wins']:>9}{standing['draws']:>9}{standing['losses']:>9}")
+	print(f"\n{tournament['games']} games in {tournament['seconds']:.2f}s on {workers} workers")
+
+	if args.output:
+		with open(args.output, "w") as file:
+			json.dump({"workers": workers, "seed": args.seed, "board": list(args.board), **tournament}, file, indent=2)
+
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
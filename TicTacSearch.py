@@ -0,0 +1,770 @@
+"""Contains search-based bots for tic-tac-toe boards of any size.
+	- AlphaBetaBot: negamax search with alpha-beta pruning, a transposition table and symmetry folding.
+	- MCTSBot: Monte Carlo tree search with UCT selection and random rollouts, for an anytime move on any board.
+
+A bot is created for one game and is then used as that game's move function, for example:
+	game.player_1_move = AlphaBetaBot(game, time_limit=0.5)
+"""
+
+import math
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from TicTacToe import TicTacToe
+
+
+class _SearchTimeout(Exception):
+	"""Raised inside the search when the time budget runs out."""
+
+
+def lineWindows(width: int, height: int, win_length: int) -> Tuple[List[int], List[Tuple[int, ...]]]:
+	"""Lists every window of win_length spaces in a line, as bitboards (bit (row * width + col) for each space).
+
+	:param width: the number of columns on the board.
+	:param height: the number of rows on the board.
+	:param win_length: the number in a row needed to win.
+	:return: the list of every window, and for each space the tuple of windows through it.
+	"""
+
+	windows = []
+	windows_through = [[] for _ in range(0, width * height)]
+	for row in range(0, height):
+		for col in range(0, width):
+			for row_step, col_step in TicTacToe.LINE_DIRECTIONS:
+				end_row = row + row_step * (win_length - 1)
+				end_col = col + col_step * (win_length - 1)
+				if not (end_row < height and 0 <= end_col < width):
+					continue
+				spaces = [(row + row_step * i) * width + col + col_step * i for i in range(0, win_length)]
+				mask = sum(1 << space for space in spaces)
+				windows.append(mask)
+				for space in spaces:
+					windows_through[space].append(mask)
+
+	# With a win_length of 1 every direction gives the same one-space window, so duplicates are removed
+	return windows, [tuple(set(masks)) for masks in windows_through]
+
+
+def loadBitboards(game: TicTacToe, player_value: int) -> Tuple[int, int]:
+	"""Reads a game's board into bitboards.
+
+	:param game: the game to read.
+	:param player_value: the player whose stones go in the first bitboard.
+	:return: (mine, theirs) bitboards for player_value and their opponent.
+	"""
+
+	mine = theirs = 0
+	width = game.width
+	for row, board_row in enumerate(game.board):
+		for col, value in enumerate(board_row):
+			if value == player_value:
+				mine |= 1 << (row * width + col)
+			elif value != game.BLANK_POS:
+				theirs |= 1 << (row * width + col)
+
+	return mine, theirs
+
+
+def centerDistance(space: int, width: int, height: int) -> Tuple[int, int]:
+	"""Measures how far a space is from the center of the board, for ordering moves.
+	Distances are doubled so that the center of an even-sized board stays a whole number.
+
+	:param space: the space index (row * width + col).
+	:param width: the number of columns on the board.
+	:param height: the number of rows on the board.
+	:return: (the larger of the row and column distances, their sum), smaller for spaces nearer the center.
+	"""
+
+	row, col = divmod(space, width)
+	row_distance, col_distance = abs(2 * row - (height - 1)), abs(2 * col - (width - 1))
+
+	return max(row_distance, col_distance), row_distance + col_distance
+
+
+##########################################################################################
+
+class _BitboardBot:
+	"""Shared base of the search bots: the bitboard geometry of the game's board size, and the win check and move
+	lists built on it.  Bitboards have bit (row * width + col) set for each stone.
+
+	Included methods:
+		- __call__(self, bot_icon) - returns the bot's move, so the bot can be used as a move function
+		- _prepareBoard(self) - rebuilds the geometry if the board size has changed since the last move
+		- _isWin(self, bits, space) - determines if the space just played made a line
+		- _spaces(bits) - lists the spaces set in a bitboard
+		- _candidateMoves(self, mine, theirs) - lists the empty spaces, or only those next to a stone on large boards
+	"""
+
+	# Boards with more spaces than this only consider spaces next to a stone
+	FULL_WIDTH_LIMIT = 16
+
+	def __call__(self, bot_icon: int) -> Tuple[int, int]:
+		"""Returns the bot's move, so the bot can be assigned as player_0_move or player_1_move.
+
+		:param bot_icon: either PLAYER_0 or PLAYER_1, the player the bot is moving for.
+		:return: (row, col) of the bot's move.
+		"""
+
+		return self.chooseMove(bot_icon)
+
+	def _prepareBoard(self) -> bool:
+		"""Builds the windows and masks for the game's board size, if it has changed since the last move.
+
+		:return: True if they were rebuilt, so the bot should rebuild anything else that depends on the board size.
+		"""
+
+		game = self.game
+		geometry = (game.width, game.height, game.win_length)
+		if geometry == self._geometry:
+			return False
+
+		self._geometry = geometry
+		width, height, win_length = geometry
+		num_spaces = width * height
+		self.full_board = (1 << num_spaces) - 1
+
+		# Every window of win_length spaces in a line, and the windows through each space
+		self.windows, self.windows_through = lineWindows(width, height, win_length)
+
+		# Column masks used to spread stones sideways without wrapping to the next row
+		first_column = sum(1 << (row * width) for row in range(0, height))
+		self.not_first_column = self.full_board & ~first_column
+		self.not_last_column = self.full_board & ~(first_column << (width - 1))
+		self.neighbors_only = num_spaces > self.FULL_WIDTH_LIMIT
+		self.center_space = min(range(0, num_spaces), key=lambda space: centerDistance(space, width, height))
+
+		return True
+
+	def _isWin(self, bits: int, space: int) -> bool:
+		"""Determines if a bitboard has a full window through the space just played.
+
+		:param bits: the bitboard of the player who just moved.
+		:param space: the space they played.
+		:return: True if the move made a line of win_length.
+		"""
+
+		for mask in self.windows_through[space]:
+			if bits & mask == mask:
+				return True
+
+		return False
+
+	@staticmethod
+	def _spaces(bits: int) -> List[int]:
+		"""Lists the spaces set in a bitboard.
+
+		:param bits: a bitboard.
+		:return: the space indexes, lowest first.
+		"""
+
+		spaces = []
+		while bits:
+			low_bit = bits & -bits
+			spaces.append(low_bit.bit_length() - 1)
+			bits ^= low_bit
+
+		return spaces
+
+	def _candidateMoves(self, mine: int, theirs: int) -> List[int]:
+		"""Lists the moves worth considering in a position: every empty space, or on boards larger than
+		FULL_WIDTH_LIMIT only the empty spaces next to a stone (the center on an empty board).
+
+		:param mine: bitboard of the player to move.
+		:param theirs: bitboard of the other player.
+		:return: the spaces of the candidate moves, lowest first.
+		"""
+
+		taken = mine | theirs
+		empty = self.full_board & ~taken
+		if self.neighbors_only:
+			if not taken:
+				return [self.center_space]
+			# Spread the stones one space in every direction, then keep the empty spaces they reach
+			spread = taken | (taken << 1) & self.not_first_column | (taken >> 1) & self.not_last_column
+			spread |= (spread << self.game.width) | (spread >> self.game.width)
+			empty &= spread
+
+		return self._spaces(empty)
+
+
+class AlphaBetaBot(_BitboardBot):
+	"""Picks moves by negamax search with alpha-beta pruning, for boards of any width, height and win length.
+
+	The search works on a pair of bitboards (bit (row * width + col) for each space): the stones of the player
+	to move and the stones of the other player.  Integers are immutable, so playing a move is just passing
+	new bitboards down the search, and nothing needs to be copied or undone.
+
+	Positions are stored in a transposition table under a canonical key: the smallest of the position's images
+	under the board symmetries (8 for square boards, 4 otherwise), so positions that are rotations or mirror
+	images of each other share one entry.  The images are kept up to date move by move rather than recomputed.
+
+	The search deepens one move at a time until the game is solved or the time budget runs out, and then plays
+	the best move of the deepest finished search.  Moves are ordered with the transposition table's best move
+	first, then by closeness to the center.  On boards larger than 16 spaces only spaces next to a stone are
+	searched, and positions at the depth limit are scored by counting the lines each player could still win.
+
+	Included methods:
+		- __init__(self, game, time_limit=1.0, max_depth=None, max_table_entries=1_000_000)
+		- __call__(self, bot_icon) - returns the bot's move, so the bot can be used as a move function
+		- chooseMove(self, bot_icon) - searches for the best move for bot_icon in the game's current position
+		- evaluate(self, mine, theirs) - scores a position at the depth limit
+	"""
+
+	# Score of a win; wins are scored WIN_SCORE minus the number of moves to reach them, so faster wins score higher
+	WIN_SCORE = 1_000_000
+	# Scores further than this from zero are wins or losses rather than evaluations
+	WIN_THRESHOLD = WIN_SCORE - 10_000
+	# Transposition table bound types
+	EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+	# Nodes searched between checks of the clock, and fewer on big boards so that no more than about
+	# WINDOWS_PER_CLOCK_CHECK windows are evaluated between checks
+	NODES_PER_CLOCK_CHECK = 128
+	WINDOWS_PER_CLOCK_CHECK = 4096
+
+	def __init__(
+		self, game: TicTacToe, time_limit: Optional[float] = 1.0, max_depth: Optional[int] = None,
+		max_table_entries: int = 1_000_000
+	) -> None:
+		"""Initializes the bot for a game.
+
+		:param game: the game the bot plays in; its board is read on every move.
+		:param time_limit: the time budget per move in seconds, or None to always search to max_depth (or the end).
+		:param max_depth: the deepest search in moves, or None for no limit besides the end of the game.
+		:param max_table_entries: the transposition table is cleared when it grows past this many entries.
+		"""
+
+		self.game = game
+		self.time_limit = time_limit
+		self.max_depth = max_depth
+		self.max_table_entries = max_table_entries
+
+		self.table = {}
+		# Details of the last search, for callers that want to report on it; last_score is the score of the
+		# deepest finished depth, and is 0 when completed_depth is 0 (the search timed out before depth 1)
+		self.nodes = 0
+		self.completed_depth = 0
+		self.last_score = 0
+
+		self._geometry = None
+		self._deadline = None
+		self._clock_interval = self.NODES_PER_CLOCK_CHECK
+
+	def _prepare(self) -> None:
+		"""Builds the masks and symmetries for the game's board size, if it has changed since the last move."""
+
+		if not self._prepareBoard():
+			return
+
+		self.table.clear()
+		width, height, win_length = self._geometry
+		num_spaces = width * height
+
+		# Board symmetries as space permutations: identity, mirrors and half turn, plus quarter turns and
+		# diagonal mirrors on square boards
+		transforms = [
+			lambda row, col: (row, col),
+			lambda row, col: (row, width - 1 - col),
+			lambda row, col: (height - 1 - row, col),
+			lambda row, col: (height - 1 - row, width - 1 - col)
+		]
+		if width == height:
+			transforms += [
+				lambda row, col: (col, row),
+				lambda row, col: (width - 1 - col, height - 1 - row),
+				lambda row, col: (col, height - 1 - row),
+				lambda row, col: (width - 1 - col, row)
+			]
+		self.permutations = []
+		for transform in transforms:
+			permutation = []
+			for space in range(0, num_spaces):
+				new_row, new_col = transform(*divmod(space, width))
+				permutation.append(new_row * width + new_col)
+			self.permutations.append(permutation)
+		self.inverse_permutations = []
+		for permutation in self.permutations:
+			inverse = [0] * num_spaces
+			for space, image in enumerate(permutation):
+				inverse[image] = space
+			self.inverse_permutations.append(inverse)
+		# Bit of each space in every symmetric image, so images can be updated one move at a time
+		self.symmetric_bits = [
+			tuple(1 << permutation[space] for permutation in self.permutations) for space in range(0, num_spaces)
+		]
+
+		# Spaces ordered by closeness to the center, for move ordering
+		self.space_rank = [0] * num_spaces
+		for rank, space in enumerate(sorted(range(0, num_spaces), key=lambda space: centerDistance(space, width, height))):
+			self.space_rank[space] = rank
+
+		# Evaluation weight of a window by the number of one player's stones in it
+		self.window_weights = [0] + [4 ** count for count in range(1, win_length + 1)]
+
+	def _images(self, bits: int) -> Tuple[int, ...]:
+		"""Builds the images of a bitboard under every board symmetry.
+
+		:param bits: a bitboard.
+		:return: a tuple with the image under each permutation, in the order of self.permutations.
+		"""
+
+		images = [0] * len(self.permutations)
+		while bits:
+			low_bit = bits & -bits
+			for index, bit in enumerate(self.symmetric_bits[low_bit.bit_length() - 1]):
+				images[index] |= bit
+			bits ^= low_bit
+
+		return tuple(images)
+
+	def _orderedMoves(self, mine: int, theirs: int, first_move: Optional[int]) -> List[int]:
+		"""Lists the moves to search, best candidates first.
+
+		:param mine: bitboard of the player to move.
+		:param theirs: bitboard of the other player.
+		:param first_move: a move to search first (ex the transposition table's best move), or None.
+		:return: the spaces to search, in order.
+		"""
+
+		moves = self._candidateMoves(mine, theirs)
+		moves.sort(key=self.space_rank.__getitem__)
+
+		if first_move is not None and first_move in moves:
+			moves.remove(first_move)
+			moves.insert(0, first_move)
+
+		return moves
+
+	def evaluate(self, mine: int, theirs: int) -> int:
+		"""Scores a position that is not searched any deeper, from the point of view of the player to move.
+		Every window that only one player has stones in is worth 4 ** (number of stones) to that player.
+
+		:param mine: bitboard of the player to move.
+		:param theirs: bitboard of the other player.
+		:return: the score, positive if the position favors the player to move.
+		"""
+
+		score = 0
+		weights = self.window_weights
+		for mask in self.windows:
+			my_stones = mine & mask
+			their_stones = theirs & mask
+			if my_stones and not their_stones:
+				score += weights[my_stones.bit_count()]
+			elif their_stones and not my_stones:
+				score -= weights[their_stones.bit_count()]
+
+		return score
+
+	def chooseMove(self, bot_icon: int) -> Tuple[int, int]:
+		"""Searches for the best move for bot_icon in the game's current position.
+
+		:param bot_icon: either PLAYER_0 or PLAYER_1, the player the bot is moving for.
+		:return: (row, col) of the best move found.
+		"""
+
+		# The time limit covers rebuilding the tables for a new board size as well as the search
+		self._deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+		self._prepare()
+		mine, theirs = loadBitboards(self.game, bot_icon)
+		empty_spaces = self.game.num_spaces - (mine | theirs).bit_count()
+		if empty_spaces == 0:
+			raise RuntimeError("Tried to pick a bot move but there are no open spaces.")
+
+		if len(self.table) > self.max_table_entries:
+			self.table.clear()
+
+		self.nodes = 0
+		self.completed_depth = 0
+		self.last_score = 0
+		self._clock_interval = max(1, min(self.NODES_PER_CLOCK_CHECK, self.WINDOWS_PER_CLOCK_CHECK // len(self.windows)))
+		max_depth = empty_spaces if self.max_depth is None else min(self.max_depth, empty_spaces)
+		mine_images, theirs_images = self._images(mine), self._images(theirs)
+
+		best_move = self._orderedMoves(mine, theirs, None)[0]
+		for depth in range(1, max_depth + 1):
+			try:
+				score, move = self._searchRoot(mine, theirs, mine_images, theirs_images, depth, best_move)
+			except _SearchTimeout:
+				break
+
+			best_move, self.last_score, self.completed_depth = move, score, depth
+			# Stop once the result is certain
+			if abs(score) > self.WIN_THRESHOLD:
+				break
+
+		return divmod(best_move, self.game.width)
+
+	def _searchRoot(
+		self, mine: int, theirs: int, mine_images: tuple, theirs_images: tuple, depth: int, first_move: int
+	) -> Tuple[int, int]:
+		"""Searches every root move to the given depth.
+
+		:return: (score, move) of the best root move.
+		"""
+
+		alpha, beta = -self.WIN_SCORE - 1, self.WIN_SCORE + 1
+		best_score, best_move = None, first_move
+		for move in self._orderedMoves(mine, theirs, first_move):
+			score = self._scoreMove(mine, theirs, mine_images, theirs_images, move, depth, alpha, beta, 0)
+			if best_score is None or score > best_score:
+				best_score, best_move = score, move
+			alpha = max(alpha, score)
+
+		return best_score, best_move
+
+	def _scoreMove(
+		self, mine: int, theirs: int, mine_images: tuple, theirs_images: tuple, move: int,
+		depth: int, alpha: int, beta: int, ply: int
+	) -> int:
+		"""Plays a move for the player to move and scores it from their point of view.
+
+		:return: the score of the move.
+		"""
+
+		bit = 1 << move
+		new_mine = mine | bit
+		if self._isWin(new_mine, move):
+			return self.WIN_SCORE - (ply + 1)
+		if new_mine | theirs == self.full_board:
+			return 0
+
+		new_mine_images = tuple(image | image_bit for image, image_bit in zip(mine_images, self.symmetric_bits[move]))
+		return -self._negamax(theirs, new_mine, theirs_images, new_mine_images, depth - 1, -beta, -alpha, ply + 1)
+
+	def _negamax(
+		self, mine: int, theirs: int, mine_images: tuple, theirs_images: tuple,
+		depth: int, alpha: int, beta: int, ply: int
+	) -> int:
+		"""Scores a position from the point of view of the player to move, with alpha-beta pruning.
+		The move that led here has already been checked for a win or a full board.
+
+		:return: the score of the position.
+		"""
+
+		self.nodes += 1
+		if self._deadline is not None and self.nodes % self._clock_interval == 0:
+			if time.perf_counter() > self._deadline:
+				raise _SearchTimeout()
+
+		if depth == 0:
+			return self.evaluate(mine, theirs)
+
+		# Canonical key: the smallest symmetric image of the position, and which symmetry produced it
+		symmetry = min(range(0, len(mine_images)), key=lambda index: (mine_images[index], theirs_images[index]))
+		key = (mine_images[symmetry], theirs_images[symmetry])
+
+		original_alpha = alpha
+		first_move = None
+		entry = self.table.get(key)
+		if entry is not None:
+			entry_depth, entry_score, entry_bound, entry_move = entry
+			first_move = self.inverse_permutations[symmetry][entry_move]
+			if entry_depth >= depth:
+				# Wins and losses are stored as moves from this position; convert back to moves from the root
+				if entry_score > self.WIN_THRESHOLD:
+					entry_score -= ply
+				elif entry_score < -self.WIN_THRESHOLD:
+					entry_score += ply
+
+				if entry_bound == self.EXACT:
+					return entry_score
+				if entry_bound == self.LOWER_BOUND:
+					alpha = max(alpha, entry_score)
+				else:
+					beta = min(beta, entry_score)
+				if alpha >= beta:
+					return entry_score
+
+		best_score, best_move = None, None
+		for move in self._orderedMoves(mine, theirs, first_move):
+			score = self._scoreMove(mine, theirs, mine_images, theirs_images, move, depth, alpha, beta, ply)
+			if best_score is None or score > best_score:
+				best_score, best_move = score, move
+			alpha = max(alpha, score)
+			if alpha >= beta:
+				break
+
+		if best_score <= original_alpha:
+			bound = self.UPPER_BOUND
+		elif best_score >= beta:
+			bound = self.LOWER_BOUND
+		else:
+			bound = self.EXACT
+
+		stored_score = best_score
+		if stored_score > self.WIN_THRESHOLD:
+			stored_score += ply
+		elif stored_score < -self.WIN_THRESHOLD:
+			stored_score -= ply
+		self.table[key] = (depth, stored_score, bound, self.permutations[symmetry][best_move])
+
+		return best_score
+
+
+##########################################################################################
+
+class _TreeNode:
+	"""A position in the Monte Carlo search tree, reached by playing move from its parent's position."""
+
+	__slots__ = ("move", "parent", "children", "untried", "visits", "wins", "result")
+
+	def __init__(self, move: Optional[int], parent: Optional["_TreeNode"], untried: List[int], result: Optional[float]) -> None:
+		"""Initializes a node.
+
+		:param move: the space played to reach the node, or None for a root made from the game's board.
+		:param parent: the node the move was played from, or None for the root.
+		:param untried: the moves from this node that have no child yet.
+		:param result: if the move ended the game, its score for the player who played it (1 win, 0.5 draw).
+		"""
+
+		self.move = move
+		self.parent = parent
+		self.children = {}
+		self.untried = untried
+		self.visits = 0
+		# Total score of the playouts through this node, for the player who played its move
+		self.wins = 0.0
+		self.result = result
+
+
+class MCTSBot(_BitboardBot):
+	"""Picks moves by Monte Carlo tree search, for boards of any width, height and win length.
+
+	Every iteration walks down the tree picking the child with the best UCT score (average playout score plus an
+	exploration bonus for rarely visited children), adds one new child, finishes the game from there with random
+	moves on a pair of bitboards, and adds the result to every node on the way back up.  The search runs until the
+	time budget or iteration cap is reached and then plays the most visited move, so the time spent per move is
+	predictable however large the board is.
+
+	The tree is kept between moves: when the bot is asked for its next move, the grandchild of the old root for the
+	bot's last move and the opponent's reply becomes the new root, keeping the playouts already made below it.
+
+	Before searching, the bot plays a move that wins at once, or blocks the only space where the opponent would.
+	On boards larger than 16 spaces the tree only grows moves next to a stone, though playouts use every space.
+
+	Included methods:
+		- __init__(self, game, time_limit=1.0, max_iterations=None, exploration=1.4, rng=None)
+		- __call__(self, bot_icon) - returns the bot's move, so the bot can be used as a move function
+		- chooseMove(self, bot_icon) - searches for the best move for bot_icon in the game's current position
+		- moveVisits(self) - reports the playouts made through each move of the last search
+	"""
+
+	# Iterations between checks of the clock
+	ITERATIONS_PER_CLOCK_CHECK = 16
+
+	def __init__(
+		self, game: TicTacToe, time_limit: Optional[float] = 1.0, max_iterations: Optional[int] = None,
+		exploration: float = 1.4, rng: Optional[random.Random] = None
+	) -> None:
+		"""Initializes the bot for a game.
+
+		:param game: the game the bot plays in; its board is read on every move.
+		:param time_limit: the time budget per move in seconds, or None to only stop at max_iterations.
+		:param max_iterations: the most playouts per move, or None to only stop at time_limit.
+		:param exploration: the UCT exploration constant; higher values try rarely visited moves more often.
+		:param rng: the random generator for playouts, defaults to the game's rng.
+		"""
+
+		if time_limit is None and max_iterations is None:
+			raise ValueError("MCTSBot needs a time_limit, a max_iterations or both")
+
+		self.game = game
+		self.time_limit = time_limit
+		self.max_iterations = max_iterations
+		self.exploration = exploration
+		self.rng = rng or game.rng
+
+		# Details of the last search, for callers that want to report on it
+		self.iterations = 0
+		self.reused_visits = 0
+
+		self._geometry = None
+		self._root = None
+		self._root_position = None
+
+	def _prepare(self) -> None:
+		"""Builds the windows and masks for the game's board size, dropping the tree if the size has changed."""
+
+		if self._prepareBoard():
+			self._root = self._root_position = None
+
+	def _newNode(self, move: Optional[int], parent: Optional[_TreeNode], mine: int, theirs: int) -> _TreeNode:
+		"""Creates a node for the position after move was played.
+
+		:param move: the space just played by the player who is now theirs, or None for a root.
+		:param parent: the parent node, or None for a root.
+		:param mine: bitboard of the player to move in the new position.
+		:param theirs: bitboard of the player who just moved.
+		:return: the new node.
+		"""
+
+		if move is not None and self._isWin(theirs, move):
+			return _TreeNode(move, parent, [], 1.0)
+		if mine | theirs == self.full_board:
+			return _TreeNode(move, parent, [], 0.5)
+
+		return _TreeNode(move, parent, self._candidateMoves(mine, theirs), None)
+
+	def _playout(self, mine: int, theirs: int) -> float:
+		"""Finishes a game with random moves.
+
+		:param mine: bitboard of the player to move.
+		:param theirs: bitboard of the other player.
+		:return: the result for the player who moved last before the playout (1 win, 0.5 draw, 0 loss).
+		"""
+
+		empty = self._spaces(self.full_board & ~(mine | theirs))
+		self.rng.shuffle(empty)
+		# Score, for the player who moved last, of the player now moving winning; it flips every move
+		mover_wins_score = 0.0
+		for space in empty:
+			mine |= 1 << space
+			if self._isWin(mine, space):
+				return mover_wins_score
+			mine, theirs = theirs, mine
+			mover_wins_score = 1.0 - mover_wins_score
+
+		return 0.5
+
+	def _tacticalMove(self, mine: int, theirs: int) -> Optional[int]:
+		"""Finds a move that wins at once, or else the only space that stops the opponent winning at once.
+
+		:param mine: bitboard of the bot.
+		:param theirs: bitboard of the opponent.
+		:return: the space to play, or None if there is no such move.
+		"""
+
+		empty = self._spaces(self.full_board & ~(mine | theirs))
+		for space in empty:
+			if self._isWin(mine | 1 << space, space):
+				return space
+
+		threats = [space for space in empty if self._isWin(theirs | 1 << space, space)]
+		if len(threats) == 1:
+			return threats[0]
+
+		return None
+
+	def _reuseRoot(self, mine: int, theirs: int) -> Optional[_TreeNode]:
+		"""Finds the node for the current position below the root of the last search.
+
+		:param mine: bitboard of the bot.
+		:param theirs: bitboard of the opponent.
+		:return: the node for the position, detached from its parent, or None if it is not in the tree.
+		"""
+
+		if self._root is None:
+			return None
+
+		old_mine, old_theirs = self._root_position
+		my_move = mine & ~old_mine
+		their_move = theirs & ~old_theirs
+		# Exactly one new stone each, and no stones removed since the last search
+		if old_mine & ~mine or old_theirs & ~theirs or my_move.bit_count() != 1 or their_move.bit_count() != 1:
+			return None
+
+		node = self._root.children.get(my_move.bit_length() - 1)
+		if node is not None:
+			node = node.children.get(their_move.bit_length() - 1)
+		if node is not None:
+			node.parent = None
+
+		return node
+
+	def chooseMove(self, bot_icon: int) -> Tuple[int, int]:
+		"""Searches for the best move for bot_icon in the game's current position.
+
+		:param bot_icon: either PLAYER_0 or PLAYER_1, the player the bot is moving for.
+		:return: (row, col) of the best move found.
+		"""
+
+		self._prepare()
+		mine, theirs = loadBitboards(self.game, bot_icon)
+		if mine | theirs == self.full_board:
+			raise RuntimeError("Tried to pick a bot move but there are no open spaces.")
+
+		self.iterations = 0
+		self.reused_visits = 0
+		tactical_move = self._tacticalMove(mine, theirs)
+		if tactical_move is not None:
+			self._root = self._root_position = None
+			return divmod(tactical_move, self.game.width)
+
+		root = self._reuseRoot(mine, theirs)
+		if root is None:
+			root = self._newNode(None, None, mine, theirs)
+		else:
+			self.reused_visits = root.visits
+		self._search(root, mine, theirs)
+
+		best = max(root.children.values(), key=lambda child: child.visits)
+		self._root, self._root_position = root, (mine, theirs)
+
+		return divmod(best.move, self.game.width)
+
+	def _search(self, root: _TreeNode, root_mine: int, root_theirs: int) -> None:
+		"""Runs iterations from the root until the time budget or iteration cap is reached, and at least one.
+
+		:param root: the node of the current position.
+		:param root_mine: bitboard of the player to move at the root.
+		:param root_theirs: bitboard of the other player.
+		"""
+
+		deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+		max_iterations = self.max_iterations
+		log = math.log
+		sqrt = math.sqrt
+		exploration = self.exploration
+		rng = self.rng
+
+		while True:
+			node, mine, theirs = root, root_mine, root_theirs
+
+			# Selection: follow the best UCT child while every move of the node has been tried
+			while not node.untried and node.result is None:
+				log_visits = log(node.visits)
+				node = max(
+					node.children.values(),
+					key=lambda child: child.wins / child.visits + exploration * sqrt(log_visits / child.visits)
+				)
+				mine, theirs = theirs, mine | 1 << node.move
+
+			# Expansion: add one untried move
+			if node.result is None:
+				untried = node.untried
+				index = rng.randrange(len(untried))
+				untried[index], untried[-1] = untried[-1], untried[index]
+				move = untried.pop()
+				mine, theirs = theirs, mine | 1 << move
+				child = self._newNode(move, node, mine, theirs)
+				node.children[move] = child
+				node = child
+
+			# Simulation, scored for the player who played the node's move
+			score = node.result if node.result is not None else self._playout(mine, theirs)
+
+			# Backpropagation, switching sides at every level
+			while node is not None:
+				node.visits += 1
+				node.wins += score
+				score = 1.0 - score
+				node = node.parent
+
+			self.iterations += 1
+			if max_iterations is not None and self.iterations >= max_iterations:
+				break
+			if deadline is not None and self.iterations % self.ITERATIONS_PER_CLOCK_CHECK == 0:
+				if time.perf_counter() > deadline:
+					break
+
+	def moveVisits(self) -> Dict[Tuple[int, int], int]:
+		"""Reports how many playouts the last search made through each move from its root.
+
+		:return: a dict from (row, col) to visit count; empty if the last move was played without a search.
+		"""
+
+		if self._root is None:
+			return {}
+
+		return {divmod(move, self.game.width): child.visits for move, child in self._root.children.items()}
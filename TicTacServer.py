@@ -0,0 +1,582 @@
+"""Contains a local HTTP/JSON server that hosts many tic-tac-toe games at once.
+	- GameSession: one hosted game, with the side the bot plays (if any).
+	- TicTacServer: an asyncio HTTP server that creates, moves on and queries sessions by id.
+
+Routes (all bodies are JSON):
+	- POST /games - creates a game, body {"width": 3, "height": 3, "win_length": 3, "bot": "player_1"}
+		where "bot" is "player_0", "player_1" or null; a bot playing player 0 moves straight away
+	- GET /games/<id> - returns the game
+	- POST /games/<id>/moves - plays a move for the player to move, body {"row": 1, "col": 1};
+		the bot replies inline in the same response
+	- GET /games/<id>/analysis - scores every legal move for the player to move (see TicTacToe.analyzePosition),
+		on boards of at most MAX_ANALYSIS_SPACES spaces
+	- DELETE /games/<id> - ends the game and frees it
+	- POST /bot-moves - picks the bot's move for many 3x3 positions that are not hosted games, with one table lookup;
+		body {"boards": [[0, -1, 1, 0, 0, 0, 0, 0, 0], ...], "players": [1, ...]}, where each board is 9 values
+		(or every board is 3 rows of 3) and "players" is the player to move in every board, or one player for all of them;
+		returns {"moves": [[row, col] or null for finished games, ...]}.  Requires NumPy.
+	- GET /stats - returns the number of hosted games and requests served
+
+Finished games can be archived to record files (see TicTacRecords.py), one file per board size.
+
+Usage:
+	python TicTacServer.py [--host 127.0.0.1] [--port 8080] [--engine list|bitboard] [--max-sessions 100000]
+		[--record-dir records]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import struct
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import TicTacToe
+from TicTacRecords import MAX_SPACES, GameRecordWriter
+from TicTacSolver import PerfectPlayTable
+
+# Engines that can host games, by name
+ENGINES = {
+	"list": TicTacToe.TicTacToe,
+	"bitboard": TicTacToe.TicTacBitboard
+}
+
+# Reason phrases for the status codes the server sends
+STATUS_REASONS = {
+	200: "OK",
+	201: "Created",
+	400: "Bad Request",
+	404: "Not Found",
+	405: "Method Not Allowed",
+	409: "Conflict",
+	413: "Payload Too Large",
+	501: "Not Implemented",
+	503: "Service Unavailable"
+}
+
+# Search time in seconds for a whole analysis on boards other than 3x3; the event loop is blocked while it runs
+ANALYSIS_TIME_LIMIT = 0.2
+# Most spaces on a board that can be analyzed; larger boards have too many moves to prove any of them in the time
+MAX_ANALYSIS_SPACES = 225
+
+# Most spaces on the board of a new game by default; building a board takes time and memory that grow with its size,
+# and the event loop is blocked while it is built
+MAX_BOARD_SPACES = 1024
+# Longest win length of a new game by default; the tables of a board shape grow with its win length
+MAX_WIN_LENGTH = 10
+
+# Largest request head and body the server reads
+MAX_HEADER_BYTES = 8192
+MAX_BODY_BYTES = 4 << 20
+
+
+class RequestError(Exception):
+	"""Raised while handling a request to send an error response with the given status code."""
+
+	def __init__(self, status: int, message: str) -> None:
+		super().__init__(message)
+		self.status = status
+
+
+##########################################################################################
+
+class GameSession:
+	"""Holds one hosted game, whose turn it is and the side played by the bot.
+
+	Included methods:
+		- __init__(self, session_id, game, bot_player)
+		- playBotMoves(self) - lets the bot move while it is the bot's turn
+		- playMove(self, row, col) - plays a move for the player to move
+		- analysisJson(self) - scores every legal move for the player to move, as a JSON-serializable dict
+		- toJson(self) - describes the session as a JSON-serializable dict
+		- snapshot(self) - encodes the session, so it can be evicted to disk
+		- fromSnapshot(cls, data, engine=TicTacToe.TicTacToe) - restores a session from a snapshot
+	"""
+
+	__slots__ = ("session_id", "game", "bot_player", "next_player", "last_bot_move")
+
+	# Snapshot fields after the game's snapshot: the bot's player value (0 for none) and the session id's length
+	SNAPSHOT_FIELDS = struct.Struct("<bB")
+
+	# Names of the game states in responses
+	STATE_NAMES = {
+		TicTacToe.TicTacToe.GAME_IN_PROGRESS: "in_progress",
+		TicTacToe.TicTacToe.PLAYER_0_WINNER: "player_0_won",
+		TicTacToe.TicTacToe.PLAYER_1_WINNER: "player_1_won",
+		TicTacToe.TicTacToe.DRAW_GAME: "draw"
+	}
+
+	def __init__(self, session_id: str, game: TicTacToe.TicTacToe, bot_player: Optional[int]) -> None:
+		"""Initializes a session around a freshly reset game, with player 0 to move.
+
+		:param session_id: the id used in the session's URL.
+		:param game: the game to host.
+		:param bot_player: the player value the bot plays, or None for a game between two remote players.
+		"""
+
+		self.session_id = session_id
+		self.game = game
+		self.bot_player = bot_player
+		self.next_player = game.PLAYER_0
+		self.last_bot_move = None
+
+	def playBotMoves(self) -> None:
+		"""Lets the bot move while the game is in progress and it is the bot's turn.
+		Makes no return.
+		"""
+
+		game = self.game
+		while game.game_state == game.GAME_IN_PROGRESS and self.next_player == self.bot_player:
+			row, col = game.botMove(self.bot_player)
+			game.updateBoard(row, col, self.bot_player)
+			self.last_bot_move = (row, col)
+			self.next_player = -self.next_player
+
+	def playMove(self, row: int, col: int) -> None:
+		"""Plays a move for the player to move, then lets the bot reply.
+		Makes no return.
+
+		:param row: the row of the space to move on.
+		:param col: the column of the space to move on.
+		"""
+
+		game = self.game
+		if game.game_state != game.GAME_IN_PROGRESS:
+			raise RequestError(409, "The game is already over")
+		if not (0 <= row < game.height and 0 <= col < game.width):
+			raise RequestError(400, f"The space ({row}, {col}) is not on the {game.width}x{game.height} board")
+		if not game.checkValidMove(row, col):
+			raise RequestError(409, f"The space ({row}, {col}) is already taken")
+
+		game.updateBoard(row, col, self.next_player)
+		self.last_bot_move = None
+		self.next_player = -self.next_player
+		self.playBotMoves()
+
+	def analysisJson(self) -> Dict[str, object]:
+		"""Scores every legal move for the player to move, from the analysis cache shared by every game.
+
+		:return: a JSON-serializable dict with the player to move and the "moves", best first, each with its
+			"row", "col", "result" ("win", "draw", "loss" or null if unproven) and "distance" in moves.
+		"""
+
+		game = self.game
+		if game.num_spaces > MAX_ANALYSIS_SPACES:
+			raise RequestError(400, f"Only boards of at most {MAX_ANALYSIS_SPACES} spaces can be analyzed")
+		in_progress = game.game_state == game.GAME_IN_PROGRESS
+		analysis = game.analyzePosition(self.next_player, ANALYSIS_TIME_LIMIT) if in_progress else ()
+
+		return {
+			"id": self.session_id,
+			"player": self.next_player if in_progress else None,
+			"moves": [
+				{"row": row, "col": col, "result": result, "distance": distance}
+				for (row, col), result, distance in analysis
+			]
+		}
+
+	def snapshot(self) -> bytes:
+		"""Encodes the session: the game's snapshot (see TicTacToe.snapshot), then SNAPSHOT_FIELDS and the session id.
+		The player to move is not stored, as the players take turns from player 0.
+
+		:return: the snapshot.
+		"""
+
+		session_id = self.session_id.encode()
+
+		return self.game.snapshot() + self.SNAPSHOT_FIELDS.pack(self.bot_player or 0, len(session_id)) + session_id
+
+	@classmethod
+	def fromSnapshot(cls, data: bytes, engine: type = TicTacToe.TicTacToe) -> "GameSession":
+		"""Restores a session from a snapshot by replaying its game's moves.
+
+		:param data: the snapshot.
+		:param engine: the board engine to restore the game on.
+		:return: the restored session.
+		"""
+
+		game = engine()
+		offset = game.restoreSnapshot(data)
+		bot_player, id_length = cls.SNAPSHOT_FIELDS.unpack_from(data, offset)
+		offset += cls.SNAPSHOT_FIELDS.size
+		session = cls(data[offset:offset + id_length].decode(), game, bot_player or None)
+		session.next_player = game.PLAYER_0 if len(game.move_history) % 2 == 0 else game.PLAYER_1
+
+		return session
+
+	def toJson(self) -> Dict[str, object]:
+		"""Describes the session for a response.
+
+		:return: a JSON-serializable dict of the board, state and players.
+		"""
+
+		game = self.game
+		return {
+			"id": self.session_id,
+			"width": game.width,
+			"height": game.height,
+			"win_length": game.win_length,
+			"board": game.board,
+			"state": self.STATE_NAMES[game.game_state],
+			"next_player": self.next_player if game.game_state == game.GAME_IN_PROGRESS else None,
+			"bot_player": self.bot_player,
+			"last_bot_move": None if self.last_bot_move is None else list(self.last_bot_move)
+		}
+
+
+##########################################################################################
+
+class TicTacServer:
+	"""Hosts tic-tac-toe sessions over HTTP/1.1 with JSON bodies, on a single asyncio event loop.
+
+	Each request is handled to completion (including the bot's reply) without yielding, so sessions need no locks.
+	Connections are kept alive between requests unless the client asks to close them.
+
+	Included methods:
+		- __init__(self, engine="list", max_sessions=100000, record_dir=None, max_board_spaces=MAX_BOARD_SPACES,
+			max_win_length=MAX_WIN_LENGTH)
+		- createSession(self, options) - creates and stores a new session
+		- archiveGame(self, game) - appends a finished game to the record file for its board size
+		- closeRecords(self) - writes and closes the record files
+		- handleRequest(self, method, path, body) - routes one request, returning (status, payload)
+		- batchBotMoves(self, options) - picks the bot's move for every position of a POST /bot-moves request
+		- handleConnection(self, reader, writer) - serves the requests of one connection
+		- start(self, host, port) - starts listening, returning the asyncio server
+	"""
+
+	def __init__(
+		self, engine: str = "list", max_sessions: int = 100000, record_dir: Optional[str] = None,
+		max_board_spaces: int = MAX_BOARD_SPACES, max_win_length: int = MAX_WIN_LENGTH
+	) -> None:
+		"""Initializes a server with no sessions.
+
+		:param engine: a key of ENGINES, the board engine used for new games.
+		:param max_sessions: the most sessions held at once; creating more is refused with status 503.
+		:param record_dir: an optional directory to archive finished games in, as games_<width>x<height>x<win_length>.rec
+		:param max_board_spaces: the most spaces (width * height) on the board of a new game; larger boards are
+			refused with status 400.
+		:param max_win_length: the longest win length of a new game; longer ones are refused with status 400.
+		"""
+
+		if engine not in ENGINES:
+			raise ValueError(f"Unknown engine {engine!r}, expected one of {sorted(ENGINES)}")
+
+		self.engine = ENGINES[engine]
+		self.max_sessions = max_sessions
+		self.max_board_spaces = max_board_spaces
+		self.max_win_length = max_win_length
+		self.sessions = {}
+		self.requests_served = 0
+		self._session_ids = itertools.count(1)
+		self.record_dir = record_dir
+		# Open record writers, by (width, height, win_length)
+		self.recorders = {}
+
+	def createSession(self, options: dict) -> GameSession:
+		"""Creates a new session from the options of a POST /games request, and lets the bot open if it plays first.
+
+		:param options: the request body, with optional "width", "height", "win_length" and "bot" keys.
+		:return: the new session.
+		"""
+
+		if len(self.sessions) >= self.max_sessions:
+			raise RequestError(503, f"The server is already hosting {self.max_sessions} games")
+
+		bot_sides = {"player_0": TicTacToe.TicTacToe.PLAYER_0, "player_1": TicTacToe.TicTacToe.PLAYER_1, None: None}
+		bot = options.get("bot", "player_1")
+		if bot not in bot_sides:
+			raise RequestError(400, "\"bot\" must be \"player_0\", \"player_1\" or null")
+
+		size = []
+		for key in ("width", "height", "win_length"):
+			value = options.get(key, 3)
+			if not isinstance(value, int) or isinstance(value, bool):
+				raise RequestError(400, f"\"{key}\" must be an integer")
+			size.append(value)
+		# Checked before the engine is built, as building a huge board would stall every other connection
+		if size[0] * size[1] > self.max_board_spaces:
+			raise RequestError(400, f"The board can have at most {self.max_board_spaces} spaces, was given {size[0]}x{size[1]}")
+		if size[2] > self.max_win_length:
+			raise RequestError(400, f"The win length can be at most {self.max_win_length}, was given {size[2]}")
+		try:
+			game = self.engine(*size)
+		except ValueError as error:
+			raise RequestError(400, str(error))
+
+		session = GameSession(format(next(self._session_ids), "x"), game, bot_sides[bot])
+		session.playBotMoves()
+		self.sessions[session.session_id] = session
+		if game.game_state != game.GAME_IN_PROGRESS:
+			self.archiveGame(game)
+
+		return session
+
+	def archiveGame(self, game: TicTacToe.TicTacToe) -> None:
+		"""Appends a finished game to the record file for its board size, if the server archives games.
+		Boards too large for the record format are not archived.
+		Makes no return.
+
+		:param game: the finished game.
+		"""
+
+		if self.record_dir is None or game.num_spaces > MAX_SPACES:
+			return
+
+		size = (game.width, game.height, game.win_length)
+		if size not in self.recorders:
+			os.makedirs(self.record_dir, exist_ok=True)
+			path = os.path.join(self.record_dir, "games_{}x{}x{}.rec".format(*size))
+			self.recorders[size] = GameRecordWriter(path, *size)
+		self.recorders[size].writeGame(game)
+
+	def closeRecords(self) -> None:
+		"""Writes any buffered records and closes the record files.
+		Makes no return.
+		"""
+
+		for recorder in self.recorders.values():
+			recorder.close()
+		self.recorders.clear()
+
+	def handleRequest(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, object]]:
+		"""Routes one request to the matching session operation.
+
+		:param method: the HTTP method, ex "POST".
+		:param path: the request path, ex "/games/1f/moves".
+		:param body: the raw request body.
+		:return: the status code and the JSON-serializable payload of the response.
+		"""
+
+		try:
+			parts = [part for part in path.split("?", 1)[0].split("/") if part]
+			options = self.parseBody(body)
+
+			if parts == ["games"]:
+				if method != "POST":
+					raise RequestError(405, "Use POST to create a game")
+				return 201, self.createSession(options).toJson()
+
+			if parts == ["bot-moves"]:
+				if method != "POST":
+					raise RequestError(405, "Use POST to ask for bot moves")
+				return 200, self.batchBotMoves(options)
+
+			if parts == ["stats"]:
+				if method != "GET":
+					raise RequestError(405, "Use GET to read the stats")
+				return 200, {"sessions": len(self.sessions), "requests_served": self.requests_served}
+
+			if len(parts) in (2, 3) and parts[0] == "games":
+				session = self.sessions.get(parts[1])
+				if session is None:
+					raise RequestError(404, f"There is no game with id {parts[1]!r}")
+
+				if len(parts) == 2:
+					if method == "GET":
+						return 200, session.toJson()
+					if method == "DELETE":
+						del self.sessions[session.session_id]
+						return 200, {"id": session.session_id, "deleted": True}
+					raise RequestError(405, "Use GET or DELETE on a game")
+
+				if parts[2] == "moves":
+					if method != "POST":
+						raise RequestError(405, "Use POST to play a move")
+					row, col = options.get("row"), options.get("col")
+					if not all(isinstance(value, int) and not isinstance(value, bool) for value in (row, col)):
+						raise RequestError(400, "\"row\" and \"col\" must be integers")
+					session.playMove(row, col)
+					if session.game.game_state != session.game.GAME_IN_PROGRESS:
+						self.archiveGame(session.game)
+					return 200, session.toJson()
+
+				if parts[2] == "analysis":
+					if method != "GET":
+						raise RequestError(405, "Use GET to analyze a game")
+					return 200, session.analysisJson()
+
+			raise RequestError(404, f"There is no route for {path!r}")
+		except RequestError as error:
+			return error.status, {"error": str(error)}
+
+	@staticmethod
+	def batchBotMoves(options: dict) -> Dict[str, object]:
+		"""Picks the perfect-play bot's move for every 3x3 position of a POST /bot-moves request (see TicTacBatch.bestMoves).
+
+		Of equally good moves the lowest space is picked, so the same positions always get the same moves.
+
+		:param options: the request body, with the "boards" and the "players" to move.
+		:return: a JSON-serializable dict with the [row, col] of every move, or None where the game is over.
+		"""
+
+		try:
+			# Imported here, as NumPy is only needed for this route
+			import numpy as np
+			from TicTacBatch import NO_MOVE, bestMoves
+		except ImportError:
+			raise RequestError(501, "Batch bot moves need NumPy installed on the server")
+
+		boards, players = options.get("boards"), options.get("players", TicTacToe.TicTacToe.PLAYER_0)
+		if not isinstance(boards, list):
+			raise RequestError(400, "\"boards\" must be a list of boards")
+		if not boards:
+			return {"moves": []}
+		try:
+			moves = bestMoves(np.array(boards, dtype=np.int8), np.array(players, dtype=np.int8))
+		except (ValueError, TypeError, OverflowError) as error:
+			raise RequestError(400, f"Invalid boards or players: {error}")
+
+		return {"moves": [None if move == NO_MOVE else list(divmod(move, 3)) for move in moves.tolist()]}
+
+	@staticmethod
+	def parseBody(body: bytes) -> dict:
+		"""Decodes a JSON object request body; an empty body is an empty object.
+
+		:param body: the raw request body.
+		:return: the decoded object.
+		"""
+
+		if not body:
+			return {}
+		try:
+			options = json.loads(body)
+		except (UnicodeDecodeError, ValueError):
+			raise RequestError(400, "The request body is not valid JSON")
+		if not isinstance(options, dict):
+			raise RequestError(400, "The request body must be a JSON object")
+
+		return options
+
+	async def handleConnection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		"""Reads requests from one connection and writes their responses until the connection closes.
+		Makes no return.
+
+		:param reader: the stream of the connection's incoming bytes.
+		:param writer: the stream for the connection's outgoing bytes.
+		"""
+
+		try:
+			while True:
+				try:
+					head = await reader.readuntil(b"\r\n\r\n")
+				except asyncio.IncompleteReadError:
+					break
+				except asyncio.LimitOverrunError:
+					await self.writeResponse(writer, 413, {"error": "The request head is too large"}, False)
+					break
+
+				lines = head.decode("latin-1").split("\r\n")
+				request_line = lines[0].split()
+				headers = {}
+				for line in lines[1:]:
+					name, _, value = line.partition(":")
+					headers[name.strip().lower()] = value.strip()
+
+				if len(request_line) != 3:
+					await self.writeResponse(writer, 400, {"error": "Malformed request line"}, False)
+					break
+				method, path, version = request_line
+
+				try:
+					length = int(headers.get("content-length", "0"))
+				except ValueError:
+					length = -1
+				if not 0 <= length <= MAX_BODY_BYTES:
+					await self.writeResponse(writer, 413, {"error": "Invalid or too large Content-Length"}, False)
+					break
+				try:
+					body = await reader.readexactly(length) if length else b""
+				except asyncio.IncompleteReadError:
+					break
+
+				connection = headers.get("connection", "").lower()
+				keep_alive = connection != "close" and (version != "HTTP/1.0" or connection == "keep-alive")
+
+				status, payload = self.handleRequest(method, path, body)
+				self.requests_served += 1
+				await self.writeResponse(writer, status, payload, keep_alive)
+				if not keep_alive:
+					break
+		except ConnectionError:
+			pass
+		finally:
+			writer.close()
+
+	@staticmethod
+	async def writeResponse(writer: asyncio.StreamWriter, status: int, payload: dict, keep_alive: bool) -> None:
+		"""Writes one JSON response.
+		Makes no return.
+
+		:param writer: the stream for the connection's outgoing bytes.
+		:param status: the HTTP status code.
+		:param payload: the JSON-serializable response body.
+		:param keep_alive: False to tell the client the connection will close.
+		"""
+
+		body = json.dumps(payload, separators=(",", ":")).encode()
+		head = (
+			f"HTTP/1.1 {status} {STATUS_REASONS[status]}\r\n"
+			f"Content-Type: application/json\r\n"
+			f"Content-Length: {len(body)}\r\n"
+			f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+		)
+		writer.write(head.encode("latin-1") + body)
+		await writer.drain()
+
+	async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+		"""Starts listening for connections; the perfect-play table is loaded first so no request waits on it.
+
+		:param host: the address to listen on.
+		:param port: the port to listen on, or 0 to pick a free port.
+		:return: the started asyncio server.
+		"""
+
+		PerfectPlayTable.shared()
+		return await asyncio.start_server(self.handleConnection, host, port, limit=MAX_HEADER_BYTES)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	"""Runs the server from the command line until interrupted.
+
+	:param argv: the command line arguments, defaults to sys.argv.
+	:return: the exit code.
+	"""
+
+	parser = argparse.ArgumentParser(description="Local HTTP/JSON server hosting tic-tac-toe games.")
+	parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default 127.0.0.1)")
+	parser.add_argument("--port", type=int, default=8080, help="port to listen on (default 8080)")
+	parser.add_argument("--engine", choices=sorted(ENGINES), default="list", help="board engine for new games")
+	parser.add_argument("--max-sessions", type=int, default=100000, help="most games hosted at once")
+	parser.add_argument("--record-dir", help="archive finished games to record files in this directory")
+	parser.add_argument(
+		"--max-board-spaces", type=int, default=MAX_BOARD_SPACES,
+		help=f"most spaces on the board of a new game (default {MAX_BOARD_SPACES})"
+	)
+	parser.add_argument(
+		"--max-win-length", type=int, default=MAX_WIN_LENGTH,
+		help=f"longest win length of a new game (default {MAX_WIN_LENGTH})"
+	)
+	args = parser.parse_args(argv)
+
+	game_server = TicTacServer(args.engine, args.max_sessions, args.record_dir, args.max_board_spaces, args.max_win_length)
+
+	async def serve() -> None:
+		server = await game_server.start(args.host, args.port)
+		print(f"Serving tic-tac-toe on http://{args.host}:{server.sockets[0].getsockname()[1]}")
+		async with server:
+			await server.serve_forever()
+
+	try:
+		asyncio.run(serve())
+	except KeyboardInterrupt:
+		pass
+	finally:
+		game_server.closeRecords()
+
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,233 @@
+"""Contains the solved perfect-play table used by the tic-tac-toe bot.
+	- PerfectPlayTable: best moves and outcomes for every 3x3 position, generated by exhaustive search and cached on disk.
+"""
+
+import os
+import sys
+import threading
+from array import array
+from typing import Optional, Tuple
+
+
+##########################################################################################
+
+class PerfectPlayTable:
+	"""Holds the game-theoretic outcome and best moves of every 3x3 tic-tac-toe position, for either player to move.
+
+	Positions are indexed as a base-3 number, where space (row * 3 + col) is the digit for 3 ** (row * 3 + col),
+	and the digit is 0 for a blank space, 1 for player 0 and 2 for player 1.  Every one of the 3 ** 9 boards is
+	included (not only the reachable ones), so any board that callers set up can be answered.
+
+	Each entry is a 16-bit integer for one (position, player to move) pair:
+		- bits 0-8: mask of the best moves, bit (row * 3 + col) set for each best space
+		- bits 9-10: outcome for the player to move (LOSS, DRAW, WIN, or GAME_OVER if there is nothing to play)
+		- bits 11-14: number of moves until that outcome with perfect play from both sides
+
+	Included methods:
+		- __init__(self, entries)
+		- shared(cls) - returns the table for this process, loading or generating the cache file on first use
+		- loadOrGenerate(cls, path) - loads the table from path, regenerating and saving it if it is missing or invalid
+		- load(cls, path) - loads a table from a cache file
+		- generate(cls) - builds the table by exhaustive search
+		- save(self, path) - writes the table to a cache file
+		- bestMoves(self, index, side) - returns the mask of best moves for a position
+		- outcome(self, index, side) - returns the outcome and distance to it for a position
+	"""
+
+	# Outcomes, from the point of view of the player to move
+	LOSS = 0
+	DRAW = 1
+	WIN = 2
+	GAME_OVER = 3
+
+	NUM_SPACES = 9
+	NUM_POSITIONS = 3 ** NUM_SPACES
+	# Space indexes of every row, column and diagonal
+	LINES = ((0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6))
+
+	# Cache file layout: FILE_MAGIC followed by the entries as little-endian 16-bit integers
+	FILE_MAGIC = b"TTTPPT01"
+	DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "TicTacToe_table.bin")
+
+	_shared = None
+	# Held while the shared table is loaded, so threads asking for it at once only load (or generate) it once
+	_shared_lock = threading.Lock()
+
+	def __init__(self, entries: array) -> None:
+		"""Initializes the table from its entries.
+
+		:param entries: an array('H') of 2 * NUM_POSITIONS entries, player 0 to move first, then player 1 to move.
+		"""
+
+		if len(entries) != 2 * self.NUM_POSITIONS:
+			raise ValueError(f"Expected {2 * self.NUM_POSITIONS} table entries, got {len(entries)}")
+
+		self.entries = entries
+
+	@classmethod
+	def shared(cls) -> "PerfectPlayTable":
+		"""Returns the table for this process, loading (or generating) the cache file at DEFAULT_PATH on first use.
+		Safe to call from several threads; the table is never changed once loaded, so it can be read from all of them.
+
+		:return: the shared PerfectPlayTable.
+		"""
+
+		if cls._shared is None:
+			with cls._shared_lock:
+				if cls._shared is None:
+					cls._shared = cls.loadOrGenerate(cls.DEFAULT_PATH)
+
+		return cls._shared
+
+	@classmethod
+	def loadOrGenerate(cls, path: str) -> "PerfectPlayTable":
+		"""Loads the table from path; if the file is missing or invalid, generates the table and tries to save it.
+		A cache file that cannot be written (ex read-only install) is not an error, the table is just kept in memory.
+
+		:param path: location of the cache file.
+		:return: the loaded or generated PerfectPlayTable.
+		"""
+
+		try:
+			return cls.load(path)
+		except (OSError, ValueError):
+			pass
+
+		table = cls.generate()
+		try:
+			table.save(path)
+		except OSError:
+			pass
+
+		return table
+
+	@classmethod
+	def load(cls, path: str) -> "PerfectPlayTable":
+		"""Loads a table from a cache file written by save.
+
+		:param path: location of the cache file.
+		:return: the loaded PerfectPlayTable.
+		"""
+
+		with open(path, "rb") as file:
+			data = file.read()
+
+		if not data.startswith(cls.FILE_MAGIC):
+			raise ValueError(f"{path} is not a perfect-play table file")
+
+		entries = array("H")
+		entries.frombytes(data[len(cls.FILE_MAGIC):])
+		if sys.byteorder != "little":
+			entries.byteswap()
+
+		return cls(entries)
+
+	def save(self, path: str) -> None:
+		"""Writes the table to a cache file, replacing the file in a single step so readers never see a partial file.
+
+		:param path: location of the cache file.
+		"""
+
+		entries = array("H", self.entries)
+		if sys.byteorder != "little":
+			entries.byteswap()
+
+		temp_path = f"{path}.{os.getpid()}.tmp"
+		with open(temp_path, "wb") as file:
+			file.write(self.FILE_MAGIC)
+			file.write(entries.tobytes())
+		os.replace(temp_path, path)
+
+	@classmethod
+	def generate(cls) -> "PerfectPlayTable":
+		"""Builds the table by exhaustive negamax search over every board, for both players to move.
+
+		:return: the generated PerfectPlayTable.
+		"""
+
+		powers = [3 ** space for space in range(0, cls.NUM_SPACES)]
+		unsolved = 0xFFFF
+		entries = array("H", [unsolved]) * (2 * cls.NUM_POSITIONS)
+
+		def digits(index: int) -> list:
+			result = []
+			for _ in range(0, cls.NUM_SPACES):
+				index, digit = divmod(index, 3)
+				result.append(digit)
+			return result
+
+		def hasLine(board: list, digit: int) -> bool:
+			return any(board[a] == board[b] == board[c] == digit for a, b, c in cls.LINES)
+
+		def solve(index: int, side: int) -> int:
+			slot = side * cls.NUM_POSITIONS + index
+			if entries[slot] != unsolved:
+				return entries[slot]
+
+			board = digits(index)
+			if hasLine(board, 1) or hasLine(board, 2) or 0 not in board:
+				entries[slot] = cls.GAME_OVER << 9
+				return entries[slot]
+
+			mover = side + 1
+			best_score = None
+			best_mask = 0
+			best_outcome = best_distance = 0
+			for space in range(0, cls.NUM_SPACES):
+				if board[space] != 0:
+					continue
+
+				board[space] = mover
+				if hasLine(board, mover):
+					outcome, distance = cls.WIN, 1
+				elif 0 not in board:
+					outcome, distance = cls.DRAW, 1
+				else:
+					reply = solve(index + mover * powers[space], 1 - side)
+					outcome = cls.WIN - (reply >> 9 & 0b11)
+					distance = (reply >> 11 & 0b1111) + 1
+				board[space] = 0
+
+				# Prefer wins, then draws, then losses; win as fast as possible and lose as slowly as possible
+				score = (outcome - cls.DRAW) * (20 - distance) if outcome != cls.DRAW else 0
+				if best_score is None or score > best_score:
+					best_score = score
+					best_mask = 1 << space
+					best_outcome, best_distance = outcome, distance
+				elif score == best_score:
+					best_mask |= 1 << space
+
+			entries[slot] = best_mask | best_outcome << 9 | best_distance << 11
+			return entries[slot]
+
+		for index in range(0, cls.NUM_POSITIONS):
+			solve(index, 0)
+			solve(index, 1)
+
+		return cls(entries)
+
+	def bestMoves(self, index: int, side: int) -> int:
+		"""Returns the mask of best moves for a position.
+
+		:param index: the base-3 index of the position.
+		:param side: 0 if player 0 is to move, 1 if player 1 is to move.
+		:return: a 9-bit mask with bit (row * 3 + col) set for every best move; 0 if the game is already over.
+		"""
+
+		return self.entries[side * self.NUM_POSITIONS + index] & 0x1FF
+
+	def outcome(self, index: int, side: int) -> Tuple[int, Optional[int]]:
+		"""Returns the outcome of a position with perfect play, from the point of view of the player to move.
+
+		:param index: the base-3 index of the position.
+		:param side: 0 if player 0 is to move, 1 if player 1 is to move.
+		:return: (outcome, distance) where outcome is LOSS, DRAW, WIN or GAME_OVER,
+			and distance is the number of moves until that outcome (None for GAME_OVER).
+		"""
+
+		entry = self.entries[side * self.NUM_POSITIONS + index]
+		outcome = entry >> 9 & 0b11
+		if outcome == self.GAME_OVER:
+			return outcome, None
+
+		return outcome, entry >> 11 & 0b1111
@@ -1,12 +1,133 @@
 ﻿"""Contains the classes to run tic-tac-toe games.
+	- GameStats: opt-in timings and branch counters for a game (see TicTacToe.enableInstrumentation).
 	- TicTacToe: master class to be used for backend on any platform.
+	- TicTacBitboard: child class of TicTacToe that stores the board as bitboards for faster win detection.
 	- TicTacTerminal: child class of TicTacToe to be used for terminal-based games.
 """
 
 import random
 import os
-from math import floor
-from typing import Tuple, Optional, Union
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from functools import wraps
+from itertools import chain
+from typing import Iterable, List, Optional, TextIO, Tuple, Union
+from TicTacSolver import PerfectPlayTable
+
+
+##########################################################################################
+
+class GameStats:
+	"""Collects the timings and branch counters of instrumented games.
+	One GameStats can be shared by many games to collect totals for all of them.
+
+	Timings keep a histogram of durations in power-of-two nanosecond buckets, so tail latencies can be read
+	without storing every sample.  Recording is guarded by a lock, so games played in different threads can
+	share one GameStats.
+
+	Included methods:
+		- __init__(self)
+		- addTiming(self, name, nanoseconds) - records one call of a timed method
+		- count(self, name, hits=1) - adds hits to a counter
+		- snapshot(self) - returns the timings and counters as a dict
+		- reset(self) - clears the timings and counters
+	"""
+
+	def __init__(self) -> None:
+		"""Initializes empty timings and counters."""
+
+		self._lock = threading.Lock()
+		self.reset()
+
+	def reset(self) -> None:
+		"""Clears the timings and counters.
+		Makes no return.
+		"""
+
+		with self._lock:
+			# [calls, total nanoseconds, max nanoseconds, histogram by nanoseconds.bit_length()] for each timed name
+			self.timings = {}
+			self.counters = {}
+
+	def addTiming(self, name: str, nanoseconds: int) -> None:
+		"""Records one call of a timed method.
+		Makes no return.
+
+		:param name: the name of the method.
+		:param nanoseconds: how long the call took.
+		"""
+
+		with self._lock:
+			timing = self.timings.get(name)
+			if timing is None:
+				timing = self.timings[name] = [0, 0, 0, [0] * 64]
+			timing[0] += 1
+			timing[1] += nanoseconds
+			if nanoseconds > timing[2]:
+				timing[2] = nanoseconds
+			timing[3][min(nanoseconds.bit_length(), 63)] += 1
+
+	def count(self, name: str, hits: int = 1) -> None:
+		"""Adds hits to a counter.
+		Makes no return.
+
+		:param name: the name of the counter, ex "botMove.table".
+		:param hits: the number of hits to add.
+		"""
+
+		with self._lock:
+			self.counters[name] = self.counters.get(name, 0) + hits
+
+	def snapshot(self) -> dict:
+		"""Summarizes the timings and counters.
+
+		:return: a JSON-serializable dict with "timings" (calls, total_ns, mean_ns, max_ns, and p50_ns and p99_ns
+			as the upper bound of their histogram bucket, for each timed method) and a copy of the "counters".
+		"""
+
+		with self._lock:
+			# Copied, so the summary can be worked out while other threads keep recording
+			timing_values = [(name, *timing[:3], list(timing[3])) for name, timing in self.timings.items()]
+			counters = dict(self.counters)
+
+		timings = {}
+		for name, calls, total, longest, histogram in timing_values:
+			percentiles = {}
+			for key, fraction in (("p50_ns", 0.50), ("p99_ns", 0.99)):
+				seen = 0
+				for bucket, hits in enumerate(histogram):
+					seen += hits
+					if seen >= fraction * calls:
+						percentiles[key] = min((1 << bucket) - 1, longest)
+						break
+			timings[name] = {"calls": calls, "total_ns": total, "mean_ns": total / calls, "max_ns": longest, **percentiles}
+
+		return {"timings": timings, "counters": counters}
+
+
+def _timedMethod(name: str, method):
+	"""Wraps a method so each call is timed into the game's stats.
+
+	:param name: the name the timings are recorded under.
+	:param method: the method to wrap.
+	:return: the wrapped method.
+	"""
+
+	perf_counter_ns = time.perf_counter_ns
+
+	@wraps(method)
+	def timed(self, *args, **kwargs):
+		start = perf_counter_ns()
+		try:
+			return method(self, *args, **kwargs)
+		finally:
+			self.stats.addTiming(name, perf_counter_ns() - start)
+
+	return timed
 
 
 ##########################################################################################
@@ -15,47 +136,124 @@ class TicTacToe:
 	"""Contains the backend methods for running the TicTacToe game, to be inherited by platform-specific child classes.
 	Built to work with terminal, API, GUI, and any other platform.
 
+	The board defaults to the classic 3x3 with 3-in-a-row, but any width, height and win length
+	(an "m,n,k" game, ex 15x15 with five-in-a-row) is supported.
+
+	Games are kept small so that a process can hold many of them: the player values and game states are
+	class attributes, instances use __slots__, the per-size line geometry is shared between games of the same size,
+	and the move history is stored packed as an array of space indexes (row * width + col).
+
+	Every game keeps a 64-bit Zobrist hash of its position: the XOR of a fixed random key for each (space, player)
+	on the board.  updateBoard changes it with two XORs, so positions can be used as dictionary keys cheaply.
+	The keys are drawn from a generator seeded by the board size, so hashes are the same in every process.
+
+	The bots draw their random choices from the game's own rng, which can be given (seeded) to replay a game's moves
+	exactly.  Threading model: a game has no locks, so each game must only be used by one thread at a time (ex one
+	game per session or per worker thread), but different games can be played in parallel threads, including on
+	free-threaded builds of Python.  Games share no mutable state while they play: the line geometry, Zobrist keys
+	and PerfectPlayTable shared between games are never changed once built (a race only builds the same value
+	twice), and the analyzePosition cache and GameStats are guarded by locks.
+
 	Included methods:
-		- __init__(self)
+		- __init__(self, width=3, height=3, win_length=3, rng=None)
 		- gameName(self) - returns the name of the game (namely, the name "Tic-Tac-Toe")
+		- rng - property holding the game's random generator, created on first use if none was given
+		- move_history - property converting the packed move history to and from a list of (row, col)
+		- setBoardSize(self, width, height, win_length) - changes the board size and resets the game
 		- emptyBoard(self) - generates an empty board
 		- checkValidMove(self, row, col) - returns "True" if a move is valid
+		- legalMoves(self) - lists every open space
 		- updateBoard(self, row, col, player_icon) - assigns player icon to a given space
+		- undoMove(self) - takes back the last updateBoard
+		- isWinningMove(self, row, col, player_value) - returns "True" if a space completes a line for a player
+		- checkLastMove(self, row, col, player_value) - determines if the last move won or drew the game
 		- checkBoard(self) - determines if the game has been won or drawn
+		- positionIndex(self) - encodes the board as the index used by the perfect-play table
+		- positionHash(self) - returns the Zobrist hash of the position
+		- canonicalHash(self) - returns the smallest Zobrist hash of the position under the board symmetries
+		- analyzePosition(self, player_value, time_limit=1.0) - scores every legal move, from a shared LRU cache
 		- botMove(self, player_icon) - brains of the bot for single-player mode
+		- greedyBotMove(self, player_icon) - a simple win/block/center bot for boards of any size
+		- heuristicBotMove(self, player_icon) - the original rules-based bot
 		- resetGame(self) - resets the board and game state, typically at the end of a game
+		- snapshot(self) - encodes the game in the compact snapshot format
+		- restoreSnapshot(self, data) - loads a snapshot into the game by replaying its move history
+		- fromSnapshot(cls, data, **kwargs) - creates a game from a snapshot
+		- enableInstrumentation(self, stats=None) - starts timing the TIMED_METHODS and counting bot branches
+		- disableInstrumentation(self) - stops the instrumentation
+		- countBranch(self, name) - counts a hit on a branch, if instrumentation is enabled
 	"""
 
-	def __init__(self) -> None:
+	__slots__ = (
+		"width", "height", "win_length", "num_spaces", "classic_board", "space_rays",
+		"board", "_moves", "game_state", "filled_spaces", "_counted_board", "stats", "zobrist_keys", "_hash",
+		"_undo", "_rng"
+	)
+
+	# Player values
+	BLANK_POS = 0x0
+	PLAYER_0 = -0x1
+	PLAYER_1 = 0x1
+	# Game States
+	GAME_IN_PROGRESS = 0x10
+	PLAYER_0_WINNER = 0x20
+	PLAYER_1_WINNER = 0x30
+	DRAW_GAME = 0x40
+
+	# (row, col) steps of the four line directions: across, down, and both diagonals
+	LINE_DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+	# Most board shapes kept in each of the shape caches before the least recently used is dropped
+	SHAPE_CACHE_SIZE = 16
+	# The space_rays of recently built board sizes, by (width, height, win_length), shared by all games
+	_space_rays_cache = OrderedDict()
+	# The (zobrist_keys, symmetry keys) of recently built board shapes, by (width, height), shared by all games
+	_zobrist_cache = OrderedDict()
+	# Held while the shape caches are read or changed, as games in different threads share them
+	_shape_lock = threading.Lock()
+	# Start of every snapshot, then the width, height, win length, game state, position hash and number of moves
+	SNAPSHOT_MAGIC = b"TTS1"
+	SNAPSHOT_HEADER = struct.Struct("<4sHHHBQI")
+	# Bits of an undo entry holding the game state; the rest hold the replaced space's value plus one
+	UNDO_STATE_MASK = 0xF0
+	# Most positions kept by analyzePosition before the least recently used is dropped
+	ANALYSIS_CACHE_SIZE = 65536
+	# The analyses of recently analyzed positions, by (width, height, win_length, player_value, positionHash())
+	_analysis_cache = OrderedDict()
+	# Held while _analysis_cache is read or changed, as games in different threads share it
+	_analysis_lock = threading.Lock()
+	# Methods timed by enableInstrumentation
+	TIMED_METHODS = ("updateBoard", "checkBoard", "botMove")
+	# The instrumented subclass of each class, by class
+	_instrumented_classes = {}
+
+	def __init__(self, width: int = 3, height: int = 3, win_length: int = 3, rng: Optional[random.Random] = None) -> None:
 		"""Initializes the attributes for a TicTacToe game.
 
 		Initializes TicTacToe instance with:
-			- the player values, in hex codes
-			- the available game states, in hex codes, including:
-				- a game-in-progress state
-				- one win state for each player
-				- a draw state
+			- the board size and the number in a row needed to win
 			- an empty board (using emptyBoard method)
 			- the beginning game state (game in progress)
 			- the move history list (empty at start)
+			- the count of filled spaces (zero at start)
+			- the random generator for the bots' choices
+
+		:param width: the number of columns on the board.
+		:param height: the number of rows on the board.
+		:param win_length: the number of spaces in a row (across, down or diagonal) needed to win.
+		:param rng: the random generator the bots draw from, ex random.Random(seed) to replay a game;
+			defaults to a new unseeded one, created on first use.
 		"""
 
-		# Player values
-		self.BLANK_POS = 0x0
-		self.PLAYER_0 = -0x1
-		self.PLAYER_1 = 0x1
-		# Game States
-		self.GAME_IN_PROGRESS = 0x10
-		self.PLAYER_0_WINNER = 0x20
-		self.PLAYER_1_WINNER = 0x30
-		self.DRAW_GAME = 0x40
+		# The player values and game states are class attributes (see the top of the class), in hex codes:
+		# a blank space and one value per player, then a game-in-progress state, one win state per player and a draw
 
-		# Initialize empty board and state
-		self.board = self.emptyBoard()
-		self.game_state = self.GAME_IN_PROGRESS
+		# Instrumentation is off until enableInstrumentation is called
+		self.stats = None
+		# Created by the rng property when first needed, so games whose bots never move do not carry one
+		self._rng = rng
 
-		# Initialize move history
-		self.move_history = []
+		# Initialize board size, then the empty board, state, move history and count of filled spaces
+		self.setBoardSize(width, height, win_length)
 
 	@staticmethod
 	def gameName() -> str:
@@ -65,17 +263,181 @@ class TicTacToe:
 
 		return "Tic-Tac-Toe"
 
+	@property
+	def move_history(self) -> List[Tuple[int, int]]:
+		"""Builds the move history as a list from the packed array of space indexes.  The list is read-only, as
+		changing it would not change the game: moves are made with updateBoard, or a whole history is assigned.
+
+		:return: a new read-only list of (row, col) for every move, oldest first.
+		"""
+
+		return _ReadOnlyHistory(divmod(space, self.width) for space in self._moves)
+
+	@move_history.setter
+	def move_history(self, moves: List[Tuple[int, int]]) -> None:
+		"""Replaces the move history.  The moves given cannot be undone, as what they replaced is not known.
+
+		:param moves: a list of (row, col) for every move, oldest first.
+		"""
+
+		self._moves = array("H" if self.num_spaces <= 0x10000 else "L", [row * self.width + col for row, col in moves])
+		# For each move made by updateBoard since, the game state before it OR-ed with the replaced value plus one
+		self._undo = array("B")
+
+	@property
+	def rng(self) -> random.Random:
+		"""Returns the random generator the bots draw from, creating an unseeded one on first use.
+
+		:return: the game's random.Random.
+		"""
+
+		if self._rng is None:
+			self._rng = random.Random()
+
+		return self._rng
+
+	@rng.setter
+	def rng(self, rng: random.Random) -> None:
+		"""Replaces the random generator the bots draw from, ex with random.Random(seed) to replay a game.
+
+		:param rng: the new random generator, or None for a new unseeded one on next use.
+		"""
+
+		self._rng = rng
+
+	@staticmethod
+	def _cachedShape(cache: OrderedDict, key: tuple, build) -> tuple:
+		"""Looks up the tables of a board shape in one of the shape caches, building them if they are not there.
+		Each cache keeps the SHAPE_CACHE_SIZE most recently used shapes; games keep their own references to the
+		tables, so dropping a shape only costs rebuilding it for the next game of that shape.
+
+		:param cache: the cache, ex TicTacToe._space_rays_cache.
+		:param key: the board shape, as the arguments of build.
+		:param build: builds the tables of a shape.
+		:return: the tables.
+		"""
+
+		with TicTacToe._shape_lock:
+			tables = cache.get(key)
+			if tables is not None:
+				cache.move_to_end(key)
+				return tables
+
+		# Built outside the lock, so two threads building one shape both build it, and the last is kept
+		tables = build(*key)
+		with TicTacToe._shape_lock:
+			cache[key] = tables
+			while len(cache) > TicTacToe.SHAPE_CACHE_SIZE:
+				cache.popitem(last=False)
+
+		return tables
+
+	@classmethod
+	def _buildSpaceRays(cls, width: int, height: int, win_length: int) -> tuple:
+		"""Builds the space_rays of a board shape.
+
+		:param width: the number of columns on the board.
+		:param height: the number of rows on the board.
+		:param win_length: the number of spaces in a row needed to win.
+		:return: for each space (row * width + col), the pair of rays of spaces leading away from it in each direction
+			that has room for a full line, up to (win_length - 1) spaces long, used by isWinningMove.
+		"""
+
+		space_rays = []
+		for row in range(0, height):
+			for col in range(0, width):
+				pairs = []
+				for row_step, col_step in cls.LINE_DIRECTIONS:
+					rays = []
+					for direction in (1, -1):
+						ray = []
+						for distance in range(1, win_length):
+							ray_row = row + row_step * direction * distance
+							ray_col = col + col_step * direction * distance
+							if not (0 <= ray_row < height and 0 <= ray_col < width):
+								break
+							ray.append((ray_row, ray_col))
+						rays.append(tuple(ray))
+					# A direction without room for a full line can never win, so it is left out
+					if len(rays[0]) + len(rays[1]) + 1 >= win_length:
+						pairs.append(tuple(rays))
+				space_rays.append(tuple(pairs))
+
+		return tuple(space_rays)
+
+	@staticmethod
+	def _buildZobristKeys(width: int, height: int) -> tuple:
+		"""Builds the Zobrist keys of a board shape.  The keys are drawn from a generator seeded by the shape, so a
+		shape dropped from the cache is rebuilt with the same keys.
+
+		:param width: the number of columns on the board.
+		:param height: the number of rows on the board.
+		:return: (zobrist_keys, symmetry keys): the keys of each space, and for each board symmetry the keys of the
+			space each space is mapped to.
+		"""
+
+		# For each space, its keys indexed by player value: index 0 (BLANK_POS) is 0 so blanks leave the hash
+		# alone, index 1 is PLAYER_1's key and index -1 (the last) is PLAYER_0's key
+		rng = random.Random(f"zobrist-{width}x{height}")
+		zobrist_keys = tuple((0, rng.getrandbits(64), rng.getrandbits(64)) for _ in range(0, width * height))
+		# For each board symmetry, the keys of the space each space is mapped to
+		transforms = [
+			lambda row, col: (row, col),
+			lambda row, col: (row, width - 1 - col),
+			lambda row, col: (height - 1 - row, col),
+			lambda row, col: (height - 1 - row, width - 1 - col)
+		]
+		if width == height:
+			transforms += [
+				lambda row, col: (col, row),
+				lambda row, col: (width - 1 - col, height - 1 - row),
+				lambda row, col: (col, height - 1 - row),
+				lambda row, col: (width - 1 - col, row)
+			]
+		symmetry_keys = []
+		for transform in transforms:
+			image_keys = []
+			for space in range(0, width * height):
+				image_row, image_col = transform(*divmod(space, width))
+				image_keys.append(zobrist_keys[image_row * width + image_col])
+			symmetry_keys.append(tuple(image_keys))
+
+		return zobrist_keys, tuple(symmetry_keys)
+
+	def setBoardSize(self, width: int, height: int, win_length: int) -> None:
+		"""Sets the size of the board and the number in a row needed to win, then resets the game.
+		Makes no return.
+
+		:param width: the number of columns on the board.
+		:param height: the number of rows on the board.
+		:param win_length: the number of spaces in a row (across, down or diagonal) needed to win.
+		"""
+
+		if width < 1 or height < 1:
+			raise ValueError(f"The board must be at least 1x1, was given {width}x{height}")
+		if not 1 <= win_length <= max(width, height):
+			raise ValueError(f"The win length must be between 1 and {max(width, height)}, was given {win_length}")
+
+		self.width = width
+		self.height = height
+		self.win_length = win_length
+		self.num_spaces = width * height
+		size = (width, height, win_length)
+		# The perfect-play table and the rules-based bot only know the classic 3x3 game
+		self.classic_board = size == (3, 3, 3)
+
+		self.space_rays = self._cachedShape(self._space_rays_cache, size, self._buildSpaceRays)
+		self.zobrist_keys = self._cachedShape(self._zobrist_cache, (width, height), self._buildZobristKeys)[0]
+
+		self.resetGame()
+
 	def emptyBoard(self) -> list:
 		"""Creates an empty board for the start of a new game.
 
 		:return: an empty self.board object.
 		"""
 
-		return [
-			[self.BLANK_POS, self.BLANK_POS, self.BLANK_POS],
-			[self.BLANK_POS, self.BLANK_POS, self.BLANK_POS],
-			[self.BLANK_POS, self.BLANK_POS, self.BLANK_POS]
-		]
+		return [[self.BLANK_POS] * self.width for _ in range(0, self.height)]
 
 	def checkValidMove(self, row: int, col: int) -> bool:
 		"""Determines if a given move is allowed, then returns a boolean (True for valid, False for invalid).
@@ -87,6 +449,17 @@ class TicTacToe:
 
 		return self.board[row][col] == self.BLANK_POS
 
+	def legalMoves(self) -> List[Tuple[int, int]]:
+		"""Lists every open space, in row order.
+
+		:return: a list of (row, col) for each space where a move is valid.
+		"""
+
+		blank = self.BLANK_POS
+		return [
+			(row, col) for row, board_row in enumerate(self.board) for col, value in enumerate(board_row) if value == blank
+		]
+
 	def updateBoard(self, row: int, col: int, player_value: int) -> None:
 		"""Updates the board and move history with new moves.
 
@@ -95,6 +468,12 @@ class TicTacToe:
 		appends move to move_history,
 		and checks for wins.
 
+		Only the lines through the updated space are checked (see checkLastMove), draws are detected from
+		the filled_spaces counter, and the position hash is updated with the keys of the old and new values.
+		If the board was replaced since it was last counted, the whole board is checked and rehashed instead
+		(see checkBoard), so spaces should be changed through updateBoard rather than by item assignment.
+		What the move replaced is recorded so that undoMove can take it back.
+
 		Makes no return.
 
 		:param row: the row of the space to be updated.
@@ -105,9 +484,19 @@ class TicTacToe:
 		# Check that the passed player_value is a valid value
 		if player_value in (self.PLAYER_0, self.PLAYER_1, self.BLANK_POS):
 			# If value is valid, update board and move history, then check for a win
+			previous_value = self.board[row][col]
 			self.board[row][col] = player_value
-			self.move_history.append((row, col))
-			self.checkBoard()
+			space = row * self.width + col
+			self._moves.append(space)
+			self._undo.append(self.game_state | (previous_value + 1))
+			space_keys = self.zobrist_keys[space]
+			self._hash ^= space_keys[previous_value] ^ space_keys[player_value]
+			# A replaced board, or a cleared space that may have undone a win, needs the whole board checked
+			if self.board is not self._counted_board or player_value == self.BLANK_POS:
+				self.checkBoard()
+			else:
+				self.filled_spaces += previous_value == self.BLANK_POS
+				self.checkLastMove(row, col, player_value)
 		# If value is not valid, return an error
 		else:
 			err = (
@@ -117,66 +506,410 @@ class TicTacToe:
 
 			raise RuntimeError(err)
 
+	def undoMove(self) -> Tuple[int, int]:
+		"""Takes back the last move made by updateBoard, in constant time: the space gets back the value it had,
+		the move is removed from the move history, and the game state, filled_spaces and position hash are restored,
+		so look-ahead can make and unmake moves on the game instead of copying the board.
+
+		:return: (row, col) of the space that was restored.
+		"""
+
+		if not self._undo:
+			raise RuntimeError("There is no move to undo.")
+
+		space = self._moves.pop()
+		entry = self._undo.pop()
+		previous_value = (entry & ~self.UNDO_STATE_MASK) - 1
+		row, col = divmod(space, self.width)
+		value = self.board[row][col]
+		self.board[row][col] = previous_value
+		space_keys = self.zobrist_keys[space]
+		self._hash ^= space_keys[value] ^ space_keys[previous_value]
+		if self.board is self._counted_board:
+			self.filled_spaces += (previous_value != self.BLANK_POS) - (value != self.BLANK_POS)
+			self.game_state = entry & self.UNDO_STATE_MASK
+		else:
+			# The board was replaced since the move, so the recorded state may not be about this board
+			self.checkBoard()
+
+		return row, col
+
+	def isWinningMove(self, row: int, col: int, player_value: int) -> bool:
+		"""Determines if player_value in the given space makes a line of win_length, whether or not the space is filled.
+		Counts the run of matching spaces on both sides of the space in each of the four directions
+		(see space_rays), so the cost grows with win_length rather than with the size of the board.
+
+		:param row: the row of the space to be checked.
+		:param col: the column of the space to be checked.
+		:param player_value: the player value to check for.
+		:return: a boolean, True if the space completes a line for player_value.
+		"""
+
+		board = self.board
+		win_length = self.win_length
+		for forward, backward in self.space_rays[row * self.width + col]:
+			run = 1
+			for ray_row, ray_col in forward:
+				if board[ray_row][ray_col] != player_value:
+					break
+				run += 1
+			for ray_row, ray_col in backward:
+				if board[ray_row][ray_col] != player_value:
+					break
+				run += 1
+			if run >= win_length:
+				return True
+
+		return False
+
+	def checkLastMove(self, row: int, col: int, player_value: int) -> None:
+		"""Checks only the lines passing through the last move for a win, then the filled_spaces counter for a draw.
+		It then sets the game_state attribute accordingly.  A game that has already been won stays won.
+		Makes no return.
+
+		:param row: the row of the last move.
+		:param col: the column of the last move.
+		:param player_value: the player value placed by the last move.
+		"""
+
+		if self.game_state in (self.PLAYER_0_WINNER, self.PLAYER_1_WINNER):
+			return
+
+		if self.isWinningMove(row, col, player_value):
+			self.game_state = self.PLAYER_0_WINNER if player_value == self.PLAYER_0 else self.PLAYER_1_WINNER
+		elif self.filled_spaces == self.num_spaces:
+			self.game_state = self.DRAW_GAME
+		else:
+			self.game_state = self.GAME_IN_PROGRESS
+
 	def checkBoard(self) -> None:
 		"""Checks the board for endgame scenarios; either a draw, or a win by either player.
 		It then sets the game_state attribute accordingly.
+		Also recounts the filled_spaces counter and the position hash kept up to date by updateBoard.
 		Takes no arguments and makes no return.
 		"""
 
-		# check for win in rows
-		for row in range(0, 3):
-			if self.board[row][0] == self.board[row][1] == self.board[row][2] == self.PLAYER_0:
-				self.game_state = self.PLAYER_0_WINNER
-				return
-			elif self.board[row][0] == self.board[row][1] == self.board[row][2] == self.PLAYER_1:
-				self.game_state = self.PLAYER_1_WINNER
-				return
-
-		# check for win in columns
-		for col in range(0, 3):
-			if self.board[0][col] == self.board[1][col] == self.board[2][col] == self.PLAYER_0:
-				self.game_state = self.PLAYER_0_WINNER
-				return
-			elif self.board[0][col] == self.board[1][col] == self.board[2][col] == self.PLAYER_1:
-				self.game_state = self.PLAYER_1_WINNER
-				return
-
-		# check for win in diagonals
-		if self.board[0][0] == self.board[1][1] == self.board[2][2] == self.PLAYER_0:
-			self.game_state = self.PLAYER_0_WINNER
-			return
-		if self.board[2][0] == self.board[1][1] == self.board[0][2] == self.PLAYER_0:
-			self.game_state = self.PLAYER_0_WINNER
-			return
-		if self.board[0][0] == self.board[1][1] == self.board[2][2] == self.PLAYER_1:
-			self.game_state = self.PLAYER_1_WINNER
-			return
-		if self.board[2][0] == self.board[1][1] == self.board[0][2] == self.PLAYER_1:
-			self.game_state = self.PLAYER_1_WINNER
-			return
+		# recount the filled spaces for checkLastMove, and rehash the board
+		self.filled_spaces = sum(1 for board_row in self.board for value in board_row if value != self.BLANK_POS)
+		self._counted_board = self.board
+		position_hash = 0
+		for space_keys, value in zip(self.zobrist_keys, chain.from_iterable(self.board)):
+			position_hash ^= space_keys[value]
+		self._hash = position_hash
+
+		# check for win in rows, columns and diagonals, by following the length of the run ending at each space
+		# in each direction (a run continues from the previous space in that direction if the values match)
+		board = self.board
+		for row_step, col_step in self.LINE_DIRECTIONS:
+			runs = [[0] * self.width for _ in range(0, self.height)]
+			for row in range(0, self.height):
+				for col in range(0, self.width):
+					value = board[row][col]
+					if value == self.BLANK_POS:
+						continue
+					previous_row, previous_col = row - row_step, col - col_step
+					if 0 <= previous_row and 0 <= previous_col < self.width and board[previous_row][previous_col] == value:
+						runs[row][col] = runs[previous_row][previous_col] + 1
+					else:
+						runs[row][col] = 1
+					if runs[row][col] >= self.win_length:
+						self.game_state = self.PLAYER_0_WINNER if value == self.PLAYER_0 else self.PLAYER_1_WINNER
+						return
 
 		# check if the board is full
-		for row in self.board:
-			for col in row:
-				if col == self.BLANK_POS:
-					self.game_state = self.GAME_IN_PROGRESS
-					return
+		if self.filled_spaces < self.num_spaces:
+			self.game_state = self.GAME_IN_PROGRESS
+			return
 
 		self.game_state = self.DRAW_GAME
 		return
 
+	def positionIndex(self) -> int:
+		"""Encodes the board as the base-3 position index used by PerfectPlayTable.
+		Space (row * 3 + col) is the digit for 3 ** (row * 3 + col): 0 for blank, 1 for player 0, 2 for player 1.
+		Only defined for the classic 3x3 board.
+
+		:return: the position index of the board.
+		"""
+
+		if not self.classic_board:
+			raise ValueError("Position indexes are only defined for the classic 3x3 board")
+
+		index = 0
+		for space in range(8, -1, -1):
+			value = self.board[space // 3][space % 3]
+			index = index * 3 + (1 if value == self.PLAYER_0 else 2 if value == self.PLAYER_1 else 0)
+
+		return index
+
+	def positionHash(self) -> int:
+		"""Returns the Zobrist hash of the position, kept up to date by updateBoard.
+		If the board was replaced since it was last counted, it is checked and rehashed first (see checkBoard).
+
+		:return: a 64-bit hash that is the same for the same stones on a board of the same width and height.
+		"""
+
+		if self.board is not self._counted_board:
+			self.checkBoard()
+
+		return self._hash
+
+	def canonicalHash(self) -> int:
+		"""Returns a hash that is the same for positions that are rotations or mirror images of each other:
+		the smallest Zobrist hash of the position's images under the board symmetries (8 for square boards, 4 otherwise).
+		Costs one pass over the board per symmetry, unlike positionHash.
+
+		:return: the smallest hash of the position's symmetric images.
+		"""
+
+		symmetry_keys = self._cachedShape(self._zobrist_cache, (self.width, self.height), self._buildZobristKeys)[1]
+		hashes = [0] * len(symmetry_keys)
+		for space, value in enumerate(chain.from_iterable(self.board)):
+			if value != self.BLANK_POS:
+				for index, image_keys in enumerate(symmetry_keys):
+					hashes[index] ^= image_keys[space][value]
+
+		return min(hashes)
+
+	def analyzePosition(
+		self, player_value: int, time_limit: float = 1.0
+	) -> Tuple[Tuple[Tuple[int, int], Optional[str], Optional[int]], ...]:
+		"""Scores every legal move for the player to move, best first.
+
+		On the classic 3x3 board every score is exact, from the PerfectPlayTable.  On other boards each move is
+		searched by AlphaBetaBot (see TicTacSearch.py), sharing time_limit between the moves; a result is only given
+		when the search proves it, so moves whose search ran out of time have a result of None.
+
+		Analyses are kept in an LRU cache shared by every game, keyed by the board size, the player and the
+		position hash, so repeated positions are answered without searching.  The cache is locked, so games in
+		different threads can share it.  Only analyses with a result for every move are cached, so a position whose
+		searches ran out of time is searched again the next time it is asked for.
+		If instrumentation is enabled, only the cache hit or miss is counted: the moves made and taken back while
+		analyzing are not recorded in the game's timings.
+
+		:param player_value: either self.PLAYER_0 or self.PLAYER_1, the player to move.
+		:param time_limit: the search time in seconds for the whole analysis, on boards other than 3x3.
+		:return: a tuple of ((row, col), result, distance) for every legal move, where result is "win", "draw",
+			"loss" or None and distance is the number of moves until the result with best play by both players,
+			counting the move itself; empty if the game is over.
+		"""
+
+		key = (self.width, self.height, self.win_length, player_value, self.positionHash())
+		cache = TicTacToe._analysis_cache
+		with TicTacToe._analysis_lock:
+			analysis = cache.get(key)
+			if analysis is not None:
+				cache.move_to_end(key)
+		if analysis is not None:
+			self.countBranch("analyzePosition.cache_hit")
+			return analysis
+
+		self.countBranch("analyzePosition.cache_miss")
+		# The moves tried while analyzing are not the game's own, so instrumentation is paused for the search
+		stats, cls = self.stats, type(self)
+		if stats is not None:
+			self.disableInstrumentation()
+		try:
+			if self.game_state != self.GAME_IN_PROGRESS:
+				analysis = ()
+			elif self.classic_board:
+				analysis = self._analyzeWithTable(player_value)
+			else:
+				analysis = self._analyzeWithSearch(player_value, time_limit)
+		finally:
+			if stats is not None:
+				self.__class__ = cls
+				self.stats = stats
+
+		if any(result is None for _, result, _ in analysis):
+			return analysis
+
+		# The search runs outside the lock, so two threads missing on one position both search it, and the last wins
+		with TicTacToe._analysis_lock:
+			cache[key] = analysis
+			while len(cache) > self.ANALYSIS_CACHE_SIZE:
+				cache.popitem(last=False)
+
+		return analysis
+
+	def _analyzeWithTable(self, player_value: int) -> Tuple[Tuple[Tuple[int, int], Optional[str], Optional[int]], ...]:
+		"""Scores every legal move on the classic board by making it and looking up the opponent's outcome.
+
+		:param player_value: the player to move.
+		:return: the analysis, as from analyzePosition.
+		"""
+
+		table = PerfectPlayTable.shared()
+		# The opponent's outcome after the move, as the result of the move
+		results = {PerfectPlayTable.WIN: "loss", PerfectPlayTable.DRAW: "draw", PerfectPlayTable.LOSS: "win"}
+		opponent_side = 1 if player_value == self.PLAYER_0 else 0
+
+		analysis = []
+		for row, col in self.legalMoves():
+			self.updateBoard(row, col, player_value)
+			if self.game_state == self.DRAW_GAME:
+				analysis.append(((row, col), "draw", 1))
+			elif self.game_state != self.GAME_IN_PROGRESS:
+				analysis.append(((row, col), "win", 1))
+			else:
+				outcome, distance = table.outcome(self.positionIndex(), opponent_side)
+				analysis.append(((row, col), results[outcome], distance + 1))
+			self.undoMove()
+
+		return self._sortAnalysis(analysis, {})
+
+	def _analyzeWithSearch(
+		self, player_value: int, time_limit: float
+	) -> Tuple[Tuple[Tuple[int, int], Optional[str], Optional[int]], ...]:
+		"""Scores every legal move by making it and searching the opponent's best reply with AlphaBetaBot.
+
+		:param player_value: the player to move.
+		:param time_limit: the search time in seconds for every move together; each search gets an equal share of
+			the time left, and once it has run out the remaining moves are not searched.
+		:return: the analysis, as from analyzePosition.
+		"""
+
+		# Imported here, as TicTacSearch imports this module
+		from TicTacSearch import AlphaBetaBot
+
+		deadline = time.perf_counter() + time_limit
+		moves = self.legalMoves()
+		bot = AlphaBetaBot(self)
+		analysis = []
+		# Search scores of moves without a proven result, from the mover's point of view, for ordering
+		scores = {}
+		for index, (row, col) in enumerate(moves):
+			self.updateBoard(row, col, player_value)
+			remaining = deadline - time.perf_counter()
+			if self.game_state == self.DRAW_GAME:
+				analysis.append(((row, col), "draw", 1))
+			elif self.game_state != self.GAME_IN_PROGRESS:
+				analysis.append(((row, col), "win", 1))
+			elif remaining <= 0:
+				analysis.append(((row, col), None, None))
+				scores[(row, col)] = 0
+			else:
+				empty_spaces = self.num_spaces - self.filled_spaces
+				bot.time_limit = remaining / (len(moves) - index)
+				bot.chooseMove(-player_value)
+				# The score is the opponent's; wins and losses are WIN_SCORE less the moves needed to reach them
+				score = bot.last_score
+				if bot.completed_depth == 0:
+					analysis.append(((row, col), None, None))
+					scores[(row, col)] = 0
+				elif score > bot.WIN_THRESHOLD:
+					analysis.append(((row, col), "loss", bot.WIN_SCORE - score + 1))
+				elif score < -bot.WIN_THRESHOLD:
+					analysis.append(((row, col), "win", bot.WIN_SCORE + score + 1))
+				elif bot.completed_depth == empty_spaces and not bot.neighbors_only:
+					analysis.append(((row, col), "draw", empty_spaces + 1))
+				else:
+					analysis.append(((row, col), None, None))
+					scores[(row, col)] = -score
+			self.undoMove()
+
+		return self._sortAnalysis(analysis, scores)
+
+	@staticmethod
+	def _sortAnalysis(
+		analysis: list, scores: dict
+	) -> Tuple[Tuple[Tuple[int, int], Optional[str], Optional[int]], ...]:
+		"""Orders an analysis best move first: the fastest wins, then draws, then unproven moves by search score,
+		then the slowest losses.
+
+		:param analysis: the ((row, col), result, distance) of every move.
+		:param scores: the search score of every move with a result of None.
+		:return: the sorted analysis, as a tuple so that it can be cached.
+		"""
+
+		def rank(entry: tuple) -> tuple:
+			move, result, distance = entry
+			if result == "win":
+				return 0, distance
+			if result == "draw":
+				return 1, 0
+			if result is None:
+				return 2, -scores[move]
+			return 3, -distance
+
+		return tuple(sorted(analysis, key=rank))
+
 	def botMove(self, bot_icon: int) -> Tuple[int, int]:
 		"""The brains of the most unbeatable bot this side of the singularity.
+		Looks up the best moves for the position in the solved PerfectPlayTable and picks one of them at random
+		(from the game's rng), so the bot always plays perfectly and every move costs the same.
+
+		On boards other than the classic 3x3 there is no table, so the bot takes a win if it has one,
+		otherwise blocks the opponent's win, otherwise plays as close to the center as it can.
+
+		:param bot_icon: either self.PLAYER_0 or self.PLAYER_1, used by the bot to distinguish user from bot.
+		:return: (row, col) as integers representing the row and column of bot's desired move.
+		"""
+
+		if not self.classic_board:
+			self.countBranch("botMove.greedy")
+			return self.greedyBotMove(bot_icon)
+
+		side = 0 if bot_icon == self.PLAYER_0 else 1
+		best_moves = PerfectPlayTable.shared().bestMoves(self.positionIndex(), side)
+		choices = [(space // 3, space % 3) for space in range(0, 9) if best_moves >> space & 1]
+		# The table has no best moves once the game is over; fall back to any open space
+		if not choices:
+			self.countBranch("botMove.fallback")
+			choices = self.legalMoves()
+			if not choices:
+				raise RuntimeError("Tried to pick a bot move but there are no open spaces.")
+		else:
+			self.countBranch("botMove.table")
+
+		return self.rng.choice(choices)
+
+	def greedyBotMove(self, bot_icon: int) -> Tuple[int, int]:
+		"""A simple bot for boards of any size: takes a win if it has one, otherwise blocks the opponent's win,
+		otherwise plays the open space closest to the center (at random between equally close spaces).
+
+		:param bot_icon: either self.PLAYER_0 or self.PLAYER_1, used by the bot to distinguish user from bot.
+		:return: (row, col) as integers representing the row and column of bot's desired move.
+		"""
+
+		not_bot_icon = self.PLAYER_1 if bot_icon == self.PLAYER_0 else self.PLAYER_0
+		open_spaces = self.legalMoves()
+		if not open_spaces:
+			raise RuntimeError("Tried to pick a bot move but there are no open spaces.")
+
+		for player_value, branch in ((bot_icon, "greedyBotMove.win"), (not_bot_icon, "greedyBotMove.block")):
+			for row, col in open_spaces:
+				if self.isWinningMove(row, col, player_value):
+					self.countBranch(branch)
+					return row, col
+
+		# Distances are doubled so that the center of an even-sized board stays a whole number
+		def centerDistance(space: Tuple[int, int]) -> int:
+			return max(abs(2 * space[0] - (self.height - 1)), abs(2 * space[1] - (self.width - 1)))
+
+		closest = min(centerDistance(space) for space in open_spaces)
+		self.countBranch("greedyBotMove.center")
+		return self.rng.choice([space for space in open_spaces if centerDistance(space) == closest])
+
+	def heuristicBotMove(self, bot_icon: int) -> Tuple[int, int]:
+		"""The original rules-based bot, kept as an alternative to the perfect-play botMove.
 		Well, at least, it's pretty good now.  Still room for improvement.
+		Only plays the classic 3x3 board.
 
 		:param bot_icon: either self.PLAYER_0 or self.PLAYER_1, used by the bot to distinguish user from bot.
 		:return: (row, col) as integers representing the row and column of bot's desired move.
 		"""
 
-		# Initialize valid_move as required by while loops
-		valid_move = False
-		# Initialize row and col, because it's the right thing to do
-		row, col = 0, 0
+		if not self.classic_board:
+			raise ValueError("The rules-based bot only plays the classic 3x3 board")
+
+		# Read the board once; every choice below is made from lists of open spaces rather than by retrying
+		# random spaces, so each decision takes a fixed amount of work
+		board = self.board
+		legal_moves = self.legalMoves()
+		move_history = self.move_history
+		if not legal_moves:
+			raise RuntimeError("Tried to pick a bot move but there are no open spaces.")
 		# Initialize not_bot_icon because who wants to read "self.PLAYER_1"
 		# and all the logic that goes into figuring out if that's even the right icon to use?
 		if bot_icon == self.PLAYER_0:
@@ -195,6 +928,7 @@ class TicTacToe:
 			[(0, 0), (1, 1), (2, 2)],
 			[(0, 2), (1, 1), (2, 0)]
 		]
+		CORNERS = ((0, 0), (0, 2), (2, 0), (2, 2))
 
 		# check bot win scenarios by looping through WIN_OPTIONS list
 		for option in WIN_OPTIONS:
@@ -203,15 +937,16 @@ class TicTacToe:
 			# determine what is in each space and record with score_keeper
 			# i is the individual space in any given win scenario, i[0] is row and i[1] is col
 			for i in option:
-				score_keeper[self.board[i[0]][i[1]]] += 1
+				score_keeper[board[i[0]][i[1]]] += 1
 
 			# If there are two bot icons set to win and a blank space available,
 			# take the blank space to win the game
 			if score_keeper[bot_icon] == 2 and score_keeper[self.BLANK_POS] == 1:
 				for i in option:
-					if self.board[i[0]][i[1]] == self.BLANK_POS:
+					if board[i[0]][i[1]] == self.BLANK_POS:
 						row = i[0]
 						col = i[1]
+						self.countBranch("heuristicBotMove.win")
 						return row, col
 		# check for bot loss scenarios by looping through WIN_OPTIONS list
 		for option in WIN_OPTIONS:
@@ -220,32 +955,32 @@ class TicTacToe:
 			# determine what is in each space and record with score_keeper
 			# i is the individual space in any given win scenario, i[0] is row and i[1] is col
 			for i in option:
-				score_keeper[self.board[i[0]][i[1]]] += 1
+				score_keeper[board[i[0]][i[1]]] += 1
 			# if there are two opponent icons set to win and a blank space available,
 			# select the blank space to block the opponent from winning
 			if score_keeper[not_bot_icon] == 2 and score_keeper[self.BLANK_POS] == 1:
 				for i in option:
-					if self.board[i[0]][i[1]] == self.BLANK_POS:
+					if board[i[0]][i[1]] == self.BLANK_POS:
 						row = i[0]
 						col = i[1]
+						self.countBranch("heuristicBotMove.block")
 						return row, col
 
+		open_corners = [space for space in CORNERS if space in legal_moves]
+
 		# Check for middle-opener edge-case
-		if bot_icon == self.PLAYER_1 and len(self.move_history) == 1:
-			if self.board[1][1] == self.PLAYER_0:
-				while not valid_move:
-					row = random.choice((0, 2))
-					col = random.choice((0, 2))
-					valid_move = self.checkValidMove(row, col)
-				return row, col
+		if bot_icon == self.PLAYER_1 and len(move_history) == 1:
+			if board[1][1] == self.PLAYER_0 and open_corners:
+				self.countBranch("heuristicBotMove.middle_opener")
+				return self.rng.choice(open_corners)
 
 		# Check for edge-cases (that happen on turn 3)
-		if bot_icon == self.PLAYER_1 and len(self.move_history) == 3:
+		if bot_icon == self.PLAYER_1 and len(move_history) == 3:
 			# Check for Double-Middle edge case: see board [[ ,X, ], [X,O, ], [ , ,O]]
 			# If player 0 plays in board[0][0], they are guaranteed a win scenario.  Avoid this trap.
-			if ((opp_move_1 := self.move_history[0])[0] + opp_move_1[1]) % 2 == 1:
+			if ((opp_move_1 := move_history[0])[0] + opp_move_1[1]) % 2 == 1:
 				# In this scenario, both of the user's moves are odd...
-				if ((opp_move_2 := self.move_history[2])[0] + opp_move_2[1]) % 2 == 1:
+				if ((opp_move_2 := move_history[2])[0] + opp_move_2[1]) % 2 == 1:
 					# ... and do not share a row or column.
 					if (opp_move_1[0] != opp_move_2[0]) and (opp_move_1[1] != opp_move_2[1]):
 						# Avoid the middle, and a second space that is calculated with MATH!
@@ -253,83 +988,55 @@ class TicTacToe:
 							3 - (opp_move_1[0] + opp_move_2[0]),
 							3 - (opp_move_1[1] + opp_move_2[1])
 						)
-						while not valid_move:
-							# choose a corner at random
-							row = random.choice((0, 2))
-							col = random.choice((0, 2))
-							valid_move = self.checkValidMove(row, col)
-							# but avoid that corner that we calculated with MATH!
-							if (row, col) == space_to_avoid:
-								valid_move = False
-						return row, col
+						# choose a corner at random, but avoid that corner that we calculated with MATH!
+						safe_corners = [space for space in open_corners if space != space_to_avoid]
+						if safe_corners:
+							self.countBranch("heuristicBotMove.double_middle")
+							return self.rng.choice(safe_corners)
 			# Check for The Diagonal Dagger edge-case: see board [[X, , ], [ ,X, ], [ , ,O]]
 			# In this (or rotated) situation, bot should select a corner space
-			if self.board[1][1] == self.PLAYER_0:
+			if board[1][1] == self.PLAYER_0:
 				# Check for scenario
-				if (self.board[0][0] != self.BLANK_POS != self.board[2][2] != self.board[0][0]) or \
-					(self.board[0][2] != self.BLANK_POS != self.board[2][0] != self.board[0][2]):
+				if (board[0][0] != self.BLANK_POS != board[2][2] != board[0][0]) or \
+					(board[0][2] != self.BLANK_POS != board[2][0] != board[0][2]):
 					# Select an open corner space
-					while not valid_move:
-						row = random.choice((0, 2))
-						col = random.choice((0, 2))
-						valid_move = self.checkValidMove(row, col)
-					return row, col
+					if open_corners:
+						self.countBranch("heuristicBotMove.diagonal_dagger")
+						return self.rng.choice(open_corners)
 			# Check for The Big L edge-case: see board [[ ,X, ], [ ,O, ], [X, , ]]
 			# In this scenario, bot loses if it selects (2, 1).  Avoid this (or rotated) scenarios.
-			if self.board[1][1] == bot_icon:
-				if self.board[0][1] != self.board[1][1] != self.board[2][1] != self.board[0][1]:
-					while not valid_move:
-						row = random.choice((0, 1, 2))
-						col = random.choice((0, 1, 2))
-						valid_move = self.checkValidMove(row, col)
-						if (row, col) in ((0, 1), (2, 1)):
-							valid_move = False
-					return row, col
-				elif self.board[1][0] != self.board[1][1] != self.board[1][2] != self.board[1][0]:
-					while not valid_move:
-						row = random.choice((0, 1, 2))
-						col = random.choice((0, 1, 2))
-						valid_move = self.checkValidMove(row, col)
-						if (row, col) in ((1, 0), (1, 2)):
-							valid_move = False
-					return row, col
+			if board[1][1] == bot_icon:
+				if board[0][1] != board[1][1] != board[2][1] != board[0][1]:
+					spaces = [space for space in legal_moves if space not in ((0, 1), (2, 1))]
+					if spaces:
+						self.countBranch("heuristicBotMove.big_l")
+						return self.rng.choice(spaces)
+				elif board[1][0] != board[1][1] != board[1][2] != board[1][0]:
+					spaces = [space for space in legal_moves if space not in ((1, 0), (1, 2))]
+					if spaces:
+						self.countBranch("heuristicBotMove.big_l")
+						return self.rng.choice(spaces)
 
 		# If the bot escapes the win-checker loop and edge-cases, select a space using criteria
+		# Prefer the center space when the bot opens the game or on the 2nd move, if available
+		if len(move_history) <= 1 and (1, 1) in legal_moves:
+			self.countBranch("heuristicBotMove.center")
+			return 1, 1
+		if not move_history:
+			self.countBranch("heuristicBotMove.any_space")
+			return self.rng.choice(legal_moves)
+
 		# Explanation of criteria: imagine a tic-tac-toe board colored like checkerboard.
 		# If human player plays on white space, bot tries to play black space, or vice versa.
 		# This is implemented using an odd/even scheme of the board positions.
-		last_opponent_move = self.move_history[-1]
-		# escape_counter prevents infinite loops if the above criteria cannot be followed
-		# (likely due to a nearly-filled board)
-		escape_counter = 9
-		while not valid_move:
-			# Prefer the center space on 2nd move if available
-			if len(self.move_history) == 1 and self.board[1][1] == self.BLANK_POS:
-				row, col = (1, 1)
-			else:
-				row = random.choice((0, 1, 2))
-				# check if opponent moved to "even" or "odd" space and counter appropriately
-				if (last_opponent_move[0] + last_opponent_move[1]) % 2 == 0:
-					if row in (0, 2):
-						col = 1
-					else:
-						col = random.choice((0, 2))
-				else:
-					if row == 1:
-						col = 1
-					else:
-						col = random.choice((0, 2))
-			valid_move = self.checkValidMove(row, col)
-
-			# It is possible that there will be only evens or only odds available;
-			# if that seems to be the case, escape the odd/even loop and take any available space.
-			escape_counter -= 1
-			if escape_counter <= 0:
-				row = random.choice((0, 1, 2))
-				col = random.choice((0, 1, 2))
-				valid_move = self.checkValidMove(row, col)
+		last_opponent_move = move_history[-1]
+		opponent_parity = (last_opponent_move[0] + last_opponent_move[1]) % 2
+		spaces = [space for space in legal_moves if (space[0] + space[1]) % 2 != opponent_parity]
 
-		return row, col
+		# It is possible that there will be only evens or only odds available;
+		# if that is the case, take any available space.
+		self.countBranch("heuristicBotMove.checkerboard" if spaces else "heuristicBotMove.any_space")
+		return self.rng.choice(spaces if spaces else legal_moves)
 
 	def resetGame(self) -> None:
 		"""Resets the board, history and game state, typically at the end of a game.
@@ -339,26 +1046,559 @@ class TicTacToe:
 		self.board = self.emptyBoard()
 		self.move_history = []
 		self.game_state = self.GAME_IN_PROGRESS
+		self.filled_spaces = 0
+		self._counted_board = self.board
+		self._hash = 0
+
+	def _snapshotMoveFormat(self) -> str:
+		"""Returns the array typecode of the space indexes in a snapshot: the smallest that fits every space.
+
+		:return: "B", "H" or "I".
+		"""
+
+		return "B" if self.num_spaces <= 0x100 else "H" if self.num_spaces <= 0x10000 else "I"
+
+	def snapshot(self) -> bytes:
+		"""Encodes the game in the compact snapshot format: SNAPSHOT_HEADER, then the space index of every move
+		in the smallest unsigned little-endian integers that fit (one byte each on boards of up to 256 spaces).
+		A 3x3 game takes 23 bytes plus one per move.
+
+		The board is not stored, as restoreSnapshot rebuilds it by replaying the moves; this assumes the game was
+		played from an empty board with the players taking turns, player 0 first, as every game in this package is.
+		The position hash is stored to check the replay.
+
+		:return: the snapshot.
+		"""
+
+		moves = array(self._snapshotMoveFormat(), self._moves)
+		if sys.byteorder == "big":
+			moves.byteswap()
+
+		return self.SNAPSHOT_HEADER.pack(
+			self.SNAPSHOT_MAGIC, self.width, self.height, self.win_length, self.game_state, self.positionHash(), len(moves)
+		) + moves.tobytes()
+
+	def restoreSnapshot(self, data: bytes) -> int:
+		"""Loads a snapshot into the game: sets the board size, then replays the moves through updateBoard,
+		so the board, move history, game state, counters and hash are rebuilt as they were.
+
+		:param data: the snapshot, which may be followed by other data (ex the rest of a TicTacTerminal snapshot).
+		:return: the number of bytes of data the snapshot took.
+		"""
+
+		try:
+			magic, width, height, win_length, game_state, position_hash, num_moves = self.SNAPSHOT_HEADER.unpack_from(data)
+		except struct.error:
+			raise ValueError("The snapshot is too short")
+		if magic != self.SNAPSHOT_MAGIC:
+			raise ValueError("Not a game snapshot")
+
+		if (width, height, win_length) == (self.width, self.height, self.win_length):
+			self.resetGame()
+		else:
+			self.setBoardSize(width, height, win_length)
+
+		moves = array(self._snapshotMoveFormat())
+		start = self.SNAPSHOT_HEADER.size
+		end = start + num_moves * moves.itemsize
+		if len(data) < end:
+			raise ValueError("The snapshot is too short")
+		moves.frombytes(data[start:end])
+		if sys.byteorder == "big":
+			moves.byteswap()
+
+		player = self.PLAYER_0
+		for space in moves:
+			if space >= self.num_spaces:
+				raise ValueError(f"The snapshot has a move on space {space} of a {width}x{height} board")
+			row, col = divmod(space, width)
+			self.updateBoard(row, col, player)
+			player = -player
+
+		if (self.game_state, self.positionHash()) != (game_state, position_hash):
+			raise ValueError("Replaying the snapshot's moves did not give the position it was taken from")
+
+		return end
+
+	@classmethod
+	def fromSnapshot(cls, data: bytes, **kwargs) -> "TicTacToe":
+		"""Creates a game from a snapshot (see restoreSnapshot).
+
+		:param data: the snapshot.
+		:param kwargs: keyword arguments for the class other than the board size, ex the input_source of a TicTacTerminal.
+		:return: the restored game.
+		"""
+
+		game = cls(**kwargs)
+		game.restoreSnapshot(data)
+
+		return game
+
+	def enableInstrumentation(self, stats: Optional[GameStats] = None) -> GameStats:
+		"""Starts timing the TIMED_METHODS and counting the branches taken by the bots.
+
+		The game is switched to a subclass of its class that wraps the timed methods, so uninstrumented games
+		pay nothing for the timings; branch counting costs one attribute check per bot move.
+
+		:param stats: the GameStats to record into, ex one shared by many games; a new one is created if None.
+		:return: the GameStats being recorded into.
+		"""
+
+		self.stats = stats if stats is not None else GameStats()
+
+		cls = type(self)
+		if cls not in TicTacToe._instrumented_classes.values():
+			if cls not in TicTacToe._instrumented_classes:
+				methods = {name: _timedMethod(name, getattr(cls, name)) for name in self.TIMED_METHODS}
+				# setdefault keeps the first subclass if another thread built one at the same time
+				TicTacToe._instrumented_classes.setdefault(
+					cls, type(f"Instrumented{cls.__name__}", (cls,), {"__slots__": (), **methods})
+				)
+			self.__class__ = TicTacToe._instrumented_classes[cls]
+
+		return self.stats
+
+	def disableInstrumentation(self) -> None:
+		"""Stops the timings and branch counters, returning the game to its own class.
+		Makes no return.
+		"""
+
+		if type(self) in TicTacToe._instrumented_classes.values():
+			self.__class__ = type(self).__bases__[0]
+		self.stats = None
+
+	def countBranch(self, name: str) -> None:
+		"""Counts a hit on a branch of a bot, if instrumentation is enabled.
+		Makes no return.
+
+		:param name: the name of the branch, ex "heuristicBotMove.block".
+		"""
+
+		if self.stats is not None:
+			self.stats.count(name)
+
+
+class _ReadOnlyList(list):
+	"""A list that refuses item assignment, for the boards TicTacBitboard builds from its bitboards on every read,
+	where a changed space would otherwise be silently lost.  It compares equal to a plain list with the same items.
+	"""
+
+	__slots__ = ()
+
+	# Raised as a TypeError on any change
+	READ_ONLY_MESSAGE = "This board is read-only: change spaces with updateBoard, or assign a whole new board"
+
+	def _refuse(self, *args) -> None:
+		raise TypeError(self.READ_ONLY_MESSAGE)
+
+	__setitem__ = __delitem__ = __iadd__ = __imul__ = _refuse
+	append = extend = insert = pop = remove = clear = sort = reverse = _refuse
+
+	def __reduce_ex__(self, protocol: int) -> tuple:
+		# Copies and pickles are plain lists, which can be changed
+		return list, (list(self),)
+
+
+class _ReadOnlyHistory(_ReadOnlyList):
+	"""The move history TicTacToe builds from its packed moves on every read, where an appended move would
+	otherwise be silently lost.
+	"""
+
+	__slots__ = ()
+
+	READ_ONLY_MESSAGE = "The move history is read-only: make moves with updateBoard, or assign a whole new history"
+
+
+class TicTacBitboard(TicTacToe):
+	"""Alternative board engine for TicTacToe that stores each player's stones as an integer bitboard.
+	Bit (row * width + col) is set when that player holds the space.
+
+	On the classic 3x3 board, wins are found by testing the eight precomputed line masks (folded into a
+	512-entry lookup).  On other boards, each of the four directions is checked for the whole board at once
+	by shifting the bitboard along the direction and AND-ing it with itself (win_length - 1) times.
+
+	The board attribute is still readable and assignable as a list of rows, but it is generated from the
+	bits, so spaces must be changed through updateBoard or by assigning a whole board: the rows read are
+	read-only, and item assignment raises a TypeError.  The last board generated is kept in the board slot
+	inherited from TicTacToe, so repeated reads of an unchanged position do not rebuild it.
+
+	Included methods:
+		- __init__(self, width=3, height=3, win_length=3, rng=None)
+		- setBoardSize(self, width, height, win_length) - changes the board size and builds its win masks
+		- board - property converting between the bitboards and the list format
+		- checkValidMove(self, row, col) - returns "True" if a move is valid
+		- legalMoves(self) - lists every open space
+		- updateBoard(self, row, col, player_value) - assigns player value to a given space
+		- undoMove(self) - takes back the last updateBoard
+		- positionIndex(self) - encodes the bitboards as the index used by the perfect-play table
+		- positionHash(self) - returns the Zobrist hash of the position
+		- hasLine(self, bits) - returns "True" if a bitboard contains a winning line
+		- checkBoard(self) - determines if the game has been won or drawn
+		- resetGame(self) - resets the bitboards and game state
+	"""
+
+	__slots__ = ("player_0_bits", "player_1_bits", "full_board", "line_steps", "line_shifts")
+
+	# The (line_steps, line_shifts) of recently built board sizes, by (width, height, win_length), see SHAPE_CACHE_SIZE
+	_line_masks_cache = OrderedDict()
+	# The board slot of TicTacToe, shadowed here by the board property; it holds the last board generated, as
+	# (player_0_bits, player_1_bits, board)
+	_board_cache = TicTacToe.board
+
+	# Bit masks of the three spaces in every row, column and diagonal of the classic 3x3 board
+	WIN_MASKS = (
+		0b000000111, 0b000111000, 0b111000000,
+		0b001001001, 0b010010010, 0b100100100,
+		0b100010001, 0b001010100
+	)
+	# Bit mask with all nine spaces of the classic 3x3 board taken
+	FULL_BOARD = 0b111111111
+	# Lookup of every 9-bit stone pattern, True if the pattern contains a full line
+	WINNING_PATTERNS = [False] * (FULL_BOARD + 1)
+	for _mask in WIN_MASKS:
+		for _pattern in range(0, FULL_BOARD + 1):
+			if _pattern & _mask == _mask:
+				WINNING_PATTERNS[_pattern] = True
+	del _mask, _pattern
+
+	# Base-3 value of every 9-bit stone pattern, used to build the PerfectPlayTable position index
+	TERNARY_VALUES = [sum(3 ** space for space in range(0, 9) if pattern >> space & 1) for pattern in range(0, 512)]
+
+	def __init__(self, width: int = 3, height: int = 3, win_length: int = 3, rng: Optional[random.Random] = None) -> None:
+		"""Initializes the bitboards before the inherited attributes, as the board property relies on them.
+
+		:param width: the number of columns on the board.
+		:param height: the number of rows on the board.
+		:param win_length: the number of spaces in a row (across, down or diagonal) needed to win.
+		:param rng: the random generator the bots draw from (see TicTacToe.__init__).
+		"""
+
+		self.player_0_bits = 0
+		self.player_1_bits = 0
+		self._board_cache = None
+
+		TicTacToe.__init__(self, width, height, win_length, rng)
+
+	def setBoardSize(self, width: int, height: int, win_length: int) -> None:
+		"""Sets the size of the board (see TicTacToe.setBoardSize), then builds the masks used to find wins on it.
+		Makes no return.
+
+		:param width: the number of columns on the board.
+		:param height: the number of rows on the board.
+		:param win_length: the number of spaces in a row (across, down or diagonal) needed to win.
+		"""
+
+		TicTacToe.setBoardSize(self, width, height, win_length)
+
+		self.full_board = (1 << self.num_spaces) - 1
+		size = (width, height, win_length)
+		self.line_steps, self.line_shifts = self._cachedShape(self._line_masks_cache, size, self._buildLineMasks)
+
+	@classmethod
+	def _buildLineMasks(cls, width: int, height: int, win_length: int) -> tuple:
+		"""Builds the line_steps and line_shifts of a board shape, used by hasLine.
+
+		:param width: the number of columns on the board.
+		:param height: the number of rows on the board.
+		:param win_length: the number of spaces in a row needed to win.
+		:return: (line_steps, line_shifts).
+		"""
+
+		# Steps covered by each shift of hasLine: doubling while that fits in win_length, then the remainder
+		line_steps = []
+		covered = 1
+		while covered * 2 <= win_length:
+			line_steps.append(covered)
+			covered *= 2
+		if covered < win_length:
+			line_steps.append(win_length - covered)
+		# For each direction, the bit shift of one step and the mask of spaces where a full line can start
+		line_shifts = []
+		for row_step, col_step in cls.LINE_DIRECTIONS:
+			starts = 0
+			for row in range(0, height):
+				for col in range(0, width):
+					end_row = row + row_step * (win_length - 1)
+					end_col = col + col_step * (win_length - 1)
+					if end_row < height and 0 <= end_col < width:
+						starts |= 1 << (row * width + col)
+			line_shifts.append((row_step * width + col_step, starts))
+
+		return tuple(line_steps), tuple(line_shifts)
+
+	@property
+	def board(self) -> list:
+		"""Builds the list format of the board from the bitboards, or returns the last one built if the
+		bitboards have not changed since.
+
+		:return: a read-only list of read-only rows, in the same format as emptyBoard; item assignment raises a
+			TypeError, so copy the rows to get a board that can be changed.
+		"""
+
+		cached = self._board_cache
+		if cached is not None and cached[0] == self.player_0_bits and cached[1] == self.player_1_bits:
+			return cached[2]
+
+		board = _ReadOnlyList(
+			_ReadOnlyList(
+				self.PLAYER_0 if self.player_0_bits >> (row * self.width + col) & 1 else
+				self.PLAYER_1 if self.player_1_bits >> (row * self.width + col) & 1 else
+				self.BLANK_POS
+				for col in range(0, self.width)
+			)
+			for row in range(0, self.height)
+		)
+		self._board_cache = (self.player_0_bits, self.player_1_bits, board)
+
+		return board
+
+	@board.setter
+	def board(self, new_board: list) -> None:
+		"""Loads the bitboards from a board in the list format, then recounts filled_spaces and the position hash
+		and checks the new board for a win or draw (see checkBoard).
+
+		:param new_board: a list of rows, in the same format as emptyBoard.  Moves made before cannot be undone.
+		"""
+
+		self.player_0_bits = 0
+		self.player_1_bits = 0
+		self.filled_spaces = 0
+		self._hash = 0
+		self._undo = array("B")
+		for row in range(0, self.height):
+			for col in range(0, self.width):
+				value = new_board[row][col]
+				if value == self.PLAYER_0:
+					self.player_0_bits |= 1 << (row * self.width + col)
+				elif value == self.PLAYER_1:
+					self.player_1_bits |= 1 << (row * self.width + col)
+				else:
+					continue
+				self.filled_spaces += 1
+				self._hash ^= self.zobrist_keys[row * self.width + col][value]
+		self.checkBoard()
+
+	def checkValidMove(self, row: int, col: int) -> bool:
+		"""Determines if a given move is allowed, then returns a boolean (True for valid, False for invalid).
+
+		:param row: the row of the space to be checked.
+		:param col: the column of the space to be checked.
+		:return: a boolean, True if the space is empty and the desired move is valid; False if the move is invalid.
+		"""
+
+		return not (self.player_0_bits | self.player_1_bits) >> (row * self.width + col) & 1
+
+	def legalMoves(self) -> List[Tuple[int, int]]:
+		"""Lists every open space, in row order, by walking the unset bits of the bitboards.
+
+		:return: a list of (row, col) for each space where a move is valid.
+		"""
+
+		moves = []
+		open_bits = self.full_board & ~(self.player_0_bits | self.player_1_bits)
+		while open_bits:
+			low_bit = open_bits & -open_bits
+			moves.append(divmod(low_bit.bit_length() - 1, self.width))
+			open_bits ^= low_bit
+
+		return moves
+
+	def updateBoard(self, row: int, col: int, player_value: int) -> None:
+		"""Updates the bitboards and move history with new moves, then checks for wins.
+		Behaves the same as TicTacToe.updateBoard, including the error for an invalid player_value.
+
+		:param row: the row of the space to be updated.
+		:param col: the column of the space to be updated.
+		:param player_value: the icon to be put in the space (traditionally X, 0, or blank).
+		"""
+
+		space = row * self.width + col
+		bit = 1 << space
+		previous_value = (
+			self.PLAYER_0 if self.player_0_bits & bit else
+			self.PLAYER_1 if self.player_1_bits & bit else self.BLANK_POS
+		)
+		if player_value == self.PLAYER_0:
+			self.player_0_bits |= bit
+			self.player_1_bits &= ~bit
+			mover_bits, mover_winner = self.player_0_bits, self.PLAYER_0_WINNER
+		elif player_value == self.PLAYER_1:
+			self.player_1_bits |= bit
+			self.player_0_bits &= ~bit
+			mover_bits, mover_winner = self.player_1_bits, self.PLAYER_1_WINNER
+		elif player_value == self.BLANK_POS:
+			self.player_0_bits &= ~bit
+			self.player_1_bits &= ~bit
+			mover_bits = mover_winner = None
+		else:
+			err = (
+				f"Tried to update the board with '{player_value}' but the only choices are "
+				f"'{self.BLANK_POS}', '{self.PLAYER_0}', and '{self.PLAYER_1}'."
+			)
+
+			raise RuntimeError(err)
+
+		self._moves.append(space)
+		self._undo.append(self.game_state | (previous_value + 1))
+		self.filled_spaces += (player_value != self.BLANK_POS) - (previous_value != self.BLANK_POS)
+		space_keys = self.zobrist_keys[space]
+		self._hash ^= space_keys[previous_value] ^ space_keys[player_value]
+		# A cleared space may have undone a win, so needs the whole board checked; otherwise,
+		# as in checkLastMove, only the mover can have made a line, and a game that has already been won stays won
+		if mover_bits is None:
+			self.checkBoard()
+		elif self.game_state in (self.PLAYER_0_WINNER, self.PLAYER_1_WINNER):
+			return
+		elif self.WINNING_PATTERNS[mover_bits] if self.classic_board else self.hasLine(mover_bits):
+			self.game_state = mover_winner
+		elif self.player_0_bits | self.player_1_bits == self.full_board:
+			self.game_state = self.DRAW_GAME
+		else:
+			self.game_state = self.GAME_IN_PROGRESS
+
+	def undoMove(self) -> Tuple[int, int]:
+		"""Takes back the last move made by updateBoard (see TicTacToe.undoMove).
+
+		:return: (row, col) of the space that was restored.
+		"""
+
+		if not self._undo:
+			raise RuntimeError("There is no move to undo.")
+
+		space = self._moves.pop()
+		entry = self._undo.pop()
+		previous_value = (entry & ~self.UNDO_STATE_MASK) - 1
+		bit = 1 << space
+		value = (
+			self.PLAYER_0 if self.player_0_bits & bit else
+			self.PLAYER_1 if self.player_1_bits & bit else self.BLANK_POS
+		)
+		self.player_0_bits &= ~bit
+		self.player_1_bits &= ~bit
+		if previous_value == self.PLAYER_0:
+			self.player_0_bits |= bit
+		elif previous_value == self.PLAYER_1:
+			self.player_1_bits |= bit
+		self.filled_spaces += (previous_value != self.BLANK_POS) - (value != self.BLANK_POS)
+		space_keys = self.zobrist_keys[space]
+		self._hash ^= space_keys[value] ^ space_keys[previous_value]
+		self.game_state = entry & self.UNDO_STATE_MASK
+
+		return divmod(space, self.width)
+
+	def positionIndex(self) -> int:
+		"""Encodes the bitboards as the base-3 position index used by PerfectPlayTable.
+		Only defined for the classic 3x3 board.
+
+		:return: the position index of the board.
+		"""
+
+		if not self.classic_board:
+			raise ValueError("Position indexes are only defined for the classic 3x3 board")
+
+		return self.TERNARY_VALUES[self.player_0_bits] + 2 * self.TERNARY_VALUES[self.player_1_bits]
+
+	def positionHash(self) -> int:
+		"""Returns the Zobrist hash of the position, kept up to date by updateBoard and the board setter.
+
+		:return: a 64-bit hash that is the same for the same stones on a board of the same width and height.
+		"""
+
+		return self._hash
+
+	def hasLine(self, bits: int) -> bool:
+		"""Determines if a bitboard contains a line of win_length in any direction.
+
+		:param bits: a bitboard in the layout of player_0_bits and player_1_bits.
+		:return: a boolean, True if the bitboard contains a winning line.
+		"""
+
+		if self.classic_board:
+			return self.WINNING_PATTERNS[bits]
+
+		for shift, starts in self.line_shifts:
+			# Each bit of run stands for the line of spaces starting there; shifting run by the number of spaces
+			# it already covers and AND-ing doubles the covered length, and the last shift overlaps to reach win_length
+			run = bits
+			for steps in self.line_steps:
+				run &= run >> (shift * steps)
+				if not run:
+					break
+			if run & starts:
+				return True
+
+		return False
+
+	def checkBoard(self) -> None:
+		"""Checks the bitboards for endgame scenarios; either a draw, or a win by either player.
+		It then sets the game_state attribute accordingly.
+		Takes no arguments and makes no return.
+		"""
+
+		if self.hasLine(self.player_0_bits):
+			self.game_state = self.PLAYER_0_WINNER
+		elif self.hasLine(self.player_1_bits):
+			self.game_state = self.PLAYER_1_WINNER
+		elif self.player_0_bits | self.player_1_bits == self.full_board:
+			self.game_state = self.DRAW_GAME
+		else:
+			self.game_state = self.GAME_IN_PROGRESS
+
+	def resetGame(self) -> None:
+		"""Resets the bitboards, history and game state (see TicTacToe.resetGame).
+		Takes no arguments and makes no return.
+		"""
+
+		# Cleared directly rather than by assigning an empty board, as this runs from setBoardSize before the
+		# win masks that the board setter's checkBoard needs are built
+		self.player_0_bits = 0
+		self.player_1_bits = 0
+		self.move_history = []
+		self.game_state = self.GAME_IN_PROGRESS
+		self.filled_spaces = 0
+		# The bitboards never need recounting, so there is no counted list board
+		self._counted_board = None
+		self._board_cache = None
+		self._hash = 0
 
 
 class TicTacTerminal(TicTacToe):
 	"""Contains methods specialized for playing tic-tac-toe games in the terminal.  Inherits from TicTacToe class.
 
+	Input and output go through readInput and display, which use input() and print() by default, but can be
+	given a script of input lines and an output stream instead, so whole sessions can be replayed without a human.
+
 	Included methods:
-		- __init__(self)
+		- __init__(self, width=3, height=3, win_length=3, input_source=None, output=None, rng=None)
+		- readInput(self, prompt): Reads a line of input from the user or the input script.
+		- display(self, *values, end="\n", flush=False): Prints to the console or the output stream.
 		- updatePlayerIcons(self, player_0_icon, player_1_icon): Assigns custom player icons.
 		- advancedGameSettings(self, setting_to_change=None): Allows user to change additional game settings.
 		- gameSettingsPrompt(self): Prints messages to allow the user to select number of players and choose icons.
-		- terminalGame(self): Starts a TicTacToe game in the terminal and calls supporting methods.
-		- displayBoard(self): Prints the board for the user to see.
+		- snapshot(self): Encodes the game, the player setup, the icons and the redraw setting.
+		- restoreSnapshot(self, data): Loads a snapshot, including the player setup and icons.
+		- terminalGame(self, resume=False): Starts a TicTacToe game in the terminal and calls supporting methods.
+		- undoTurn(self, player): Takes back moves until it is a user's turn again, for the 'undo' command.
+		- renderBoard(self): Returns the board as the text printed by displayBoard, from a cache of rendered boards.
+		- displayBoard(self, in_place=False): Prints the board for the user to see, or redraws only the changed spaces.
 		- displayResult(self): Checks the game_state and displays how the game ended.
 		- userMove(self, player_icon): Processes everything that is needed for a user to make a move.
+		- displayHint(self, player_icon): Prints the result of every open space for the 'hint' command.
 		- promptUser(self): Connects userMove and userInputHandler to prompt for and accept user input.
 		- userInputHandler(self, prompt, exclusions=None): Allows user to select special options from any input point;
 			otherwise behaves like built-in input function.
 	"""
 
-	def __init__(self) -> None:
+	# Most rendered boards kept by renderBoard before the cache is emptied
+	RENDER_CACHE_SIZE = 4096
+	# Move functions that can be saved in a snapshot, by their code in the snapshot
+	SNAPSHOT_MOVE_FUNCTIONS = ("userMove", "botMove", "heuristicBotMove", "greedyBotMove")
+
+	def __init__(
+		self, width: int = 3, height: int = 3, win_length: int = 3,
+		input_source: Optional[Union[Iterable[str], TextIO]] = None, output: Optional[TextIO] = None,
+		rng: Optional[random.Random] = None
+	) -> None:
 		"""Initializes additional attributes for a TicTacToe game in the terminal.
 
 		Initializes the TicTacTerminal instance with:
@@ -366,9 +1606,26 @@ class TicTacTerminal(TicTacToe):
 			- colors for the board
 			- default player icons
 			- default move structure (user-first single player, likely overwritten in gameSettingsPrompt)
+			- the render cache and in-place redraw setting (off) used by displayBoard
+			- the input source and output stream
+
+		:param width: the number of columns on the board.
+		:param height: the number of rows on the board.
+		:param win_length: the number of spaces in a row (across, down or diagonal) needed to win.
+		:param input_source: the lines of input, as any iterable of strings or a readable file/stream,
+			or None to read from the user with input().
+		:param output: a writable text stream for everything the game prints, or None to print to the console.
+		:param rng: the random generator the bots draw from (see TicTacToe.__init__).
 		"""
 
-		TicTacToe.__init__(self)
+		TicTacToe.__init__(self, width, height, win_length, rng)
+
+		# Where input is read from and output is written to (see readInput and display)
+		if input_source is None or hasattr(input_source, "readline"):
+			self.input_source = input_source
+		else:
+			self.input_source = iter(input_source)
+		self.output_stream = output
 
 		# Colors for the board
 		self.blank_pos_color = "\033[1;32m"
@@ -382,6 +1639,53 @@ class TicTacTerminal(TicTacToe):
 		self.player_0_move = self.userMove
 		self.player_1_move = self.botMove
 
+		# Redraw only the changed spaces when no human is playing (see terminalGame)
+		self.redraw_in_place = False
+		# Rendered boards by board contents, valid for the (size, icons, colors) in _render_settings
+		self._render_settings = None
+		self._render_cache = {}
+		# Text of each space for each player value, used to render boards and to redraw single spaces
+		self._cell_texts = ()
+		self._redraw_texts = ()
+		# The board contents last printed by displayBoard
+		self._drawn_board = None
+
+	def readInput(self, prompt: str) -> str:
+		"""Reads one line of input, like the built-in input function.
+		Scripted input is echoed after the prompt, so the output reads like a session typed at the console.
+
+		:param prompt: string for the user to see before the input.
+		:return: the line of input, without its line ending.
+		"""
+
+		if self.input_source is None:
+			return input(prompt)
+
+		self.display(prompt, end="")
+		if hasattr(self.input_source, "readline"):
+			line = self.input_source.readline()
+			if not line:
+				raise EOFError("The input script has run out of lines")
+			line = line.rstrip("\r\n")
+		else:
+			line = next(self.input_source, None)
+			if line is None:
+				raise EOFError("The input script has run out of lines")
+		self.display(line)
+
+		return line
+
+	def display(self, *values: object, end: str = "\n", flush: bool = False) -> None:
+		"""Prints values, like the built-in print function, to the console or the output stream.
+		Makes no return.
+
+		:param values: the values to print, separated by spaces.
+		:param end: the string printed after the values.
+		:param flush: whether to flush the stream after printing.
+		"""
+
+		print(*values, end=end, file=self.output_stream, flush=flush)
+
 	def updatePlayerIcons(self, player_0_icon: str, player_1_icon: str) -> None:
 		"""Assigns custom player icons to self.PLAYER_0_ICON and self.PLAYER_1_ICON.
 		Makes no return.
@@ -391,14 +1695,16 @@ class TicTacTerminal(TicTacToe):
 		"""
 		self.PLAYER_0_ICON = player_0_icon
 		self.PLAYER_1_ICON = player_1_icon
+		# Boards rendered with the old icons are out of date
+		self._render_settings = None
 
 	def advancedGameSettings(self, setting_to_change: Optional[str] = None) -> None:
 		"""Allows user to change additional game settings.
 
 		Allows for changing:
 			- player icons
-			- actually that's it for now
-			- it just seemed like a good idea to start this format for later when there are more options
+			- board size and the number in a row needed to win (only before the first move)
+			- redrawing the board in place when no human is playing
 
 		Makes no return.
 
@@ -409,21 +1715,42 @@ class TicTacTerminal(TicTacToe):
 
 		match setting_to_change:
 			case 'change icons':
-				print('Both player icons must only be 1 character long.')
+				self.display('Both player icons must only be 1 character long.')
 				player0 = 'too long'
 				while len(player0) != 1:
 
 					player0 = self.userInputHandler('What do you want first move icon to be? (Traditionally X): ', 'settings')
 					if len(player0) != 1:
-						print("Please enter a single character for the player icon")
+						self.display("Please enter a single character for the player icon")
 
 				player1 = 'too long'
 				while len(player1) != 1:
 					player1 = self.userInputHandler('What do you want second move icon to be? (Traditionally O): ', 'settings')
 					if len(player0) != 1:
-						print("Please enter a single character for the player icon")
+						self.display("Please enter a single character for the player icon")
 
 				self.updatePlayerIcons(player0, player1)
+			case 'change board':
+				if self.move_history:
+					self.display("The board can only be changed before the first move.")
+					return
+
+				sizes = []
+				for prompt in ('How many columns wide? ', 'How many rows high? ', 'How many in a row to win? '):
+					size = ''
+					while not (size.isnumeric() and int(size) > 0):
+						size = self.userInputHandler(prompt, 'settings')
+						if not (size.isnumeric() and int(size) > 0):
+							self.display("Please enter a whole number greater than 0")
+					sizes.append(int(size))
+
+				try:
+					self.setBoardSize(*sizes)
+				except ValueError as err:
+					self.display(err)
+			case 'toggle redraw':
+				self.redraw_in_place = not self.redraw_in_place
+				self.display(f"Redrawing the board in place is now {'on' if self.redraw_in_place else 'off'}.")
 			case _:
 				raise Exception(f"Was given {setting_to_change} but that doesn't exist")
 
@@ -433,12 +1760,12 @@ class TicTacTerminal(TicTacToe):
 		"""
 
 		# Prompts for how many human players there will be
-		num_players = 0
-		while num_players != 1 and num_players != 2:
-			num_players = self.userInputHandler("Enter the number of players (1 or 2): ")
+		num_players = -1
+		while num_players not in (0, 1, 2):
+			num_players = self.userInputHandler("Enter the number of players (0 to watch the bot play itself, 1 or 2): ")
 			if num_players.isnumeric():
 				num_players = int(num_players)
-			elif num_players == 'change icons':
+			elif num_players in ('change icons', 'change board', 'toggle redraw'):
 				self.advancedGameSettings(num_players)
 
 		# if user selected single player
@@ -450,7 +1777,7 @@ class TicTacTerminal(TicTacToe):
 					f"{self.PLAYER_0_ICON}s plays first, do you want to be {self.PLAYER_0_ICON} or {self.PLAYER_1_ICON}? "
 				)
 				if player_choice != self.PLAYER_0_ICON and player_choice != self.PLAYER_1_ICON:
-					print("That is not a valid option, make sure to match the letter's upper/lower case.")
+					self.display("That is not a valid option, make sure to match the letter's upper/lower case.")
 
 			# set the players based off the user's choice
 			if player_choice == self.PLAYER_0_ICON:
@@ -459,80 +1786,262 @@ class TicTacTerminal(TicTacToe):
 			else:
 				self.player_0_move = self.botMove
 				self.player_1_move = self.userMove
+		# bot against itself
+		elif num_players == 0:
+			self.player_0_move = self.botMove
+			self.player_1_move = self.botMove
 		# multiplayer
 		else:
-			print(f"{self.PLAYER_0_ICON}s plays first, decide who will be the first player.")
+			self.display(f"{self.PLAYER_0_ICON}s plays first, decide who will be the first player.")
 			self.player_0_move = self.userMove
 			self.player_1_move = self.userMove
 
-	def terminalGame(self) -> None:
+	def snapshot(self) -> bytes:
+		"""Encodes the game in the compact snapshot format (see TicTacToe.snapshot), followed by a byte with the
+		redraw setting, a byte with the code in SNAPSHOT_MOVE_FUNCTIONS of each player's move function
+		(player 0 in the low 4 bits), and each player's icon as a length byte and UTF-8 text.
+
+		:return: the snapshot.
+		"""
+
+		codes = []
+		for move_function in (self.player_0_move, self.player_1_move):
+			name = self._moveName(move_function)
+			if name not in self.SNAPSHOT_MOVE_FUNCTIONS:
+				raise ValueError(f"Only the move functions {self.SNAPSHOT_MOVE_FUNCTIONS} can be saved in a snapshot")
+			codes.append(self.SNAPSHOT_MOVE_FUNCTIONS.index(name))
+
+		icons = b""
+		for icon in (self.PLAYER_0_ICON, self.PLAYER_1_ICON):
+			encoded = icon.encode()
+			if len(encoded) > 0xFF:
+				raise ValueError("Icons longer than 255 bytes cannot be saved in a snapshot")
+			icons += bytes([len(encoded)]) + encoded
+
+		return TicTacToe.snapshot(self) + bytes([self.redraw_in_place, codes[0] | codes[1] << 4]) + icons
+
+	def restoreSnapshot(self, data: bytes) -> int:
+		"""Loads a snapshot from snapshot (see TicTacToe.restoreSnapshot), including the player setup, icons
+		and redraw setting.  Resume the game with terminalGame(resume=True).
+
+		:param data: the snapshot, which may be followed by other data.
+		:return: the number of bytes of data the snapshot took.
+		"""
+
+		offset = TicTacToe.restoreSnapshot(self, data)
+		try:
+			redraw_in_place, codes = data[offset], data[offset + 1]
+			offset += 2
+			icons = []
+			for _ in range(0, 2):
+				length = data[offset]
+				icons.append(bytes(data[offset + 1:offset + 1 + length]).decode())
+				offset += 1 + length
+			if offset > len(data):
+				raise IndexError()
+			self.player_0_move = getattr(self, self.SNAPSHOT_MOVE_FUNCTIONS[codes & 0xF])
+			self.player_1_move = getattr(self, self.SNAPSHOT_MOVE_FUNCTIONS[codes >> 4])
+		except IndexError:
+			raise ValueError("The snapshot is too short or has an unknown move function")
+
+		self.redraw_in_place = bool(redraw_in_place)
+		self.updatePlayerIcons(*icons)
+
+		return offset
+
+	def terminalGame(self, resume: bool = False) -> None:
 		"""Starts a TicTacToe game in the terminal and calls supporting methods.
-		Takes no arguments and makes no return.
+		Makes no return.
+
+		:param resume: continue the game in progress (ex one loaded by restoreSnapshot) with its player setup,
+			rather than setting up a new game.
 		"""
 
 		# Enable color on Windows terminals
-		if os.name == "nt":
+		if os.name == "nt" and self.output_stream is None:
 			os.system("color")
 
 		# Set up the game
-		self.gameSettingsPrompt()
+		if not resume:
+			self.gameSettingsPrompt()
 
-		print("If you wish to stop playing the game enter 'exit'.")
+		# With no human to prompt, nothing is printed between boards, so the board can be redrawn in place
+		in_place = self.redraw_in_place and "userMove" not in map(self._moveName, (self.player_0_move, self.player_1_move))
+
+		self.display(
+			"If you wish to stop playing the game enter 'exit', enter 'undo' to take back your last move, "
+			"or enter 'hint' to see how every space would turn out."
+		)
 		# Start of game
 		self.displayBoard()
-		while True:
-			print("First player's turn.")
-			row, col = self.player_0_move(self.PLAYER_0)
-			if row == -1 and col == -1: break  # noqa: E701
-			self.updateBoard(row, col, self.PLAYER_0)
-			self.displayBoard()
-			if self.game_state != self.GAME_IN_PROGRESS: break  # noqa: E701
-
-			print("Second player's turn.")
-			row, col = self.player_1_move(self.PLAYER_1)
+		# The players take turns from player 0, so the number of moves played says whose turn it is
+		player = self.PLAYER_0 if len(self._moves) % 2 == 0 else self.PLAYER_1
+		while self.game_state == self.GAME_IN_PROGRESS:
+			if player == self.PLAYER_0:
+				if not in_place: self.display("First player's turn.")  # noqa: E701
+				row, col = self._callMove(self.player_0_move, self.PLAYER_0)
+			else:
+				if not in_place: self.display("Second player's turn.")  # noqa: E701
+				row, col = self._callMove(self.player_1_move, self.PLAYER_1)
 			if row == -1 and col == -1: break  # noqa: E701
-			self.updateBoard(row, col, self.PLAYER_1)
-			self.displayBoard()
-			if self.game_state != self.GAME_IN_PROGRESS: break  # noqa: E701
+			if row == -2 and col == -2:
+				player = self.undoTurn(player)
+				continue
+			self.updateBoard(row, col, player)
+			self.displayBoard(in_place)
+			player = -player
 
 		# End of game; display winner/draw and reset
 		self.displayResult()
 		self.resetGame()
 
-	def displayBoard(self) -> None:
+	def _moveName(self, move_function) -> Optional[str]:
+		"""Names the method of this game a move function is bound to.  Bound methods are compared by name, as
+		enableInstrumentation swaps the game's class, so a method bound before then is not the game's method after.
+
+		:param move_function: player_0_move or player_1_move.
+		:return: the method's name, ex "botMove", or None if the move function is not a method of this game.
+		"""
+
+		if getattr(move_function, "__self__", None) is not self:
+			return None
+
+		return move_function.__func__.__name__
+
+	def _callMove(self, move_function, player_value: int) -> Tuple[int, int]:
+		"""Asks a move function for a move.  Methods of this game are looked up again on its current class, so bot
+		moves are timed and counted once instrumentation is enabled, however long ago the method was assigned.
+
+		:param move_function: player_0_move or player_1_move.
+		:param player_value: the player to move.
+		:return: (row, col) of the move, or a command code as returned by userMove.
+		"""
+
+		name = self._moveName(move_function)
+
+		return (getattr(self, name) if name is not None else move_function)(player_value)
+
+	def undoTurn(self, player: int) -> int:
+		"""Takes back moves until it is a user's turn again: the user's last move, and the bot's reply if it has one.
+		Then shows the board.
+
+		:param player: the player whose turn it is.
+		:return: the player whose turn it is after the undo.
+		"""
+
+		if not self._undo:
+			self.display("There are no moves to undo.")
+			return player
+
+		while self._undo:
+			self.undoMove()
+			player = -player
+			if self._moveName(self.player_0_move if player == self.PLAYER_0 else self.player_1_move) == "userMove":
+				break
+		self.displayBoard()
+
+		return player
+
+	def renderBoard(self) -> str:
+		"""Builds the text printed by displayBoard.
+
+		Rendered boards are cached by the board contents.  The cache, and the text of each space, are rebuilt
+		when the board size, player icons or colors change.
+
+		:return: the board as a string of lines, starting with an empty line.
+		"""
+
+		settings = (
+			self.width, self.height, self.PLAYER_0_ICON, self.PLAYER_1_ICON, self.blank_pos_color, self.exit_color_code
+		)
+		if settings != self._render_settings:
+			self._buildCellTexts()
+			self._render_cache.clear()
+			self._render_settings = settings
+
+		contents = tuple(chain.from_iterable(self.board))
+		text = self._render_cache.get(contents)
+		if text is None:
+			if len(self._render_cache) >= self.RENDER_CACHE_SIZE:
+				self._render_cache.clear()
+
+			cell_texts = self._cell_texts
+			# Tab indent creates margin with edge of window, with vertical separators between columns
+			rows = [
+				"\t" + "║".join(
+					cell_texts[space][contents[space]] for space in range(row * self.width, (row + 1) * self.width)
+				) + "\n"
+				for row in range(0, self.height)
+			]
+			# Ensure margin with text by beginning with newline, with horizontal separators between rows
+			cell_width = len(str(self.num_spaces)) + 2
+			separator = "\t" + "╬".join(["═" * cell_width] * self.width) + "\n"
+			text = "\n" + separator.join(rows)
+			self._render_cache[contents] = text
+
+		return text
+
+	def _buildCellTexts(self) -> None:
+		"""Builds the text of every space for each player value, for the current board size, icons and colors.
+		Makes no return.
+		"""
+
+		# Every space is wide enough for its number, with a space on each side
+		cell_width = len(str(self.num_spaces)) + 2
+		cell_texts = []
+		redraw_texts = []
+		for space in range(0, self.num_spaces):
+			texts = {
+				# Open spaces show the number the user types to play there (see promptUser)
+				self.BLANK_POS: f"{self.blank_pos_color}{space + 1:^{cell_width}}{self.exit_color_code}",
+				self.PLAYER_0: f"{self.PLAYER_0_ICON:^{cell_width}}",
+				self.PLAYER_1: f"{self.PLAYER_1_ICON:^{cell_width}}"
+			}
+			# Redrawn spaces must cover the whole width of the old text
+			redraw_texts.append(dict(texts))
+			# The last column has no separator after it, so it needs no padding after the icon
+			if space % self.width == self.width - 1:
+				texts[self.PLAYER_0] = " " * ((cell_width - 1) // 2) + self.PLAYER_0_ICON
+				texts[self.PLAYER_1] = " " * ((cell_width - 1) // 2) + self.PLAYER_1_ICON
+			cell_texts.append(texts)
+
+		self._cell_texts = tuple(cell_texts)
+		self._redraw_texts = tuple(redraw_texts)
+
+	def displayBoard(self, in_place: bool = False) -> None:
 		"""Prints the board for the user to see.
 
-		Takes no arguments and makes no return.
+		With in_place, if the last thing printed was this board at the same size, icons and colors, only the spaces
+		that changed since are rewritten, using ANSI cursor movement, instead of printing the whole board again.
+
+		Makes no return.
 		rather, calls the self.board object directly and prints directly to console.
+
+		:param in_place: redraw the changed spaces of the board printed last, rather than printing a new board.
 		"""
 
-		# Ensure margin with text by beginning with newline
-		result = "\n"
-		for i in range(0, 9):
-			row = floor(i / 3)
-			col = i % 3
-			# First column, requires tab indent to create margin with edge of window
-			if i in (0, 3, 6):
-				if self.board[row][col] != self.BLANK_POS:
-					result += f"\t {self.PLAYER_0_ICON if self.board[row][col] == self.PLAYER_0 else self.PLAYER_1_ICON} ║"
-				else:
-					result += f"\t{self.blank_pos_color} {i + 1} {self.exit_color_code}║"
-			# Second column, requires only a space on each side of icon plus right-side seperator
-			elif i in (1, 4, 7):
-				if self.board[row][col] != self.BLANK_POS:
-					result += f" {self.PLAYER_0_ICON if self.board[row][col] == self.PLAYER_0 else self.PLAYER_1_ICON} ║"
-				else:
-					result += f"{self.blank_pos_color} {i + 1} {self.exit_color_code}║"
-			# Third column, requires vertical seperator (only on 1st and 2nd rows)
-			elif i in (2, 5, 8):
-				if self.board[row][col] != self.BLANK_POS:
-					result += f" {self.PLAYER_0_ICON if self.board[row][col] == self.PLAYER_0 else self.PLAYER_1_ICON}\n"
-				else:
-					result += f"{self.blank_pos_color} {i + 1} {self.exit_color_code}\n"
-				if i in (2, 5):
-					result += "\t═══╬═══╬═══\n"
+		settings = self._render_settings
+		text = self.renderBoard()
+		contents = tuple(chain.from_iterable(self.board))
+		drawn = self._drawn_board
+		self._drawn_board = contents
+
+		if not (in_place and drawn is not None and settings == self._render_settings and len(drawn) == len(contents)):
+			self.display(text)
+			return
 
-		print(result)
+		# The board's text ends with an empty line, so the cursor sits two lines below the last row of spaces,
+		# and each earlier row of spaces is two lines (the row and a separator) higher
+		cell_width = len(str(self.num_spaces)) + 2
+		updates = []
+		for space, value in enumerate(contents):
+			if value != drawn[space]:
+				row, col = divmod(space, self.width)
+				lines_up = 2 * (self.height - row)
+				# The tab indent ends at column 9 (counting from 1), then each space is followed by a separator
+				column = 9 + col * (cell_width + 1)
+				updates.append(f"\033[{lines_up}A\033[{column}G{self._redraw_texts[space][value]}\033[{lines_up}B\r")
+		self.display("".join(updates), end="", flush=True)
 
 	def displayResult(self) -> None:
 		"""Checks the game_state and displays how the game ended.
@@ -540,11 +2049,11 @@ class TicTacTerminal(TicTacToe):
 		"""
 
 		if self.game_state == self.PLAYER_0_WINNER:
-			print(f"{self.PLAYER_0_ICON} won the game!")
+			self.display(f"{self.PLAYER_0_ICON} won the game!")
 		elif self.game_state == self.PLAYER_1_WINNER:
-			print(f"{self.PLAYER_1_ICON} won the game!")
+			self.display(f"{self.PLAYER_1_ICON} won the game!")
 		elif self.game_state == self.DRAW_GAME:
-			print("The game ended in a draw")
+			self.display("The game ended in a draw")
 		else:
 			# for no winner
 			pass
@@ -568,23 +2077,44 @@ class TicTacTerminal(TicTacToe):
 			row, col = self.promptUser()
 
 			# Check for special inputs
-			# row == -1 and col == -1 ends game immediately
-			if row != -1 and col != -1:
+			# row == -1 and col == -1 ends game immediately, and row == -2 and col == -2 undoes the last turn
+			if row >= 0 and col >= 0:
 				valid_move = self.checkValidMove(row, col)
 				if not valid_move:
-					print("That space is already taken")
+					self.display("That space is already taken")
+			# row == -3 and col == -3 asks for a hint, then for the move again
+			elif row == -3 and col == -3:
+				self.displayHint(player_icon)
 			else:
-				# return (-1, -1) to end game
+				# return (-1, -1) to end game, or (-2, -2) to undo
 				return row, col
 
 		return row, col
 
+	def displayHint(self, player_icon: int) -> None:
+		"""Prints the result of playing each open space with best play afterwards, best space first (see analyzePosition).
+		Makes no return.
+
+		:param player_icon: the player to move.
+		"""
+
+		descriptions = []
+		for (row, col), result, distance in self.analyzePosition(player_icon):
+			space = row * self.width + col + 1
+			if result is None:
+				descriptions.append(f"{space}: unknown")
+			elif result == "draw":
+				descriptions.append(f"{space}: draw")
+			else:
+				descriptions.append(f"{space}: {result} in {distance}")
+		self.display("Hint - " + ", ".join(descriptions))
+
 	def promptUser(self) -> Tuple[int, int]:
 		"""Connects userMove and userInputHandler to prompt for and accept user input.
 
 		Requests user input for desired move on user's turn (via userInputHandler),
-		validates that input is a single numeric character,
-		converts 9-board format input to 3x3-board format,
+		validates that input is the number of a space on the board,
+		converts the space number to (row, col) format,
 		and then returns selected space to caller (usually userMove method).
 
 		:return: (row, col) as the row and column of the space selected by the user for their move.
@@ -592,18 +2122,22 @@ class TicTacTerminal(TicTacToe):
 
 		while True:
 			choice = self.userInputHandler("Where do you want to play? ")
-			# validate: is single numeric character
-			if len(choice) == 1 and choice.isnumeric():
-				# convert from 1-9 digits as shown to user (see displayBoard)
-				# to zero-indexed 3x3 format used by the rest of the program
-				choice = int(choice) - 1
-				row = floor(choice / 3)
-				col = choice % 3
+			# validate: is the number of a space on the board
+			if choice.isnumeric() and 1 <= int(choice) <= self.num_spaces:
+				# convert from 1-numbered spaces as shown to user (see displayBoard)
+				# to zero-indexed (row, col) format used by the rest of the program
+				row, col = divmod(int(choice) - 1, self.width)
 
 				return row, col
 			# if user inputs "exit", return a special tuple to end the game
 			elif choice == 'exit':
 				return -1, -1
+			# if user inputs "undo", return a special tuple to take back their last move
+			elif choice == 'undo':
+				return -2, -2
+			# if user inputs "hint", return a special tuple to show the result of every move
+			elif choice == 'hint':
+				return -3, -3
 
 	def userInputHandler(self, prompt: str, exclusions: Union[list, str] = None) -> str:
 		"""Allows user to select special options from any input point; otherwise behaves like built-in input function.
@@ -626,7 +2160,7 @@ class TicTacTerminal(TicTacToe):
 				raise Exception(f"Variable exclusions can only be of type list or str, it is {type(exclusions)}")
 
 			# prompt user for input
-			selection = input(prompt)
+			selection = self.readInput(prompt)
 			if selection not in exclusions:
 				# check if input is a special option
 				result = options.get(selection, 'pass')
@@ -638,7 +2172,7 @@ class TicTacTerminal(TicTacToe):
 					return selection
 			# user selects a blocked option (ex "settings" from within settings)
 			else:
-				print('You can not do that right now.')
+				self.display('You can not do that right now.')
 
 
 if __name__ == "__main__":
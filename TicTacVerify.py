@@ -0,0 +1,240 @@
+"""Exhaustive check that a tic-tac-toe bot never loses a 3x3 game, from either side, whatever its random choices.
+
+Every game the bot could play is explored: the opponent tries every open space, and the bot tries every move it
+could pick.  The bot's random choices are enumerated by running it with the game's rng replaced by a chooser that
+returns each option in turn, so the real bot code is checked rather than a model of it.  Positions are remembered
+once explored, so each (position, player to move) is only searched once.  This is only sound for bots that pick
+their move from the position alone; the HISTORY_BOTS also look at the order the moves were played in, so for them
+every move history is searched.
+
+The search is split into one task per opening (the bot's possible first moves when it plays first, the opponent's
+first moves when it plays second), and the tasks are spread over a pool of worker processes.
+
+Usage:
+	python TicTacVerify.py [--bot botMove] [--workers N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import TicTacToe
+
+# Bots that can be verified, by the name of their TicTacToe method
+BOTS = ("botMove", "heuristicBotMove", "greedyBotMove")
+# Bots whose move depends on the move history and not just the position (heuristicBotMove reads the first, third
+# and last moves), so games reaching the same position by different move orders must each be explored
+HISTORY_BOTS = ("heuristicBotMove",)
+
+
+class ScriptedChoices(random.Random):
+	"""A random generator whose choice returns scripted option indexes, used to run a bot down every path.
+	Calls past the end of the script return option 0, and record the other options as new scripts to run.
+	"""
+
+	def __init__(self, script: Tuple[int, ...], pending: List[Tuple[int, ...]]) -> None:
+		"""Starts a run of the bot.
+
+		:param script: the option index to return from each call of choice, in order.
+		:param pending: the list that scripts for the options not taken are added to.
+		"""
+
+		super().__init__(0)
+		self.script = script
+		self.pending = pending
+		self.chosen = []
+
+	def choice(self, options: Sequence):
+		"""Returns the option the script picks for this call.
+
+		:param options: the options the bot is choosing between.
+		:return: the scripted option.
+		"""
+
+		options = list(options)
+		depth = len(self.chosen)
+		if depth < len(self.script):
+			index = self.script[depth]
+		else:
+			index = 0
+			# The other options at this call are explored in later runs
+			for other in range(1, len(options)):
+				self.pending.append(tuple(self.chosen) + (other,))
+		self.chosen.append(index)
+
+		return options[index]
+
+
+def botChoices(game: TicTacToe.TicTacToe, bot_name: str, bot_value: int) -> Set[Tuple[int, int]]:
+	"""Finds every move a bot could pick in the current position, by running it once for each sequence of
+	choices from the game's rng.
+
+	:param game: the game to pick a move in; its rng is restored afterwards.
+	:param bot_name: the name of the bot's move method, from BOTS.
+	:param bot_value: the player the bot moves for.
+	:return: the set of (row, col) moves the bot can return.
+	"""
+
+	bot = getattr(game, bot_name)
+	moves = set()
+	# Sequences of option indexes to return from the rng's choice
+	pending = [()]
+	real_rng = game.rng
+	try:
+		while pending:
+			game.rng = ScriptedChoices(pending.pop(), pending)
+			moves.add(tuple(bot(bot_value)))
+	finally:
+		game.rng = real_rng
+
+	return moves
+
+
+def verifyOpening(task: Tuple[str, int, Tuple[Tuple[int, int], ...]]) -> Dict[str, object]:
+	"""Explores every game that follows an opening.  Runs in a worker process, so it takes and returns plain data.
+
+	:param task: (bot method name, the player value the bot plays, the opening moves played from the empty board).
+	:return: a dict with the "positions" where the bot was to move (as (position index, side) pairs), the number of
+		"nodes" visited, and the move lists of every game the bot "lost" or where it picked an "illegal" move.
+	"""
+
+	bot_name, bot_value, opening = task
+	game = TicTacToe.TicTacToe()
+	player = game.PLAYER_0
+	for row, col in opening:
+		game.updateBoard(row, col, player)
+		player = -player
+
+	bot_winner = game.PLAYER_0_WINNER if bot_value == game.PLAYER_0 else game.PLAYER_1_WINNER
+	results = {"positions": set(), "nodes": 0, "lost": [], "illegal": []}
+	explored = set()
+	by_history = bot_name in HISTORY_BOTS
+
+	def explore(player_value: int) -> None:
+		results["nodes"] += 1
+		if game.game_state != game.GAME_IN_PROGRESS:
+			if game.game_state not in (bot_winner, game.DRAW_GAME):
+				results["lost"].append(game.move_history)
+			return
+
+		key = (game.positionIndex(), player_value)
+		memo_key = tuple(game.move_history) if by_history else key
+		if memo_key in explored:
+			return
+		explored.add(memo_key)
+
+		if player_value == bot_value:
+			results["positions"].add(key)
+			moves = sorted(botChoices(game, bot_name, bot_value))
+		else:
+			moves = game.legalMoves()
+
+		for row, col in moves:
+			if not (0 <= row < 3 and 0 <= col < 3 and game.checkValidMove(row, col)):
+				results["illegal"].append(game.move_history + [(row, col)])
+				continue
+			game.updateBoard(row, col, player_value)
+			explore(-player_value)
+			game.undoMove()
+
+	explore(player)
+
+	return results
+
+
+def openingTasks(bot_name: str) -> List[Tuple[str, int, Tuple[Tuple[int, int], ...]]]:
+	"""Splits the verification of a bot into one task per opening move, for both sides.
+
+	:param bot_name: a name from BOTS.
+	:return: the verifyOpening tasks.
+	"""
+
+	game = TicTacToe.TicTacToe()
+	# Playing first, the openings are the bot's own possible first moves
+	tasks = [(bot_name, game.PLAYER_0, (move,)) for move in sorted(botChoices(game, bot_name, game.PLAYER_0))]
+	# Playing second, they are the opponent's first moves
+	tasks += [(bot_name, game.PLAYER_1, (move,)) for move in game.legalMoves()]
+
+	return tasks
+
+
+def verifyBot(bot_name: str = "botMove", workers: Optional[int] = None) -> Dict[str, object]:
+	"""Checks every game a bot could play, from both sides, for losses and illegal moves.
+
+	:param bot_name: a name from BOTS.
+	:param workers: the number of worker processes, defaults to the number of CPUs; 1 verifies in this process.
+	:return: a dict with the number of distinct "positions" where the bot was to move, the "nodes" visited,
+		the move lists of up to 10 "lost" and "illegal" games with their totals, "seconds" and "positions_per_sec".
+	"""
+
+	if bot_name not in BOTS:
+		raise ValueError(f"Unknown bot {bot_name!r}, expected one of {BOTS}")
+
+	workers = workers or os.cpu_count() or 1
+	start = time.perf_counter()
+	tasks = openingTasks(bot_name)
+	if workers == 1:
+		task_results = [verifyOpening(task) for task in tasks]
+	else:
+		with ProcessPoolExecutor(max_workers=workers) as pool:
+			task_results = list(pool.map(verifyOpening, tasks))
+	elapsed = time.perf_counter() - start
+
+	positions = set()
+	lost = []
+	illegal = []
+	for results in task_results:
+		positions |= results["positions"]
+		lost += results["lost"]
+		illegal += results["illegal"]
+
+	return {
+		"bot": bot_name,
+		"workers": workers,
+		"positions": len(positions),
+		"nodes": sum(results["nodes"] for results in task_results),
+		"num_lost": len(lost),
+		"lost": lost[:10],
+		"num_illegal": len(illegal),
+		"illegal": illegal[:10],
+		"seconds": round(elapsed, 6),
+		"positions_per_sec": round(len(positions) / elapsed, 1) if elapsed else None
+	}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	"""Verifies a bot from the command line and prints the results.
+
+	:param argv: the command line arguments, defaults to sys.argv.
+	:return: the exit code: 0 if the bot never loses or moves illegally, 1 otherwise.
+	"""
+
+	parser = argparse.ArgumentParser(description="Exhaustively check that a 3x3 tic-tac-toe bot never loses.")
+	parser.add_argument("--bot", choices=BOTS, default="botMove", help="the bot to verify (default botMove)")
+	parser.add_argument("--workers", type=int, help="worker processes (default: the number of CPUs)")
+	args = parser.parse_args(argv)
+
+	results = verifyBot(args.bot, args.workers)
+	print(
+		f"{results['bot']}: {results['positions']} positions ({results['nodes']} nodes) in {results['seconds']:.2f}s "
+		f"on {results['workers']} workers, {results['positions_per_sec']} positions/sec"
+	)
+	for name in ("lost", "illegal"):
+		if results[f"num_{name}"]:
+			print(f"{results[f'num_{name}']} games {name}, for example:")
+			for moves in results[name]:
+				print("  " + " ".join(f"{row},{col}" for row, col in moves))
+
+	if results["num_lost"] or results["num_illegal"]:
+		return 1
+
+	print("The bot never loses.")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -1,31 +1,76 @@
-from sys import exit
-import TicTacToe
+import importlib
+import sys
 
-games = [TicTacToe.TicTacTerminal()]
+# Every game in the launcher, as (name shown in the menu, "module:class" of its terminal interface).
+# A game's module is only imported, and its class only instantiated, when the game is picked.
+GAMES = [
+	("Tic-Tac-Toe", "TicTacToe:TicTacTerminal")
+]
 
-while True:
-	print(f"There are {len(games)} games...")
-	for idx, game in enumerate(games, start=1):
-		print(f"{idx}: {game.gameName()}")
+# Games already loaded, by their position in GAMES, so replays reuse the same instance
+loaded_games = {}
+
+
+def loadGame(index: int):
+	"""Imports and instantiates a game from GAMES, the first time it is picked.
+
+	:param index: the position of the game in GAMES.
+	:return: the game's terminal interface.
+	"""
+
+	if index not in loaded_games:
+		module_name, class_name = GAMES[index][1].split(":")
+		loaded_games[index] = getattr(importlib.import_module(module_name), class_name)()
+
+	return loaded_games[index]
+
+
+def printMenu() -> None:
+	"""Prints the list of games.
+	Makes no return.
+	"""
+
+	print(f"There are {len(GAMES)} games...")
+	for idx, (name, _) in enumerate(GAMES, start=1):
+		print(f"{idx}: {name}")
+
+
+def main() -> None:
+	"""Runs the launcher: prints the menu, then plays the games the user picks until they exit.
+	Makes no return.
+	"""
 
 	while True:
-		print("\nWhich do you want to play?")
-		selection = input("To select a game enter it's number, or to exit enter 'exit': ")
-
-		if selection.isnumeric():
-			selection = int(selection) - 1
-			if selection < len(games):
-				cont = True
-				while cont:
-					games[selection].terminalGame()
-					cont = input("Would you like to play this game again? (y/n): ")
-					cont = True if cont.lower() == "y" else False
-				break
+		printMenu()
+
+		while True:
+			print("\nWhich do you want to play?")
+			selection = input("To select a game enter it's number, or to exit enter 'exit': ")
+
+			if selection.isnumeric():
+				selection = int(selection) - 1
+				if selection < len(GAMES):
+					game = loadGame(selection)
+					cont = True
+					while cont:
+						game.terminalGame()
+						cont = input("Would you like to play this game again? (y/n): ")
+						cont = True if cont.lower() == "y" else False
+					break
+				else:
+					print("There are not that many games!")
+					continue
+			elif selection == "exit":
+				sys.exit(0)
 			else:
-				print("There are not that many games!")
+				print("Invalid input")
 				continue
-		elif selection == "exit":
-			exit(0)
-		else:
-			print("Invalid input")
-			continue
+
+
+if __name__ == "__main__":
+	# Used to measure startup time (see TicTacBench.measureStartup): print the menu and exit without waiting for input
+	if "--print-menu" in sys.argv[1:]:
+		printMenu()
+		sys.exit(0)
+
+	main()
@@ -0,0 +1,105 @@
+"""Contains tests for the TicTacBatch.py module.
+    - test_batch_matches_single_games: Tests that every batched game matches the same game played on TicTacToe.
+    - test_random_moves_are_legal: Tests that randomMoves only picks open spaces and skips finished games.
+    - test_applyMoves_rejects_invalid_moves: Tests that taken spaces and finished games raise errors.
+    - test_resetGames_resets_selected_games: Tests that resetGames only resets the selected games.
+    - test_bestMoves_match_the_perfect_play_table: Tests that batched bot moves are best moves of every position.
+"""
+
+import numpy as np
+import pytest
+import TicTacToe
+
+from TicTacBatch import NO_MOVE, BatchTicTacToe, bestMoves
+from TicTacSolver import PerfectPlayTable
+
+
+def test_batch_matches_single_games():
+    """Tests that the boards and game states of every batched game match the same game played on TicTacToe."""
+    rng = np.random.default_rng(0)
+    batch = BatchTicTacToe(500)
+    games = [TicTacToe.TicTacToe() for _ in range(0, batch.num_games)]
+    player = batch.PLAYER_0
+    while np.any(batch.game_state == batch.GAME_IN_PROGRESS):
+        moves = batch.randomMoves(rng)
+        states = batch.applyMoves(moves)
+        for game, move, state in zip(games, moves, states):
+            if move != batch.NO_MOVE:
+                game.updateBoard(int(move) // 3, int(move) % 3, player)
+            assert game.game_state == state
+        player = -player
+
+    for game, board in zip(games, batch.boards):
+        assert game.board == board.tolist()
+
+
+def test_random_moves_are_legal():
+    """Tests that randomMoves only picks open spaces, and gives NO_MOVE to finished games."""
+    rng = np.random.default_rng(1)
+    batch = BatchTicTacToe(1000)
+    for _ in range(0, 9):
+        legal = batch.legalMoves()
+        moves = batch.randomMoves(rng)
+        in_progress = batch.game_state == batch.GAME_IN_PROGRESS
+        assert np.all(moves[~in_progress] == batch.NO_MOVE)
+        assert np.all(legal[np.flatnonzero(in_progress), moves[in_progress]])
+        batch.applyMoves(moves)
+    assert not np.any(batch.game_state == batch.GAME_IN_PROGRESS)
+
+
+def test_applyMoves_rejects_invalid_moves():
+    """Tests that moving on a taken space, or in a finished game, raises a ValueError."""
+    batch = BatchTicTacToe(1)
+    batch.applyMoves([4])
+    with pytest.raises(ValueError):
+        batch.applyMoves([4])
+
+    for space in (0, 3, 1, 6, 2):
+        batch.applyMoves([space])
+    assert batch.game_state[0] == batch.PLAYER_1_WINNER
+    with pytest.raises(ValueError):
+        batch.applyMoves([8])
+
+
+def test_resetGames_resets_selected_games():
+    """Tests that resetGames only resets the selected games."""
+    batch = BatchTicTacToe(3)
+    batch.applyMoves([0, 1, 2])
+    batch.resetGames(np.array([False, True, False]))
+    assert batch.legalMoves().sum(axis=1).tolist() == [8, 9, 8]
+    assert batch.to_move.tolist() == [1, 0, 1]
+
+
+def test_bestMoves_match_the_perfect_play_table():
+    """Tests that bestMoves picks one of the table's best moves for every position of a batch of random games,
+    NO_MOVE for finished ones, that bad boards raise errors, and that the batch engine playing botMoves
+    against itself always draws.
+    """
+    table = PerfectPlayTable.shared()
+    rng = np.random.default_rng(2)
+    batch = BatchTicTacToe(2000)
+    for _ in range(0, 9):
+        batch.applyMoves(batch.randomMoves(rng))
+        batch.resetGames(rng.random(batch.num_games) < 0.1)
+
+    games = [TicTacToe.TicTacToe() for _ in range(0, batch.num_games)]
+    for game, board in zip(games, batch.boards):
+        game.board = board.tolist()
+    players = np.where(batch.to_move == 0, batch.PLAYER_0, batch.PLAYER_1)
+    for moves in (bestMoves(batch.boards, players), bestMoves(batch.boards.reshape(-1, 9), players, rng)):
+        for game, side, move in zip(games, batch.to_move, moves):
+            best_moves = table.bestMoves(game.positionIndex(), int(side))
+            assert move == NO_MOVE if best_moves == 0 else best_moves >> int(move) & 1
+    assert bestMoves(np.zeros((1, 3, 3)), batch.PLAYER_0).tolist() == [0]
+
+    with pytest.raises(ValueError):
+        bestMoves(np.zeros((2, 4, 4)), batch.PLAYER_0)
+    with pytest.raises(ValueError):
+        bestMoves(np.full((2, 9), batch.PLAYER_1 + 1), batch.PLAYER_0)
+    with pytest.raises(ValueError):
+        bestMoves(np.zeros((2, 9)), [batch.PLAYER_0, batch.BLANK_POS])
+
+    batch = BatchTicTacToe(500)
+    while np.any(batch.game_state == batch.GAME_IN_PROGRESS):
+        batch.applyMoves(batch.botMoves(rng))
+    assert np.all(batch.game_state == batch.DRAW_GAME)
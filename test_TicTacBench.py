@@ -0,0 +1,95 @@
+"""Contains tests for the TicTacBench.py module.
+    - test_runScenario_reports_metrics: Tests that a scenario run reports every compared metric and all games.
+    - test_compareResults_flags_regressions: Tests that only metrics worse than the threshold are reported.
+    - test_main_writes_json_and_fails_on_regression: Tests the command line output file and exit codes.
+    - test_live_games_stay_compact: Tests that live games have no per-instance dict and a small memory footprint.
+    - test_replaySessions_checks_transcripts: Tests that replayed terminal sessions are checked against their transcripts.
+"""
+
+import json
+import pytest
+import TicTacBench
+
+
+def test_runScenario_reports_metrics():
+    """Tests that a scenario run reports every compared metric and accounts for every game."""
+    for engine in TicTacBench.ENGINES:
+        results = TicTacBench.runScenario("bot-vs-random", 20, engine)
+        for metric in TicTacBench.COMPARED_METRICS:
+            assert results[metric] > 0
+        assert results["player_0_wins"] + results["player_1_wins"] + results["draws"] == 20
+        # The bot plays first in this scenario and should never lose
+        assert results["player_1_wins"] == 0
+
+    results = TicTacBench.runScenario("random-vs-random", 5)
+    assert results["bot_moves"] == 0
+    assert results["bot_move_p99_us"] is None
+
+
+def test_compareResults_flags_regressions():
+    """Tests that only metrics worse than the threshold are reported, in the right direction for each metric."""
+    baseline = {"results": {"bot-vs-bot": {"games_per_sec": 1000.0, "bot_move_p99_us": 10.0}}}
+    current = {"results": {"bot-vs-bot": {"games_per_sec": 900.0, "bot_move_p99_us": 15.0}}}
+    regressions = TicTacBench.compareResults(current, baseline, 0.25)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("bot-vs-bot bot_move_p99_us")
+
+    # Faster results are never regressions
+    assert TicTacBench.compareResults(baseline, current, 0.0) == []
+
+
+def test_main_writes_json_and_fails_on_regression(tmp_path):
+    """Tests that main writes its results as JSON, and returns 1 only when a regression is found.
+
+    :param tmp_path: PyTest fixture providing a temporary directory
+    """
+    output = tmp_path / "results.json"
+    assert TicTacBench.main(["--games", "5", "--output", str(output)]) == 0
+    suite = json.loads(output.read_text())
+    assert set(suite["results"]) == set(TicTacBench.SCENARIOS)
+
+    # A baseline that is impossibly fast must be reported as a regression
+    for results in suite["results"].values():
+        results["games_per_sec"] *= 1000
+    output.write_text(json.dumps(suite))
+    assert TicTacBench.main(["--games", "5", "--baseline", str(output)]) == 1
+
+
+def test_live_games_stay_compact():
+    """Tests that live games use __slots__ and keep a read-only move history, and that measureMemory reports a
+    smaller footprint for each engine than for the baseline layout.
+    """
+    for engine in TicTacBench.ENGINES.values():
+        game = engine()
+        assert not hasattr(game, "__dict__")
+        assert "PLAYER_0" not in engine.__slots__
+        game.updateBoard(1, 1, game.PLAYER_0)
+        game.updateBoard(0, 2, game.PLAYER_1)
+        assert game.move_history == [(1, 1), (0, 2)]
+        with pytest.raises(TypeError):
+            game.move_history.append((2, 2))
+
+    # Enough games that the per-game figures settle
+    baseline = TicTacBench.measureMemory(5000, "baseline")
+    assert baseline["games"] == 5000
+    for engine in TicTacBench.ENGINES:
+        memory = TicTacBench.measureMemory(5000, engine)
+        assert 0 < memory["bytes_per_game"] < baseline["bytes_per_game"]
+
+
+def test_replaySessions_checks_transcripts():
+    """Tests that replaying a recorded session reproduces its transcript, and that changed or short scripts are caught."""
+    inputs = ["1", "X", "5", "exit"]
+    transcript, finished = TicTacBench.replaySession(inputs, seed=3)
+    assert finished and transcript.endswith("Where do you want to play? exit\n")
+
+    sessions = [
+        {"seed": 3, "input": inputs, "output": transcript},
+        {"seed": 3, "input": ["1", "X", "1", "exit"], "output": transcript},
+        {"input": ["0"]},
+        {"input": ["2", "5"]}
+    ]
+    replay = TicTacBench.replaySessions(sessions)
+    assert replay["sessions"] == 4
+    assert replay["mismatched"] == [1]
+    assert replay["unfinished"] == [3]
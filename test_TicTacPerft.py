@@ -0,0 +1,83 @@
+"""Contains tests for the TicTacPerft.py module.
+    - test_whole_tree_matches_known_totals: Tests that counting every 3x3 game gives the known totals.
+    - test_engines_agree_to_a_depth: Tests that both engines count the same tree from the same positions, with
+        depth limits, and that divide adds up to perft.
+    - test_counting_leaves_the_game_unchanged: Tests that perft undoes every move it makes.
+    - test_command_line_checks_totals: Tests the command line counts, exit codes and rejected settings.
+"""
+
+import pytest
+import TicTacToe
+from TicTacPerft import COUNT_KEYS, KNOWN_TOTALS, divide, main, perft, runPerft, startingGame
+
+
+def test_whole_tree_matches_known_totals():
+    """Tests that the whole 3x3 game tree has 255,168 games, split into the known wins and draws, and that the
+    small boards match their hand-counted totals on both engines.
+    """
+    results = runPerft("bitboard")
+    assert {key: results[key] for key in COUNT_KEYS} == KNOWN_TOTALS[(3, 3, 3)] == results["expected"]
+    assert results["player_0_wins"] + results["player_1_wins"] + results["draws"] == 255168
+
+    for size in ((2, 2, 2), (4, 1, 3)):
+        for engine in ("list", "bitboard"):
+            results = runPerft(engine, size)
+            assert {key: results[key] for key in COUNT_KEYS} == KNOWN_TOTALS[size]
+
+
+def test_engines_agree_to_a_depth():
+    """Tests that the list and bitboard engines count the same trees, from the empty board to a depth and from
+    a position to the end, on 3x3 and larger boards, and that divide adds up to perft.
+    """
+    assert runPerft("list", depth=1)["nodes"] == 10
+    assert runPerft("list", depth=2)["nodes"] == 1 + 9 + 72
+    # No game can end before the fifth move
+    assert runPerft("list", depth=4)["unfinished"] == 9 * 8 * 7 * 6
+
+    for size, depth, moves in (((3, 3, 3), 6, ()), ((3, 3, 3), None, ((1, 1), (0, 0))), ((4, 4, 3), 3, ((0, 0),))):
+        counts = [runPerft(engine, size, depth, moves) for engine in ("list", "bitboard")]
+        assert [counts[0][key] for key in COUNT_KEYS] == [counts[1][key] for key in COUNT_KEYS]
+        assert counts[0]["expected"] is None
+
+        game, player = startingGame("list", size, moves)
+        split = divide(game, player, depth)
+        assert len(split) == len(game.legalMoves())
+        assert sum(sub_counts["nodes"] for sub_counts in split.values()) + 1 == counts[0]["nodes"]
+        for key in COUNT_KEYS[1:]:
+            assert sum(sub_counts[key] for sub_counts in split.values()) == counts[0][key]
+
+    with pytest.raises(ValueError):
+        perft(TicTacToe.TicTacToe(), TicTacToe.TicTacToe.PLAYER_0, -1)
+    with pytest.raises(ValueError):
+        startingGame("list", (3, 3, 3), ((0, 0), (0, 0)))
+
+
+def test_counting_leaves_the_game_unchanged():
+    """Tests that the board, history, state and hash are the same after counting as before, on both engines."""
+    for engine in (TicTacToe.TicTacToe, TicTacToe.TicTacBitboard):
+        game = engine()
+        game.updateBoard(0, 0, game.PLAYER_0)
+        game.updateBoard(1, 1, game.PLAYER_1)
+        before = (game.board, game.move_history, game.game_state, game.positionHash(), game.filled_spaces)
+        counts = perft(game, game.PLAYER_0)
+        assert counts["unfinished"] == 0 and counts["nodes"] > 1
+        assert (game.board, game.move_history, game.game_state, game.positionHash(), game.filled_spaces) == before
+
+
+def test_command_line_checks_totals(capsys):
+    """Tests that the command line prints the counts of each engine and the divided counts, and rejects
+    impossible moves, depths and board sizes.
+
+    :param capsys: PyTest fixture capturing printed output
+    """
+    assert main(["--board", "2x2x2"]) == 0
+    output = capsys.readouterr().out
+    assert "list: nodes 41, player_0_wins 24" in output and "bitboard: nodes 41" in output
+
+    assert main(["--engine", "list", "--depth", "2", "--moves", "1,1", "--divide"]) == 0
+    output = capsys.readouterr().out
+    assert "list: nodes 65," in output and "  0,0: nodes 8," in output
+
+    for argv in (["--moves", "1,1 1,1"], ["--moves", "1"], ["--depth", "-1"], ["--board", "3x3"], ["--board", "3x3x4"]):
+        with pytest.raises(SystemExit):
+            main(argv)
@@ -0,0 +1,200 @@
+"""Contains tests for the TicTacRecords.py module.
+    - test_records_round_trip: Tests that recorded games read back with the same moves and results.
+    - test_records_filter_by_opening_and_result: Tests that records can be filtered by opening and game state.
+    - test_openingStats_matches_decoded_records: Tests that the column-wise opening counts match the records.
+    - test_record_files_are_validated: Tests that bad headers, mismatched sizes and partial records are handled.
+    - test_writer_cuts_off_a_partial_record: Tests that appending after a torn last record keeps records aligned.
+    - test_records_view_as_numpy_array: Tests that toArray views the records as a NumPy array, and that the
+        reader explains why it cannot close while the array is alive.
+    - test_server_archives_finished_games: Tests that the game server appends finished games to a record file.
+"""
+
+import json
+import random
+import pytest
+import TicTacToe
+from TicTacRecords import HEADER, GameRecordReader, GameRecordWriter, NO_MOVE, readOpeningStats, recordSize
+from TicTacServer import TicTacServer
+
+
+def playRandomGames(num_games: int, seed: int, width: int = 3, height: int = 3, win_length: int = 3) -> list:
+    """Plays random games to completion.
+
+    :param num_games: the number of games to play
+    :param seed: the seed for the move choices
+    :param width: the number of columns on the board
+    :param height: the number of rows on the board
+    :param win_length: the number in a row needed to win
+    :return: a list of (space indexes of the moves, game state) for every game
+    """
+    rng = random.Random(seed)
+    game = TicTacToe.TicTacToe(width, height, win_length)
+    games = []
+    for _ in range(0, num_games):
+        game.resetGame()
+        player = game.PLAYER_0
+        while game.game_state == game.GAME_IN_PROGRESS:
+            row, col = rng.choice(game.legalMoves())
+            game.updateBoard(row, col, player)
+            player = -player
+        games.append((tuple(row * width + col for row, col in game.move_history), game.game_state))
+    return games
+
+
+def test_records_round_trip(tmp_path):
+    """Tests that recorded games read back with the same moves and results, across several writers.
+
+    :param tmp_path: PyTest fixture providing a temporary directory
+    """
+    path = str(tmp_path / "games.rec")
+    games = playRandomGames(300, seed=1, width=4, height=3, win_length=3)
+    with GameRecordWriter(path, 4, 3, 3, buffer_records=64) as writer:
+        for moves, game_state in games[:200]:
+            writer.writeRecord(moves, game_state)
+    with GameRecordWriter(path, 4, 3, 3) as writer:
+        for moves, game_state in games[200:]:
+            writer.writeRecord(moves, game_state)
+
+    with GameRecordReader(path) as reader:
+        assert (reader.width, reader.height, reader.win_length) == (4, 3, 3)
+        assert len(reader) == 300
+        assert list(reader) == games
+        assert reader.record(299) == games[299]
+        assert reader.gameStates() == bytes(game_state for _, game_state in games)
+        assert reader.movesAt(5) == bytes(moves[5] if len(moves) > 5 else NO_MOVE for moves, _ in games)
+        with pytest.raises(IndexError):
+            reader.record(300)
+
+
+def test_records_filter_by_opening_and_result(tmp_path):
+    """Tests that records can be filtered by their first moves and final game state.
+
+    :param tmp_path: PyTest fixture providing a temporary directory
+    """
+    path = str(tmp_path / "games.rec")
+    games = playRandomGames(500, seed=2)
+    with GameRecordWriter(path) as writer:
+        for moves, game_state in games:
+            writer.writeRecord(moves, game_state)
+
+    with GameRecordReader(path) as reader:
+        expected = [record for record in games if record[0][:2] == (4, 0)]
+        assert list(reader.records(opening=(4, 0))) == expected
+        draws = [record for record in games if record[1] == TicTacToe.TicTacToe.DRAW_GAME]
+        assert list(reader.records(game_state=TicTacToe.TicTacToe.DRAW_GAME)) == draws
+
+
+def test_openingStats_matches_decoded_records(tmp_path):
+    """Tests that the column-wise opening counts match counts made from the decoded records, and add up across files.
+
+    :param tmp_path: PyTest fixture providing a temporary directory
+    """
+    paths = [str(tmp_path / "first.rec"), str(tmp_path / "second.rec")]
+    games = playRandomGames(1000, seed=3)
+    for path, part in zip(paths, (games[:600], games[600:])):
+        with GameRecordWriter(path) as writer:
+            for moves, game_state in part:
+                writer.writeRecord(moves, game_state)
+
+    names = {0x20: "player_0_wins", 0x30: "player_1_wins", 0x40: "draws"}
+    expected = {}
+    for moves, game_state in games:
+        counts = expected.setdefault(moves[:2], {"player_0_wins": 0, "player_1_wins": 0, "draws": 0, "unfinished": 0})
+        counts[names[game_state]] += 1
+
+    assert readOpeningStats(paths, depth=2) == expected
+    with GameRecordReader(paths[0]) as reader:
+        first_moves = reader.openingStats()
+        assert sum(sum(counts.values()) for counts in first_moves.values()) == 600
+
+
+def test_record_files_are_validated(tmp_path):
+    """Tests that bad headers and mismatched board sizes raise errors, and that a partial last record is ignored.
+
+    :param tmp_path: PyTest fixture providing a temporary directory
+    """
+    path = tmp_path / "games.rec"
+    with GameRecordWriter(str(path)) as writer:
+        writer.writeGame(TicTacToe.TicTacBitboard())
+        with pytest.raises(ValueError):
+            writer.writeGame(TicTacToe.TicTacToe(4, 4, 3))
+        with pytest.raises(ValueError):
+            writer.writeRecord(list(range(0, 10)), 0x40)
+    with pytest.raises(ValueError):
+        GameRecordWriter(str(path), 4, 4, 3)
+    with pytest.raises(ValueError):
+        GameRecordWriter(str(tmp_path / "huge.rec"), 16, 16, 5)
+
+    with open(path, "ab") as file:
+        file.write(b"\x40\x09\x00")
+    with GameRecordReader(str(path)) as reader:
+        assert list(reader) == [((), TicTacToe.TicTacToe.GAME_IN_PROGRESS)]
+
+    (tmp_path / "bad.rec").write_bytes(b"not a record file")
+    with pytest.raises(ValueError):
+        GameRecordReader(str(tmp_path / "bad.rec"))
+
+
+def test_writer_cuts_off_a_partial_record(tmp_path):
+    """Tests that reopening a record file whose last record was cut short drops that record, so the records appended
+    afterwards read back intact.
+
+    :param tmp_path: PyTest fixture providing a temporary directory
+    """
+    path = tmp_path / "games.rec"
+    games = playRandomGames(6, seed=5)
+    with GameRecordWriter(str(path)) as writer:
+        for moves, game_state in games[:3]:
+            writer.writeRecord(moves, game_state)
+    path.write_bytes(path.read_bytes()[:-4])
+
+    with GameRecordWriter(str(path)) as writer:
+        for moves, game_state in games[3:]:
+            writer.writeRecord(moves, game_state)
+    with GameRecordReader(str(path)) as reader:
+        assert list(reader) == games[:2] + games[3:]
+    assert path.stat().st_size == HEADER.size + 5 * recordSize(3, 3)
+
+
+def test_records_view_as_numpy_array(tmp_path):
+    """Tests that toArray views the records without copying, with the recorded fields, that closing the reader
+    while the array is alive raises a BufferError and leaves it readable, and that a copy outlives the reader.
+
+    :param tmp_path: PyTest fixture providing a temporary directory
+    """
+    np = pytest.importorskip("numpy")
+    path = str(tmp_path / "games.rec")
+    games = playRandomGames(50, seed=4)
+    with GameRecordWriter(path) as writer:
+        for moves, game_state in games:
+            writer.writeRecord(moves, game_state)
+
+    reader = GameRecordReader(path)
+    records = reader.toArray()
+    assert records["game_state"].tolist() == [game_state for _, game_state in games]
+    assert records["num_moves"].tolist() == [len(moves) for moves, _ in games]
+    assert np.all(records["moves"][:, 0] == [moves[0] for moves, _ in games])
+
+    with pytest.raises(BufferError, match="toArray"):
+        reader.close()
+    assert reader.record(0) == games[0]
+    kept = records.copy()
+    del records
+    reader.close()
+    assert kept["game_state"].tolist() == [game_state for _, game_state in games]
+
+
+def test_server_archives_finished_games(tmp_path):
+    """Tests that the game server appends finished games, and only finished games, to a record file.
+
+    :param tmp_path: PyTest fixture providing a temporary directory
+    """
+    server = TicTacServer(record_dir=str(tmp_path))
+    _, game = server.handleRequest("POST", "/games", json.dumps({"bot": None}).encode())
+    for row, col in ((0, 0), (1, 0), (0, 1), (1, 1), (0, 2)):
+        server.handleRequest("POST", f"/games/{game['id']}/moves", json.dumps({"row": row, "col": col}).encode())
+    server.handleRequest("POST", "/games", b"")
+    server.closeRecords()
+
+    with GameRecordReader(str(tmp_path / "games_3x3x3.rec")) as reader:
+        assert list(reader) == [((0, 3, 1, 4, 2), TicTacToe.TicTacToe.PLAYER_0_WINNER)]
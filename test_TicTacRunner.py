@@ -0,0 +1,59 @@
+"""Contains tests for the TicTacRunner.py module.
+    - test_results_do_not_depend_on_worker_count: Tests that a seeded run gives the same results on any number of workers.
+    - test_tournament_standings_add_up: Tests that the standings are merged correctly from every match.
+    - test_players_on_larger_boards: Tests that the search bot plays through the runner on a larger board.
+    - test_invalid_settings_raise_errors: Tests that unknown players, engines and board sizes are rejected.
+"""
+
+import argparse
+import pytest
+from TicTacRunner import GameRunner, parseBoardSize
+
+
+def test_results_do_not_depend_on_worker_count():
+    """Tests that a seeded run gives the same results whether it is played in this process or in a pool."""
+    with GameRunner(workers=1, chunk_size=50, seed=7) as runner:
+        in_process = runner.playMatch("bot", "random", 300)
+    with GameRunner(workers=2, chunk_size=50, seed=7) as runner:
+        pooled = runner.playMatch("bot", "random", 300)
+
+    keys = ("games", "player_0_wins", "player_1_wins", "draws")
+    assert [in_process[key] for key in keys] == [pooled[key] for key in keys]
+    assert in_process["games"] == 300
+    assert in_process["player_1_wins"] == 0
+
+
+def test_tournament_standings_add_up():
+    """Tests that every ordered pairing is played and the standings add up from the matches."""
+    with GameRunner(workers=2, chunk_size=40, seed=1) as runner:
+        tournament = runner.playTournament(["bot", "random", "heuristic"], 100)
+
+    assert len(tournament["matches"]) == 6
+    assert tournament["games"] == 600
+    for match in tournament["matches"]:
+        assert match["player_0_wins"] + match["player_1_wins"] + match["draws"] == match["games"] == 100
+
+    standings = tournament["standings"]
+    assert standings["bot"]["losses"] == 0
+    assert sum(standing["wins"] for standing in standings.values()) == \
+        sum(standing["losses"] for standing in standings.values())
+    assert all(sum(standing.values()) == 400 for standing in standings.values())
+
+
+def test_players_on_larger_boards():
+    """Tests that the search bot and greedy bot play through the runner on a 4x4 board with four in a row."""
+    with GameRunner(workers=1, chunk_size=5, size=(4, 4, 4), engine="bitboard") as runner:
+        results = runner.playMatch("alphabeta:2", "greedy", 10)
+    assert results["games"] == 10
+
+
+def test_invalid_settings_raise_errors():
+    """Tests that unknown players, engines and malformed board sizes are rejected before any games are played."""
+    with GameRunner(workers=1) as runner:
+        with pytest.raises(ValueError):
+            runner.playMatch("bot", "nobody", 10)
+    with pytest.raises(ValueError):
+        GameRunner(engine="abacus")
+    assert parseBoardSize("15x15x5") == (15, 15, 5)
+    with pytest.raises(argparse.ArgumentTypeError):
+        parseBoardSize("3x3")
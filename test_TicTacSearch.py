@@ -0,0 +1,177 @@
+"""Contains tests for the TicTacSearch.py module.
+    - test_alpha_beta_solves_classic_board: Tests that the empty 3x3 board is solved to the end as a draw.
+    - test_alpha_beta_plays_game_theoretic_moves: Tests that every 3x3 move keeps the best outcome of the position.
+    - test_alpha_beta_as_terminal_move_function: Tests that the bot can be used as a TicTacTerminal move function.
+    - test_alpha_beta_on_larger_boards: Tests that the bot wins, blocks and keeps to its time budget on larger boards.
+    - test_mcts_draws_against_perfect_play: Tests that the MCTS bot never loses a 3x3 game to the table bot.
+    - test_mcts_budget_and_tree_reuse: Tests that the MCTS bot keeps to its budgets and reuses its tree between moves.
+    - test_bots_share_board_helpers: Tests that both bots find the same wins and candidate moves.
+    - test_alpha_beta_timeout_resets_last_score: Tests that a search stopped before depth 1 leaves no score behind.
+"""
+
+import random
+import time
+import TicTacToe
+from TicTacSearch import AlphaBetaBot, MCTSBot
+from TicTacSolver import PerfectPlayTable
+
+
+def test_alpha_beta_solves_classic_board():
+    """Tests that the empty 3x3 board is searched to the end and found to be a draw."""
+    game = TicTacToe.TicTacToe()
+    bot = AlphaBetaBot(game, time_limit=None)
+    bot(game.PLAYER_0)
+    assert bot.completed_depth == 9
+    assert bot.last_score == 0
+
+
+def test_alpha_beta_plays_game_theoretic_moves():
+    """Tests that, in random 3x3 positions, the bot's move keeps the best outcome the position allows,
+    checked against the perfect-play table, with one transposition table shared by every search.
+    """
+    table = PerfectPlayTable.shared()
+    rng = random.Random(5)
+    game = TicTacToe.TicTacToe()
+    bot = AlphaBetaBot(game, time_limit=None)
+    for _ in range(0, 300):
+        game.resetGame()
+        player = game.PLAYER_0
+        for _ in range(0, rng.randrange(0, 8)):
+            row, col = rng.choice([(r, c) for r in range(0, 3) for c in range(0, 3) if game.checkValidMove(r, c)])
+            game.updateBoard(row, col, player)
+            player = -player
+            if game.game_state != game.GAME_IN_PROGRESS:
+                break
+        if game.game_state != game.GAME_IN_PROGRESS:
+            continue
+
+        side = 0 if player == game.PLAYER_0 else 1
+        best_outcome, _ = table.outcome(game.positionIndex(), side)
+        row, col = bot(player)
+        game.updateBoard(row, col, player)
+        if game.game_state == game.GAME_IN_PROGRESS:
+            reply_outcome, _ = table.outcome(game.positionIndex(), 1 - side)
+            assert PerfectPlayTable.WIN - reply_outcome == best_outcome
+        elif game.game_state == game.DRAW_GAME:
+            assert best_outcome == PerfectPlayTable.DRAW
+        else:
+            assert best_outcome == PerfectPlayTable.WIN
+
+
+def test_alpha_beta_as_terminal_move_function():
+    """Tests that the bot can be assigned as a TicTacTerminal move function, and draws against the table bot."""
+    game = TicTacToe.TicTacTerminal()
+    game.player_0_move = AlphaBetaBot(game, time_limit=None)
+    game.player_1_move = game.botMove
+    for _ in range(0, 5):
+        game.resetGame()
+        player, move_function = game.PLAYER_0, game.player_0_move
+        while game.game_state == game.GAME_IN_PROGRESS:
+            row, col = move_function(player)
+            game.updateBoard(row, col, player)
+            if player == game.PLAYER_0:
+                player, move_function = game.PLAYER_1, game.player_1_move
+            else:
+                player, move_function = game.PLAYER_0, game.player_0_move
+        assert game.game_state == game.DRAW_GAME
+
+
+def test_alpha_beta_on_larger_boards():
+    """Tests that on a 15x15 five-in-a-row board the bot takes a win, blocks a four,
+    and answers within its time budget.
+    """
+    game = TicTacToe.TicTacToe(15, 15, 5)
+    bot = AlphaBetaBot(game, time_limit=0.3)
+    for col in range(3, 7):
+        game.updateBoard(7, col, game.PLAYER_1)
+    for row, col in ((7, 2), (9, 3), (9, 4)):
+        game.updateBoard(row, col, game.PLAYER_0)
+
+    # Player 0 cannot win in one, so must block the four
+    start = time.perf_counter()
+    assert bot(game.PLAYER_0) == (7, 7)
+    assert time.perf_counter() - start < 0.3 + 0.5
+
+    # Player 1 wins in one
+    assert bot(game.PLAYER_1) == (7, 7)
+
+
+def test_mcts_draws_against_perfect_play():
+    """Tests that, with a fixed iteration cap and seed, the MCTS bot draws every 3x3 game against the table bot
+    from either side.
+    """
+    game = TicTacToe.TicTacToe()
+    bot = MCTSBot(game, time_limit=None, max_iterations=1500, rng=random.Random(3))
+    for mcts_player in (game.PLAYER_0, game.PLAYER_1, game.PLAYER_0, game.PLAYER_1):
+        game.resetGame()
+        player = game.PLAYER_0
+        while game.game_state == game.GAME_IN_PROGRESS:
+            row, col = bot(player) if player == mcts_player else game.botMove(player)
+            game.updateBoard(row, col, player)
+            player = -player
+        assert game.game_state == game.DRAW_GAME
+
+
+def test_mcts_budget_and_tree_reuse():
+    """Tests that the MCTS bot stops at its iteration cap and time budget on a larger board,
+    that the tree is reused after the opponent replies, and that it takes wins and blocks.
+    """
+    game = TicTacToe.TicTacBitboard(9, 9, 4)
+    bot = MCTSBot(game, time_limit=None, max_iterations=300, rng=random.Random(0))
+    game.updateBoard(*bot(game.PLAYER_0), game.PLAYER_0)
+    assert bot.iterations == 300 and bot.reused_visits == 0
+    assert sum(bot.moveVisits().values()) == 300
+    game.updateBoard(*game.greedyBotMove(game.PLAYER_1), game.PLAYER_1)
+    bot(game.PLAYER_0)
+    assert 0 < bot.reused_visits < 300
+
+    bot.max_iterations, bot.time_limit = None, 0.1
+    start = time.perf_counter()
+    bot(game.PLAYER_0)
+    assert time.perf_counter() - start < 0.1 + 0.5
+    assert bot.iterations > 0
+
+    game = TicTacToe.TicTacToe(9, 9, 4)
+    for col in range(2, 5):
+        game.updateBoard(4, col, game.PLAYER_1)
+    game.updateBoard(4, 1, game.PLAYER_0)
+    game.updateBoard(0, 0, game.PLAYER_0)
+    bot = MCTSBot(game, time_limit=None, max_iterations=50)
+    assert bot(game.PLAYER_0) == (4, 5)
+    assert bot(game.PLAYER_1) == (4, 5)
+
+
+def test_bots_share_board_helpers():
+    """Tests that both bots find the same wins and candidate moves on a large board, and that AlphaBetaBot orders
+    exactly those candidates.
+    """
+    game = TicTacToe.TicTacToe(6, 6, 4)
+    alpha_beta = AlphaBetaBot(game, time_limit=None, max_depth=1)
+    mcts = MCTSBot(game, time_limit=None, max_iterations=1)
+    alpha_beta._prepare()
+    mcts._prepare()
+    assert alpha_beta._candidateMoves(0, 0) == mcts._candidateMoves(0, 0) == [2 * 6 + 2]
+    mine, theirs = 1 << 14, 1 << 15
+    assert alpha_beta._candidateMoves(mine, theirs) == mcts._candidateMoves(mine, theirs)
+    assert sorted(alpha_beta._orderedMoves(mine, theirs, None)) == mcts._candidateMoves(mine, theirs)
+    row = 0b1111 << 6
+    assert alpha_beta._isWin(row, 9) and mcts._isWin(row, 9)
+    assert not alpha_beta._isWin(row ^ 1 << 9, 8) and not mcts._isWin(row ^ 1 << 9, 8)
+
+
+def test_alpha_beta_timeout_resets_last_score():
+    """Tests that when a search runs out of time before finishing depth 1, completed_depth and last_score are both
+    0 rather than left over from the previous search.
+    """
+    game = TicTacToe.TicTacToe(7, 7, 4)
+    for row, col, player in ((3, 3, game.PLAYER_0), (3, 4, game.PLAYER_1), (2, 3, game.PLAYER_0), (0, 0, game.PLAYER_1)):
+        game.updateBoard(row, col, player)
+    bot = AlphaBetaBot(game, time_limit=None, max_depth=2)
+    bot(game.PLAYER_0)
+    assert bot.completed_depth == 2 and bot.last_score != 0
+
+    bot.time_limit = 0
+    bot.NODES_PER_CLOCK_CHECK = 1
+    row, col = bot(game.PLAYER_0)
+    assert game.checkValidMove(row, col)
+    assert bot.completed_depth == 0 and bot.last_score == 0
@@ -0,0 +1,216 @@
+"""Contains tests for the TicTacServer.py and TicTacLoad.py modules.
+    - test_bot_replies_inline: Tests that a move gets the bot's reply in the same response.
+    - test_invalid_requests_get_error_statuses: Tests that bad ids, routes, bodies and moves get error statuses.
+    - test_oversized_boards_are_refused: Tests that boards over the server's size and win length limits are refused
+        before they are built, and that the board shape caches stay bounded.
+    - test_two_remote_players_alternate: Tests that a game without a bot alternates between remote players.
+    - test_server_serves_concurrent_games_over_http: Tests many games played at once over localhost connections.
+    - test_analysis_route_scores_every_move: Tests that a game's analysis lists every legal move with its result,
+        and that boards too big to analyze are refused.
+    - test_bot_moves_route_answers_many_positions: Tests that one request gets bot moves for many positions.
+    - test_session_snapshot_round_trips: Tests that a session snapshot restores the game, bot side and turn.
+"""
+
+import asyncio
+import json
+import time
+import pytest
+import TicTacToe
+from TicTacLoad import HttpClient, runLoadInProcess
+from TicTacServer import MAX_ANALYSIS_SPACES, GameSession, TicTacServer
+
+
+def request(server: TicTacServer, method: str, path: str, payload=None):
+    """Routes a request through the server without a connection.
+
+    :param server: the server to send the request to
+    :param method: the HTTP method
+    :param path: the request path
+    :param payload: the optional JSON body
+    :return: the status code and response payload
+    """
+    return server.handleRequest(method, path, b"" if payload is None else json.dumps(payload).encode())
+
+
+def test_bot_replies_inline():
+    """Tests that a move gets the bot's reply in the same response, and that a bot playing player 0 opens."""
+    server = TicTacServer()
+    status, game = request(server, "POST", "/games", {})
+    assert status == 201
+    assert game["state"] == "in_progress" and game["next_player"] == -1
+
+    status, game = request(server, "POST", f"/games/{game['id']}/moves", {"row": 1, "col": 1})
+    assert status == 200
+    row, col = game["last_bot_move"]
+    assert game["board"][1][1] == -1 and game["board"][row][col] == 1
+    assert game["next_player"] == -1
+
+    status, game = request(server, "POST", "/games", {"bot": "player_0", "width": 5, "height": 5, "win_length": 4})
+    assert sum(value != 0 for board_row in game["board"] for value in board_row) == 1
+    assert game["next_player"] == 1
+
+
+def test_invalid_requests_get_error_statuses():
+    """Tests that unknown ids and routes, bad bodies, taken spaces and finished games get error statuses."""
+    server = TicTacServer(max_sessions=1)
+    assert request(server, "GET", "/games/nope")[0] == 404
+    assert request(server, "GET", "/nowhere")[0] == 404
+    assert request(server, "GET", "/games")[0] == 405
+    assert server.handleRequest("POST", "/games", b"{not json")[0] == 400
+    assert request(server, "POST", "/games", {"width": 0})[0] == 400
+    assert request(server, "POST", "/games", {"bot": "player_2"})[0] == 400
+
+    _, game = request(server, "POST", "/games", {"bot": None})
+    assert request(server, "POST", "/games", {})[0] == 503
+    moves_path = f"/games/{game['id']}/moves"
+    assert request(server, "POST", moves_path, {"row": "1", "col": 1})[0] == 400
+    assert request(server, "POST", moves_path, {"row": 3, "col": 0})[0] == 400
+    assert request(server, "POST", moves_path, {"row": 0, "col": 0})[0] == 200
+    assert request(server, "POST", moves_path, {"row": 0, "col": 0})[0] == 409
+
+    assert request(server, "DELETE", f"/games/{game['id']}") == (200, {"id": game["id"], "deleted": True})
+    assert request(server, "GET", f"/games/{game['id']}")[0] == 404
+
+
+def test_oversized_boards_are_refused():
+    """Tests that a game larger than the server's board limit, or with a longer win length than its limit, gets a
+    400 straight away without its geometry being built or cached, that boards up to the limits are still hosted,
+    and that creating many board shapes keeps at most SHAPE_CACHE_SIZE of each in the caches.
+    """
+    server = TicTacServer()
+    cached_sizes = len(TicTacToe.TicTacToe._space_rays_cache)
+    start = time.perf_counter()
+    status, payload = request(server, "POST", "/games", {"width": 100000, "height": 100000})
+    assert status == 400 and "at most 1024 spaces" in payload["error"]
+    assert time.perf_counter() - start < 0.1
+    assert len(TicTacToe.TicTacToe._space_rays_cache) == cached_sizes and not server.sessions
+
+    status, payload = request(server, "POST", "/games", {"width": 1, "height": 1024, "win_length": 1000})
+    assert status == 400 and "at most 10" in payload["error"]
+    assert len(TicTacToe.TicTacToe._space_rays_cache) == cached_sizes and not server.sessions
+
+    server = TicTacServer(max_board_spaces=20, max_win_length=4)
+    assert request(server, "POST", "/games", {"width": 5, "height": 5, "win_length": 4})[0] == 400
+    assert request(server, "POST", "/games", {"width": 5, "height": 4, "win_length": 5})[0] == 400
+    assert request(server, "POST", "/games", {"width": 5, "height": 4, "win_length": 4})[0] == 201
+
+    server = TicTacServer(engine="bitboard")
+    _, first = request(server, "POST", "/games", {"width": 7, "height": 7, "win_length": 4, "bot": None})
+    request(server, "POST", f"/games/{first['id']}/moves", {"row": 0, "col": 1})
+    first_game = server.sessions[first["id"]].game
+    canonical_hash = first_game.canonicalHash()
+    for width in range(1, 41):
+        assert request(server, "POST", "/games", {"width": width, "height": 2, "win_length": 2, "bot": None})[0] == 201
+    for cache in (TicTacToe.TicTacToe._space_rays_cache, TicTacToe.TicTacToe._zobrist_cache,
+                  TicTacToe.TicTacBitboard._line_masks_cache):
+        assert len(cache) == TicTacToe.TicTacToe.SHAPE_CACHE_SIZE
+    # Shapes dropped from the caches are rebuilt the same, so games of those shapes keep working
+    assert (7, 7) not in TicTacToe.TicTacToe._zobrist_cache and first_game.canonicalHash() == canonical_hash
+
+
+def test_two_remote_players_alternate():
+    """Tests that a game without a bot alternates between two remote players until it is won."""
+    server = TicTacServer(engine="bitboard")
+    _, game = request(server, "POST", "/games", {"bot": None})
+    for row, col in ((0, 0), (1, 0), (0, 1), (1, 1), (0, 2)):
+        status, game = request(server, "POST", f"/games/{game['id']}/moves", {"row": row, "col": col})
+        assert status == 200
+    assert game["board"][0] == [-1, -1, -1] and game["board"][1][:2] == [1, 1]
+    assert game["state"] == "player_0_won" and game["next_player"] is None
+    assert request(server, "POST", f"/games/{game['id']}/moves", {"row": 2, "col": 2})[0] == 409
+
+
+def test_server_serves_concurrent_games_over_http():
+    """Tests that many games played at once over localhost connections all complete without errors."""
+    results = asyncio.run(runLoadInProcess(num_clients=20, games_per_client=5, idle_sessions=200))
+    assert results["errors"] == 0
+    assert results["games"] == 100
+    assert results["hosted_sessions"] == 200
+    assert results["requests"] >= 100 * 3
+
+    async def closeAfterOneRequest():
+        server = await TicTacServer().start("127.0.0.1", 0)
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+            writer.write(b"GET /stats HTTP/1.1\r\nConnection: close\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+            client = await HttpClient.connect("127.0.0.1", server.sockets[0].getsockname()[1])
+            status, stats = await client.request("GET", "/stats")
+            await client.close()
+        return response, status, stats
+
+    response, status, stats = asyncio.run(closeAfterOneRequest())
+    assert response.startswith(b"HTTP/1.1 200 OK\r\n") and b"Connection: close" in response
+    assert status == 200 and stats["requests_served"] == 1
+
+
+def test_analysis_route_scores_every_move():
+    """Tests that GET /games/<id>/analysis scores every legal move for the player to move, best first,
+    lists no moves once the game is over, and refuses boards over MAX_ANALYSIS_SPACES without searching them.
+    """
+    server = TicTacServer()
+    _, game = request(server, "POST", "/games", {"bot": None})
+    analysis_path = f"/games/{game['id']}/analysis"
+    for row, col in ((0, 0), (0, 1)):
+        request(server, "POST", f"/games/{game['id']}/moves", {"row": row, "col": col})
+
+    status, analysis = request(server, "GET", analysis_path)
+    assert status == 200 and analysis["player"] == -1
+    assert len(analysis["moves"]) == 7
+    assert analysis["moves"][0]["result"] == "win" and analysis["moves"][-1]["result"] in ("draw", "win")
+    assert request(server, "POST", analysis_path, {})[0] == 405
+
+    for row, col in ((1, 0), (1, 1), (2, 0)):
+        request(server, "POST", f"/games/{game['id']}/moves", {"row": row, "col": col})
+    assert request(server, "GET", analysis_path) == (200, {"id": game["id"], "player": None, "moves": []})
+
+    _, game = request(server, "POST", "/games", {"width": 16, "height": 16, "win_length": 5, "bot": None})
+    status, error = request(server, "GET", f"/games/{game['id']}/analysis")
+    assert status == 400 and str(MAX_ANALYSIS_SPACES) in error["error"]
+
+
+def test_bot_moves_route_answers_many_positions():
+    """Tests that POST /bot-moves answers every position in one request, with null for finished games,
+    and rejects malformed boards.
+    """
+    pytest.importorskip("numpy")
+    server = TicTacServer()
+    boards = [
+        [0] * 9,
+        [-1, -1, 0, 1, 1, 0, 0, 0, 0],
+        [-1, -1, -1, 1, 1, 0, 0, 0, 0]
+    ]
+    status, payload = request(server, "POST", "/bot-moves", {"boards": boards, "players": [-1, 1, 1]})
+    assert status == 200
+    assert payload["moves"][1] == [1, 2] and payload["moves"][2] is None
+    assert len(payload["moves"][0]) == 2
+    rows = [[[-1, -1, 0], [1, 1, 0], [0, 0, 0]]]
+    assert request(server, "POST", "/bot-moves", {"boards": rows, "players": -1}) == (200, {"moves": [[0, 2]]})
+    assert request(server, "POST", "/bot-moves", {"boards": []}) == (200, {"moves": []})
+
+    assert request(server, "POST", "/bot-moves", {"boards": [[0] * 8]})[0] == 400
+    assert request(server, "POST", "/bot-moves", {"boards": [[0] * 9], "players": [2]})[0] == 400
+    assert request(server, "POST", "/bot-moves", {"boards": "nope"})[0] == 400
+    assert request(server, "GET", "/bot-moves")[0] == 405
+
+
+def test_session_snapshot_round_trips():
+    """Tests that a snapshot of a session restores its id, game, bot side and player to move, on either engine,
+    and that the restored session carries on where it left off.
+    """
+    server = TicTacServer()
+    _, game = request(server, "POST", "/games", {"bot": "player_0", "width": 4, "height": 4})
+    request(server, "POST", f"/games/{game['id']}/moves", {"row": 0, "col": 0})
+    session = server.sessions[game["id"]]
+
+    restored = GameSession.fromSnapshot(session.snapshot(), TicTacToe.TicTacBitboard)
+    assert restored.toJson() == {**session.toJson(), "last_bot_move": None}
+    assert (restored.session_id, restored.bot_player, restored.next_player) == (game["id"], -1, 1)
+    row, col = next((row, col) for row in range(0, 4) for col in range(0, 4) if restored.game.checkValidMove(row, col))
+    restored.playMove(row, col)
+    assert len(restored.game.move_history) == 5
+
+    two_players = GameSession("a", TicTacToe.TicTacToe(), None)
+    two_players.playMove(1, 1)
+    assert GameSession.fromSnapshot(two_players.snapshot()).toJson() == two_players.toJson()
@@ -0,0 +1,72 @@
+"""Contains tests for the TicTacSolver.py module.
+    - test_empty_board_is_a_draw: Checks the solved outcome of the empty board.
+    - test_table_round_trips_through_cache_file: Tests that a saved table loads back identically.
+    - test_invalid_cache_file_is_regenerated: Tests that loadOrGenerate replaces a corrupt cache file.
+    - test_position_index_matches_between_engines: Tests that both board engines produce the same position index.
+    - test_botMove_never_loses_to_random_play: Tests that the table-driven bot never loses, playing either side.
+"""
+
+import random
+import TicTacToe
+from TicTacSolver import PerfectPlayTable
+
+
+def test_empty_board_is_a_draw():
+    """Checks that the empty board is a draw in 9 moves, and that every space is a best opening move."""
+    table = PerfectPlayTable.shared()
+    assert table.outcome(0, 0) == (PerfectPlayTable.DRAW, 9)
+    assert table.bestMoves(0, 0) == 0b111111111
+
+
+def test_table_round_trips_through_cache_file(tmp_path):
+    """Tests that a saved table loads back identically.
+
+    :param tmp_path: PyTest fixture providing a temporary directory
+    """
+    table = PerfectPlayTable.shared()
+    path = str(tmp_path / "table.bin")
+    table.save(path)
+    assert PerfectPlayTable.load(path).entries == table.entries
+
+
+def test_invalid_cache_file_is_regenerated(tmp_path):
+    """Tests that loadOrGenerate replaces a corrupt cache file with a valid one.
+
+    :param tmp_path: PyTest fixture providing a temporary directory
+    """
+    path = tmp_path / "table.bin"
+    path.write_bytes(b"not a table")
+    table = PerfectPlayTable.loadOrGenerate(str(path))
+    assert table.entries == PerfectPlayTable.shared().entries
+    assert PerfectPlayTable.load(str(path)).entries == table.entries
+
+
+def test_position_index_matches_between_engines():
+    """Tests that TicTacToe and TicTacBitboard produce the same position index for the same board."""
+    rng = random.Random(1)
+    for _ in range(0, 100):
+        board = [[rng.choice((-1, 0, 1)) for _ in range(0, 3)] for _ in range(0, 3)]
+        list_game = TicTacToe.TicTacToe()
+        bit_game = TicTacToe.TicTacBitboard()
+        list_game.board = board
+        bit_game.board = board
+        assert list_game.positionIndex() == bit_game.positionIndex()
+
+
+def test_botMove_never_loses_to_random_play():
+    """Tests that the table-driven bot never loses against a random opponent, playing either side."""
+    rng = random.Random(2)
+    game = TicTacToe.TicTacToe()
+    for bot_icon, losing_state in ((game.PLAYER_0, game.PLAYER_1_WINNER), (game.PLAYER_1, game.PLAYER_0_WINNER)):
+        for _ in range(0, 200):
+            game.resetGame()
+            player = game.PLAYER_0
+            while game.game_state == game.GAME_IN_PROGRESS:
+                if player == bot_icon:
+                    row, col = game.botMove(player)
+                else:
+                    row, col = rng.choice([(r, c) for r in range(0, 3) for c in range(0, 3) if game.checkValidMove(r, c)])
+                assert game.checkValidMove(row, col)
+                game.updateBoard(row, col, player)
+                player = -player
+            assert game.game_state != losing_state
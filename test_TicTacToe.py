@@ -10,9 +10,56 @@
     - test_bot_blocks_wins: Tests that the bot will block opponent wins when possible.
     - test_resetGame: Tests that the resetGame function properly resets the game.
     - test_updatePlayerIcons_assigns_icons: Tests that the updatePlayerIcons function correctly assigns selected icons.
+    - test_bitboard_engine_matches_list_engine: Tests that TicTacBitboard behaves identically to the list-based engine.
+    - test_bitboard_engine_rejects_invalid_player_value: Tests that TicTacBitboard rejects invalid player values.
+    - test_bitboard_board_is_read_only_and_counts_filled_spaces: Tests that the generated board refuses item
+        assignment, and that filled_spaces is kept up to date as on the list engine.
+    - test_updateBoard_incremental_check_matches_checkBoard: Tests that updateBoard's incremental win and draw
+        detection agrees with checkBoard.
+    - test_mnk_boards_detect_wins_like_a_brute_force_check: Tests win and draw detection on m,n,k boards.
+    - test_mnk_board_sizes_are_validated: Tests that impossible board sizes raise errors.
+    - test_bot_plays_larger_boards: Tests that the bot takes and blocks wins on boards other than 3x3.
+    - test_promptUser_reads_larger_boards: Tests that promptUser accepts space numbers on larger boards.
+    - test_legalMoves_lists_open_spaces: Tests that legalMoves lists exactly the open spaces on both engines.
+    - test_heuristicBotMove_always_picks_a_legal_move: Tests that the heuristic bot always picks an open space.
+    - test_renderBoard_cache_follows_icon_changes: Tests that cached boards are re-rendered after the icons change.
+    - test_displayBoard_in_place_matches_full_redraw: Tests that redrawing changed spaces in place gives the same
+        screen as printing the whole board.
+    - test_scripted_session_runs_without_a_console: Tests that a whole game, with settings changes, can be played
+        from an input script with the output going to a stream.
+    - test_scripted_input_from_a_stream_and_exhaustion: Tests reading a script from a stream, the exit command,
+        and the error when the script runs out.
+    - test_instrumentation_times_methods_and_counts_branches: Tests that enabled instrumentation records timings
+        and bot branch hits, and that disabling it restores the game.
+    - test_position_hash_is_incremental_and_canonical: Tests that the hash kept by updateBoard matches a full rehash
+        on both engines, and that symmetric positions share a canonical hash.
+    - test_undoMove_restores_every_earlier_position: Tests that undoing moves one by one restores the board,
+        game state, history and hash on both engines.
+    - test_bitboard_board_setter_checks_the_new_board: Tests that assigning a board to the bitboard engine sets
+        the game state, filled_spaces and hash of the new board, and clears the undo history.
+    - test_terminal_undo_takes_back_a_turn: Tests the 'undo' command against a bot and between two users.
+    - test_analyzePosition_scores_every_move_from_a_cache: Tests move scores against the perfect-play table and
+        on a larger board, that repeated positions come from the cache, that instrumentation does not record the
+        moves tried by the search, that searches keep to the time limit and unproven analyses are not cached, and
+        that the cache stays bounded.
+    - test_terminal_hint_lists_every_space: Tests that the 'hint' command shows the result of every open space.
+    - test_snapshot_round_trips_games: Tests that snapshots restore the board, history, state and hash on both
+        engines and any board size, and that corrupt snapshots are rejected.
+    - test_terminal_snapshot_resumes_a_session: Tests that a terminal snapshot keeps the player setup and icons,
+        and that the restored game can be resumed.
+    - test_terminal_bot_moves_are_instrumented: Tests that bot moves in a terminal game are timed once it is
+        instrumented, and that it can still be snapshotted.
+    - test_seeded_rng_replays_bot_moves: Tests that games given equally seeded generators make the same bot moves.
+    - test_games_in_threads_match_sequential_play: Tests that games played at once in a thread pool, sharing the
+        analysis cache and one GameStats, give the same results as playing them one by one.
 """
 
+import io
+import random
+import re
+import time
 import TicTacToe
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 from string import printable as printable_chars
 
@@ -336,3 +383,734 @@ def test_bot_avoids_double_middle_trap(tic_tac_toe):
             # check that the bot successfully avoided the trap
             assert tic_tac_toe.board[scenario[3][0]][scenario[3][1]] != tic_tac_toe.PLAYER_1
             tic_tac_toe.move_history = []
+
+
+def test_bitboard_engine_matches_list_engine():
+    """Tests that TicTacBitboard reports the same board, valid moves and game states as the list-based engine
+    over many random games, including direct assignment of the board attribute.
+    """
+    rng = random.Random(0)
+    list_game = TicTacToe.TicTacToe()
+    bit_game = TicTacToe.TicTacBitboard()
+    for _ in range(0, 200):
+        list_game.resetGame()
+        bit_game.resetGame()
+        player = list_game.PLAYER_0
+        while list_game.game_state == list_game.GAME_IN_PROGRESS:
+            row, col = rng.choice([(r, c) for r in range(0, 3) for c in range(0, 3) if list_game.checkValidMove(r, c)])
+            assert bit_game.checkValidMove(row, col) is True
+            list_game.updateBoard(row, col, player)
+            bit_game.updateBoard(row, col, player)
+            assert bit_game.board == list_game.board
+            assert bit_game.game_state == list_game.game_state
+            assert bit_game.move_history == list_game.move_history
+            player = -player
+
+        # Assigning the board directly loads the bitboards
+        bit_game.board = list_game.board
+        bit_game.checkBoard()
+        assert bit_game.board == list_game.board
+        assert bit_game.game_state == list_game.game_state
+
+
+def test_bitboard_engine_rejects_invalid_player_value():
+    """Tests that TicTacBitboard raises the same error as the list-based engine for invalid player values."""
+    with pytest.raises(RuntimeError):
+        TicTacToe.TicTacBitboard().updateBoard(0, 0, 5)
+
+
+def test_updateBoard_incremental_check_matches_checkBoard():
+    """Tests that the incremental win and draw detection in updateBoard agrees with a full checkBoard
+    over many random games, and that a directly assigned board is recounted.
+    """
+    rng = random.Random(3)
+    game = TicTacToe.TicTacToe()
+    reference = TicTacToe.TicTacToe()
+    for _ in range(0, 300):
+        game.resetGame()
+        player = game.PLAYER_0
+        while game.game_state == game.GAME_IN_PROGRESS:
+            row, col = rng.choice([(r, c) for r in range(0, 3) for c in range(0, 3) if game.checkValidMove(r, c)])
+            game.updateBoard(row, col, player)
+            reference.board = [board_row[:] for board_row in game.board]
+            reference.checkBoard()
+            assert game.game_state == reference.game_state
+            assert game.filled_spaces == reference.filled_spaces
+            player = -player
+
+    # A board assigned directly is recounted on the next move
+    game.board = [
+        [game.PLAYER_0, game.PLAYER_1, game.PLAYER_0],
+        [game.PLAYER_0, game.PLAYER_1, game.PLAYER_1],
+        [game.PLAYER_1, game.PLAYER_0, game.BLANK_POS]
+    ]
+    game.game_state = game.GAME_IN_PROGRESS
+    game.updateBoard(2, 2, game.PLAYER_0)
+    assert game.filled_spaces == 9
+    assert game.game_state == game.DRAW_GAME
+
+
+def test_mnk_boards_detect_wins_like_a_brute_force_check():
+    """Tests that both board engines find the same wins and draws as a brute-force check of every line,
+    on several m,n,k board sizes.
+    """
+    def bruteForceState(game):
+        for row in range(0, game.height):
+            for col in range(0, game.width):
+                for row_step, col_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    spaces = [(row + row_step * i, col + col_step * i) for i in range(0, game.win_length)]
+                    if all(0 <= r < game.height and 0 <= c < game.width for r, c in spaces):
+                        values = {game.board[r][c] for r, c in spaces}
+                        if values == {game.PLAYER_0}:
+                            return game.PLAYER_0_WINNER
+                        if values == {game.PLAYER_1}:
+                            return game.PLAYER_1_WINNER
+        if all(value != game.BLANK_POS for board_row in game.board for value in board_row):
+            return game.DRAW_GAME
+        return game.GAME_IN_PROGRESS
+
+    rng = random.Random(4)
+    for width, height, win_length in ((4, 3, 3), (5, 5, 4), (7, 6, 4), (15, 15, 5), (1, 4, 2), (6, 2, 1)):
+        list_game = TicTacToe.TicTacToe(width, height, win_length)
+        bit_game = TicTacToe.TicTacBitboard(width, height, win_length)
+        for _ in range(0, 20):
+            list_game.resetGame()
+            bit_game.resetGame()
+            player = list_game.PLAYER_0
+            while list_game.game_state == list_game.GAME_IN_PROGRESS:
+                open_spaces = [(r, c) for r in range(0, height) for c in range(0, width) if list_game.checkValidMove(r, c)]
+                row, col = rng.choice(open_spaces)
+                list_game.updateBoard(row, col, player)
+                bit_game.updateBoard(row, col, player)
+                assert bit_game.game_state == list_game.game_state
+                assert bit_game.board == list_game.board
+                player = -player
+
+            # The game ended on the first move that made a line or filled the board
+            assert list_game.game_state == bruteForceState(list_game)
+            list_game.updateBoard(row, col, list_game.BLANK_POS)
+            assert bruteForceState(list_game) == list_game.GAME_IN_PROGRESS
+            list_game.updateBoard(row, col, -player)
+
+            # A full check of the finished board agrees too
+            bit_game.board = list_game.board
+            list_game.checkBoard()
+            bit_game.checkBoard()
+            assert list_game.game_state == bit_game.game_state == bruteForceState(list_game)
+
+
+def test_mnk_board_sizes_are_validated():
+    """Tests that impossible board sizes and win lengths raise a ValueError."""
+    for width, height, win_length in ((0, 3, 3), (3, 3, 4), (3, 3, 0)):
+        with pytest.raises(ValueError):
+            TicTacToe.TicTacToe(width, height, win_length)
+
+
+def test_bot_plays_larger_boards(tic_tac_toe: TicTacToe.TicTacTerminal):
+    """Tests that on boards other than 3x3 the bot takes wins, blocks wins, and otherwise opens in the center.
+
+    :param tic_tac_toe: the TicTacToe object to be used in the test
+    """
+    tic_tac_toe.setBoardSize(7, 7, 4)
+    assert tic_tac_toe.emptyBoard() == [[0] * 7 for _ in range(0, 7)]
+    assert tic_tac_toe.botMove(tic_tac_toe.PLAYER_0) == (3, 3)
+
+    for row, col in ((2, 1), (3, 2), (4, 3)):
+        tic_tac_toe.updateBoard(row, col, tic_tac_toe.PLAYER_0)
+    assert tic_tac_toe.botMove(tic_tac_toe.PLAYER_1) in ((1, 0), (5, 4))
+
+    tic_tac_toe.updateBoard(0, 6, tic_tac_toe.PLAYER_1)
+    tic_tac_toe.updateBoard(1, 6, tic_tac_toe.PLAYER_1)
+    tic_tac_toe.updateBoard(2, 6, tic_tac_toe.PLAYER_1)
+    assert tic_tac_toe.botMove(tic_tac_toe.PLAYER_1) == (3, 6)
+
+    with pytest.raises(ValueError):
+        tic_tac_toe.heuristicBotMove(tic_tac_toe.PLAYER_1)
+
+
+def test_promptUser_reads_larger_boards(tic_tac_toe: TicTacToe.TicTacTerminal, monkeypatch):
+    """Tests that promptUser accepts multi-digit space numbers on larger boards and rejects numbers off the board.
+
+    :param tic_tac_toe: the TicTacToe object to be used in the test
+    :param monkeypatch: PyTest fixture used to replace the built-in input function
+    """
+    tic_tac_toe.setBoardSize(5, 4, 4)
+    answers = iter(["0", "21", "12"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    assert tic_tac_toe.promptUser() == (2, 1)
+
+
+def test_legalMoves_lists_open_spaces():
+    """Tests that both engines list exactly the spaces that checkValidMove accepts, in row order."""
+    rng = random.Random(4)
+    for width, height in ((3, 3), (5, 4)):
+        list_game = TicTacToe.TicTacToe(width, height, 3)
+        bit_game = TicTacToe.TicTacBitboard(width, height, 3)
+        for _ in range(0, 50):
+            board = [[rng.choice((-1, 0, 1)) for _ in range(0, width)] for _ in range(0, height)]
+            list_game.board = board
+            bit_game.board = board
+            expected = [(r, c) for r in range(0, height) for c in range(0, width) if list_game.checkValidMove(r, c)]
+            assert list_game.legalMoves() == expected
+            assert bit_game.legalMoves() == expected
+
+
+def test_heuristicBotMove_always_picks_a_legal_move():
+    """Tests that the heuristic bot picks an open space on every turn, playing either side against random moves,
+    including the last open space of a nearly full board."""
+    rng = random.Random(5)
+    for engine in (TicTacToe.TicTacToe, TicTacToe.TicTacBitboard):
+        game = engine()
+        for bot_icon in (game.PLAYER_0, game.PLAYER_1):
+            for _ in range(0, 200):
+                game.resetGame()
+                player = game.PLAYER_0
+                while game.game_state == game.GAME_IN_PROGRESS:
+                    if player == bot_icon:
+                        row, col = game.heuristicBotMove(player)
+                    else:
+                        row, col = rng.choice(game.legalMoves())
+                    assert game.checkValidMove(row, col)
+                    game.updateBoard(row, col, player)
+                    player = -player
+
+        game.board = [[1, -1, 1], [1, -1, -1], [-1, 1, 0]]
+        assert game.heuristicBotMove(game.PLAYER_1) == (2, 2)
+
+
+def test_renderBoard_cache_follows_icon_changes(tic_tac_toe: TicTacToe.TicTacTerminal):
+    """Tests that a cached board is reused, and re-rendered after updatePlayerIcons or a board size change.
+
+    :param tic_tac_toe: the TicTacToe object to be used in the test
+    """
+    tic_tac_toe.updateBoard(1, 1, tic_tac_toe.PLAYER_0)
+    first = tic_tac_toe.renderBoard()
+    assert tic_tac_toe.renderBoard() is first
+    assert "X" in first
+
+    tic_tac_toe.updatePlayerIcons("A", "B")
+    renamed = tic_tac_toe.renderBoard()
+    assert "A" in renamed and "X" not in renamed
+
+    tic_tac_toe.setBoardSize(4, 3, 3)
+    assert renamed.count("\n") == 6 and tic_tac_toe.renderBoard().count("║") == 9
+
+
+def screenAfter(output: str) -> list:
+    """Plays terminal output onto a simulated screen, following the ANSI sequences displayBoard uses.
+
+    :param output: the text written to the terminal
+    :return: the lines of the screen, without colors or trailing spaces
+    """
+    lines, row, col = [[]], 0, 0
+    for token in re.findall(r"\x1b\[[0-9;]*[A-Za-z]|.", output, re.S):
+        if token.startswith("\x1b["):
+            count = int(token[2:-1] or 1) if token[-1] in "ABG" else 0
+            if token[-1] == "A":
+                row -= count
+            elif token[-1] == "B":
+                row += count
+            elif token[-1] == "G":
+                col = count - 1
+        elif token == "\n":
+            row, col = row + 1, 0
+        elif token == "\r":
+            col = 0
+        else:
+            while len(lines) <= row:
+                lines.append([])
+            if token == "\t":
+                col = (col // 8 + 1) * 8
+                continue
+            line = lines[row]
+            line.extend(" " * (col + 1 - len(line)))
+            line[col] = token
+            col += 1
+    return ["".join(line).rstrip() for line in lines]
+
+
+def test_displayBoard_in_place_matches_full_redraw(tic_tac_toe: TicTacToe.TicTacTerminal, capsys):
+    """Tests that redrawing only the changed spaces in place leaves the same screen as printing the whole board.
+
+    :param tic_tac_toe: the TicTacToe object to be used in the test
+    :param capsys: PyTest fixture capturing printed output
+    """
+    rng = random.Random(6)
+    for width, height in ((3, 3), (4, 4)):
+        tic_tac_toe.setBoardSize(width, height, 3)
+        tic_tac_toe.displayBoard()
+        player = tic_tac_toe.PLAYER_0
+        while tic_tac_toe.game_state == tic_tac_toe.GAME_IN_PROGRESS:
+            row, col = rng.choice(tic_tac_toe.legalMoves())
+            tic_tac_toe.updateBoard(row, col, player)
+            tic_tac_toe.displayBoard(in_place=True)
+            player = -player
+        redrawn = capsys.readouterr().out
+
+        tic_tac_toe.displayBoard()
+        full = capsys.readouterr().out
+        assert redrawn.count("║") == full.count("║")
+        assert screenAfter(redrawn) == screenAfter(full)
+
+
+def test_scripted_session_runs_without_a_console(monkeypatch):
+    """Tests that a whole two-player game, with settings changes, can be played from a list of input lines,
+    with everything printed going to the output stream.
+
+    :param monkeypatch: PyTest fixture used to make sure the built-in input function is never called
+    """
+    monkeypatch.setattr("builtins.input", lambda prompt: pytest.fail("input() was called"))
+    output = io.StringIO()
+    script = ["settings", "change icons", "A", "B", "2", "1", "2", "4", "5", "7"]
+    game = TicTacToe.TicTacTerminal(input_source=script, output=output)
+    game.terminalGame()
+
+    transcript = output.getvalue()
+    assert "What do you want first move icon to be? (Traditionally X): A\n" in transcript
+    assert transcript.endswith("A won the game!\n")
+    assert game.move_history == []
+
+
+def test_scripted_input_from_a_stream_and_exhaustion(capsys):
+    """Tests that input lines can come from a text stream, that 'exit' ends the game,
+    and that running out of lines raises EOFError like the built-in input function.
+
+    :param capsys: PyTest fixture capturing printed output
+    """
+    game = TicTacToe.TicTacTerminal(input_source=io.StringIO("2\n5\nexit\n"))
+    game.terminalGame()
+    assert "Where do you want to play? exit\n" in capsys.readouterr().out
+
+    game = TicTacToe.TicTacTerminal(input_source=iter(["2", "5"]), output=io.StringIO())
+    with pytest.raises(EOFError):
+        game.terminalGame()
+
+
+def test_instrumentation_times_methods_and_counts_branches():
+    """Tests that enabled instrumentation records method timings and bot branch hits into a shared GameStats,
+    and that disabled games record nothing and keep their own class."""
+    games = [TicTacToe.TicTacToe(), TicTacToe.TicTacBitboard()]
+    stats = TicTacToe.GameStats()
+    for game in games:
+        assert game.enableInstrumentation(stats) is stats
+        assert isinstance(game, TicTacToe.TicTacToe) and type(game).__name__.startswith("Instrumented")
+        # Double-Middle trap: the heuristic bot avoids it with a corner
+        for row, col, player in ((0, 1, -1), (1, 1, 1), (1, 0, -1)):
+            game.updateBoard(row, col, player)
+        game.heuristicBotMove(game.PLAYER_1)
+        game.updateBoard(2, 2, game.PLAYER_1)
+        game.botMove(game.PLAYER_0)
+
+    snapshot = stats.snapshot()
+    assert snapshot["counters"] == {"heuristicBotMove.double_middle": 2, "botMove.table": 2}
+    assert snapshot["timings"]["updateBoard"]["calls"] == 8
+    assert snapshot["timings"]["botMove"]["calls"] == 2
+    timing = snapshot["timings"]["updateBoard"]
+    assert 0 < timing["p50_ns"] <= timing["p99_ns"] <= timing["max_ns"] <= timing["total_ns"]
+
+    for game in games:
+        game.disableInstrumentation()
+        assert type(game).__name__ in ("TicTacToe", "TicTacBitboard")
+        game.botMove(game.PLAYER_0)
+        game.resetGame()
+    assert stats.snapshot() == snapshot
+
+    game = TicTacToe.TicTacToe(5, 5, 4)
+    game.updateBoard(2, 2, game.PLAYER_0)
+    game.updateBoard(2, 3, game.PLAYER_0)
+    game.updateBoard(2, 4, game.PLAYER_0)
+    game.enableInstrumentation()
+    game.botMove(game.PLAYER_1)
+    assert game.stats.snapshot()["counters"] == {"botMove.greedy": 1, "greedyBotMove.block": 1}
+
+
+def test_position_hash_is_incremental_and_canonical():
+    """Tests that the Zobrist hash kept up to date by updateBoard matches the hash of a freshly loaded board on both
+    engines, that replacing or clearing spaces keeps it right, and that rotated and mirrored positions share
+    a canonical hash while different positions do not.
+    """
+    rng = random.Random(8)
+    for width, height, win_length in ((3, 3, 3), (5, 4, 3)):
+        games = [TicTacToe.TicTacToe(width, height, win_length), TicTacToe.TicTacBitboard(width, height, win_length)]
+        seen = {}
+        for _ in range(0, 30):
+            for game in games:
+                game.resetGame()
+            assert games[0].positionHash() == games[1].positionHash() == 0
+            player = games[0].PLAYER_0
+            while games[0].game_state == games[0].GAME_IN_PROGRESS:
+                row, col = rng.choice(games[0].legalMoves())
+                for game in games:
+                    game.updateBoard(row, col, player)
+                player = -player
+
+                loaded = TicTacToe.TicTacToe(width, height, win_length)
+                loaded.board = [board_row[:] for board_row in games[0].board]
+                position_hash = loaded.positionHash()
+                assert games[0].positionHash() == games[1].positionHash() == position_hash
+                assert seen.setdefault(position_hash, str(loaded.board)) == str(loaded.board)
+
+        # Clearing the last move and playing it again returns to the same hash
+        for game in games:
+            position_hash = game.positionHash()
+            row, col = game.move_history[-1]
+            value = game.board[row][col]
+            game.updateBoard(row, col, game.BLANK_POS)
+            assert game.positionHash() != position_hash
+            game.updateBoard(row, col, value)
+            assert game.positionHash() == position_hash
+
+    game = TicTacToe.TicTacToe()
+    game.updateBoard(0, 0, game.PLAYER_0)
+    game.updateBoard(0, 1, game.PLAYER_1)
+    corner_hash = game.canonicalHash()
+    for corner, edge in (((0, 2), (1, 2)), ((2, 2), (2, 1)), ((2, 0), (1, 0)), ((0, 0), (1, 0))):
+        image = TicTacToe.TicTacBitboard()
+        image.updateBoard(*corner, image.PLAYER_0)
+        image.updateBoard(*edge, image.PLAYER_1)
+        assert image.canonicalHash() == corner_hash
+        assert image.positionHash() != game.positionHash()
+    game.updateBoard(0, 1, game.BLANK_POS)
+    game.updateBoard(1, 1, game.PLAYER_1)
+    assert game.canonicalHash() != corner_hash
+
+
+def test_undoMove_restores_every_earlier_position():
+    """Tests that, on both engines, undoing the moves of random games one at a time (including a move that
+    cleared a space) goes back through exactly the earlier boards, game states, move histories and hashes.
+    """
+    rng = random.Random(4)
+    for engine in (TicTacToe.TicTacToe, TicTacToe.TicTacBitboard):
+        game = engine(5, 4, 3)
+        for _ in range(0, 20):
+            game.resetGame()
+            positions = []
+            player = game.PLAYER_0
+            while game.game_state == game.GAME_IN_PROGRESS:
+                positions.append((game.board, game.game_state, game.move_history, game.positionHash()))
+                row, col = rng.choice(game.legalMoves())
+                game.updateBoard(row, col, player)
+                player = -player
+            positions.append((game.board, game.game_state, game.move_history, game.positionHash()))
+            row, col = game.move_history[0]
+            game.updateBoard(row, col, game.BLANK_POS)
+
+            assert game.undoMove() == (row, col)
+            while positions:
+                assert (game.board, game.game_state, game.move_history, game.positionHash()) == positions.pop()
+                if positions:
+                    game.undoMove()
+            with pytest.raises(RuntimeError):
+                game.undoMove()
+
+
+def test_terminal_undo_takes_back_a_turn():
+    """Tests that 'undo' against the bot takes back the bot's reply and the user's move,
+    that between two users it takes back one move, and that it says so when there is nothing to undo.
+    """
+    histories = []
+    output = io.StringIO()
+    game = TicTacToe.TicTacTerminal(input_source=["1", "X", "undo", "1", "undo", "5", "exit"], output=output)
+    game.resetGame = lambda: histories.append(game.move_history)
+    game.terminalGame()
+    assert "There are no moves to undo." in output.getvalue()
+    assert len(histories[0]) == 2 and histories[0][0] == (1, 1)
+
+    game = TicTacToe.TicTacTerminal(input_source=["2", "1", "2", "undo", "3", "exit"], output=io.StringIO())
+    game.resetGame = lambda: histories.append(game.move_history)
+    game.terminalGame()
+    assert histories[1] == [(0, 0), (0, 2)]
+    assert game.board[0] == [game.PLAYER_0, game.BLANK_POS, game.PLAYER_1]
+
+
+def test_analyzePosition_scores_every_move_from_a_cache(monkeypatch):
+    """Tests that on the 3x3 board the best analyzed moves are exactly the perfect-play table's best moves, that a
+    4x4 three-in-a-row position is proven lost for the second player, that a 20x20 analysis keeps to its time
+    limit and is not cached while moves are unproven, that repeated positions are cache hits
+    that leave the game untouched, that an instrumented game does not time the moves tried by the search, and that
+    the cache drops its least recently used position when full.
+
+    :param monkeypatch: PyTest fixture used to shrink the cache
+    """
+    monkeypatch.setattr(TicTacToe.TicTacToe, "_analysis_cache", TicTacToe.OrderedDict())
+    game = TicTacToe.TicTacToe()
+    analysis = game.analyzePosition(game.PLAYER_0)
+    assert len(analysis) == 9 and all(result == "draw" and distance == 9 for _, result, distance in analysis)
+
+    table = TicTacToe.PerfectPlayTable.shared()
+    for row, col in ((0, 0), (0, 1), (1, 1), (2, 2)):
+        game.updateBoard(row, col, game.PLAYER_0 if len(game.move_history) % 2 == 0 else game.PLAYER_1)
+    board, position_hash = game.board, game.positionHash()
+    analysis = game.analyzePosition(game.PLAYER_0)
+    assert (game.board, game.positionHash(), game.move_history) == (board, position_hash, [(0, 0), (0, 1), (1, 1), (2, 2)])
+    best_moves = table.bestMoves(game.positionIndex(), 0)
+    best_result = analysis[0][1:]
+    assert {row * 3 + col for (row, col), *result in analysis if tuple(result) == best_result} == {
+        space for space in range(0, 9) if best_moves >> space & 1
+    }
+    assert best_result == ("win", table.outcome(game.positionIndex(), 0)[1])
+
+    stats = game.enableInstrumentation()
+    assert game.analyzePosition(game.PLAYER_0) is analysis
+    assert stats.snapshot()["counters"] == {"analyzePosition.cache_hit": 1}
+    # A search on a cache miss makes and takes back moves, which are not the game's own and are not timed
+    game.updateBoard(0, 2, game.PLAYER_0)
+    update_calls = stats.snapshot()["timings"]["updateBoard"]["calls"]
+    game.analyzePosition(game.PLAYER_1)
+    snapshot = stats.snapshot()
+    assert snapshot["timings"]["updateBoard"]["calls"] == update_calls
+    assert snapshot["counters"]["analyzePosition.cache_miss"] == 1
+    assert type(game) is not TicTacToe.TicTacToe and game.stats is stats
+    game.disableInstrumentation()
+
+    game = TicTacToe.TicTacBitboard(4, 4, 3)
+    game.updateBoard(1, 1, game.PLAYER_0)
+    analysis = game.analyzePosition(game.PLAYER_1, time_limit=5)
+    assert len(analysis) == 15 and all(result == "loss" for _, result, _ in analysis)
+
+    # The time limit covers the whole analysis, and analyses with unproven moves are not cached
+    game = TicTacToe.TicTacBitboard(20, 20, 5)
+    game.updateBoard(10, 10, game.PLAYER_0)
+    cached = len(TicTacToe.TicTacToe._analysis_cache)
+    start = time.perf_counter()
+    analysis = game.analyzePosition(game.PLAYER_1, time_limit=0.1)
+    assert time.perf_counter() - start < 0.5
+    assert len(analysis) == 399 and any(result is None for _, result, _ in analysis)
+    assert len(TicTacToe.TicTacToe._analysis_cache) == cached
+
+    monkeypatch.setattr(TicTacToe.TicTacToe, "ANALYSIS_CACHE_SIZE", 2)
+    game = TicTacToe.TicTacToe()
+    for row in range(0, 3):
+        game.updateBoard(row, 0, game.PLAYER_0)
+        game.analyzePosition(game.PLAYER_1)
+    assert len(TicTacToe.TicTacToe._analysis_cache) == 2
+    assert game.analyzePosition(game.PLAYER_1) == ()
+
+
+def test_terminal_hint_lists_every_space():
+    """Tests that entering 'hint' shows the result of every open space, best first, then asks for the move again."""
+    output = io.StringIO()
+    game = TicTacToe.TicTacTerminal(input_source=["2", "1", "2", "hint", "exit"], output=output)
+    game.terminalGame()
+    hint = [line for line in output.getvalue().splitlines() if line.startswith("Hint - ")]
+    assert len(hint) == 1
+    spaces = hint[0][len("Hint - "):].split(", ")
+    assert len(spaces) == 7 and spaces[0].endswith("win in 5")
+    assert {space.split(":")[0] for space in spaces} == {"3", "4", "5", "6", "7", "8", "9"}
+
+
+def test_snapshot_round_trips_games():
+    """Tests that a snapshot restores the board, move history, game state and hash of random games on both
+    engines and several board sizes (including a board with two-byte space indexes), restoring into a game
+    of another size and engine, and that truncated, corrupt and inconsistent snapshots raise ValueErrors.
+    """
+    rng = random.Random(6)
+    for width, height, win_length in ((3, 3, 3), (7, 5, 4), (20, 20, 5)):
+        engines = (TicTacToe.TicTacToe, TicTacToe.TicTacBitboard)
+        for engine, other_engine in (engines, engines[::-1]):
+            game = engine(width, height, win_length)
+            player = game.PLAYER_0
+            for _ in range(0, rng.randrange(0, min(game.num_spaces, 30))):
+                if game.game_state != game.GAME_IN_PROGRESS:
+                    break
+                game.updateBoard(*rng.choice(game.legalMoves()), player)
+                player = -player
+
+            data = game.snapshot()
+            assert len(data) == 23 + len(game.move_history) * (1 if game.num_spaces <= 256 else 2)
+            restored = other_engine.fromSnapshot(data)
+            assert (restored.width, restored.height, restored.win_length) == (width, height, win_length)
+            assert (restored.board, restored.move_history, restored.game_state, restored.positionHash()) == (
+                game.board, game.move_history, game.game_state, game.positionHash()
+            )
+            if game.move_history:
+                restored.undoMove()
+
+    game = TicTacToe.TicTacToe()
+    for row, col, player in ((1, 1, game.PLAYER_0), (0, 0, game.PLAYER_1)):
+        game.updateBoard(row, col, player)
+    data = game.snapshot()
+    assert game.restoreSnapshot(data + b"more") == len(data)
+    with pytest.raises(ValueError):
+        TicTacToe.TicTacToe.fromSnapshot(data[:-1])
+    with pytest.raises(ValueError):
+        TicTacToe.TicTacToe.fromSnapshot(b"XXXX" + data[4:])
+    with pytest.raises(ValueError):
+        TicTacToe.TicTacToe.fromSnapshot(data[:-1] + bytes([9]))
+    # A move made out of turn is not the position the moves replay to
+    game.updateBoard(2, 2, game.PLAYER_1)
+    game.updateBoard(0, 1, game.PLAYER_0)
+    with pytest.raises(ValueError):
+        TicTacToe.TicTacToe.fromSnapshot(game.snapshot())
+
+
+def test_terminal_snapshot_resumes_a_session():
+    """Tests that a terminal snapshot keeps the player setup, icons and redraw setting, that the restored game can
+    be resumed from the player to move, and that custom move functions cannot be saved.
+    """
+    game = TicTacToe.TicTacTerminal(output=io.StringIO())
+    game.updatePlayerIcons("\u2716", "O")
+    game.player_0_move, game.player_1_move = game.greedyBotMove, game.userMove
+    game.redraw_in_place = True
+    for row, col, player in ((1, 1, game.PLAYER_0), (0, 0, game.PLAYER_1), (0, 1, game.PLAYER_0)):
+        game.updateBoard(row, col, player)
+
+    output = io.StringIO()
+    restored = TicTacToe.TicTacTerminal.fromSnapshot(game.snapshot(), input_source=["9", "exit"], output=output)
+    assert restored.move_history == game.move_history and restored.board == game.board
+    assert (restored.PLAYER_0_ICON, restored.PLAYER_1_ICON, restored.redraw_in_place) == ("\u2716", "O", True)
+    assert restored.player_0_move == restored.greedyBotMove and restored.player_1_move == restored.userMove
+    assert restored.snapshot() == game.snapshot()
+
+    histories = []
+    restored.resetGame = lambda: histories.append(restored.move_history)
+    restored.terminalGame(resume=True)
+    assert "Enter the number of players" not in output.getvalue()
+    # Player 1 was to move and played space 9, then the greedy bot blocked the column and player 1 exited
+    assert histories[0][:4] == [(1, 1), (0, 0), (0, 1), (2, 2)] and histories[0][4] == (2, 1)
+
+    game.player_1_move = lambda player_icon: (0, 0)
+    with pytest.raises(ValueError):
+        game.snapshot()
+
+
+def test_terminal_bot_moves_are_instrumented():
+    """Tests that a terminal game whose bots were set up before enableInstrumentation times every bot move, and
+    that its snapshot still names the move functions.
+    """
+    game = TicTacToe.TicTacTerminal(output=io.StringIO(), rng=random.Random(3))
+    game.player_0_move, game.player_1_move = game.botMove, game.greedyBotMove
+    stats = game.enableInstrumentation()
+    restored = TicTacToe.TicTacTerminal.fromSnapshot(game.snapshot())
+    assert (restored.player_0_move, restored.player_1_move) == (restored.botMove, restored.greedyBotMove)
+
+    histories = []
+    game.resetGame = lambda: histories.append(game.move_history)
+    game.terminalGame(resume=True)
+    # Player 0's moves go through the timed botMove; greedyBotMove is not a timed method
+    assert stats.snapshot()["timings"]["botMove"]["calls"] == (len(histories[0]) + 1) // 2
+    game.disableInstrumentation()
+
+
+def playSeededGame(engine, seed, stats=None):
+    """Plays one bot-against-bot game from a seeded generator, analyzing every position on the way.
+
+    :param engine: the game class to play with.
+    :param seed: the seed for the game's generator.
+    :param stats: a GameStats to record into, if any.
+    :return: the move history, final game state and the analysis of every position.
+    """
+    game = engine(rng=random.Random(seed))
+    if stats is not None:
+        game.enableInstrumentation(stats)
+    bots = {game.PLAYER_0: game.heuristicBotMove, game.PLAYER_1: game.botMove}
+    player = game.PLAYER_0
+    analyses = []
+    while game.game_state == game.GAME_IN_PROGRESS:
+        analyses.append(game.analyzePosition(player))
+        row, col = bots[player](player)
+        game.updateBoard(row, col, player)
+        player = -player
+    return game.move_history, game.game_state, analyses
+
+
+def test_seeded_rng_replays_bot_moves():
+    """Tests that games given generators with the same seed make the same bot moves on both engines and on
+    larger boards, that a new generator can be set on a game, and that the bots leave the random module alone.
+    """
+    random.seed(1)
+    module_state = random.getstate()
+    histories = {seed: [playSeededGame(TicTacToe.TicTacToe, seed)[0] for _ in range(0, 2)] for seed in range(0, 20)}
+    assert random.getstate() == module_state
+    for first, second in histories.values():
+        assert first == second
+    assert len({tuple(first) for first, _ in histories.values()}) > 1
+    assert playSeededGame(TicTacToe.TicTacBitboard, 3)[0] == histories[3][0]
+
+    game = TicTacToe.TicTacToe(7, 7, 4)
+    assert game.rng is game.rng
+    moves = []
+    for _ in range(0, 2):
+        game.resetGame()
+        game.rng = random.Random(9)
+        player = game.PLAYER_0
+        for _ in range(0, 6):
+            row, col = game.greedyBotMove(player)
+            game.updateBoard(row, col, player)
+            player = -player
+        moves.append(game.move_history)
+    assert moves[0] == moves[1]
+
+
+def test_games_in_threads_match_sequential_play():
+    """Tests that games played at once from a thread pool, each with its own generator but sharing the analysis
+    cache and one GameStats, end exactly as when they are played one by one, with no updates lost from the stats.
+    """
+    seeds = range(0, 64)
+    sequential = [playSeededGame(TicTacToe.TicTacBitboard, seed) for seed in seeds]
+    TicTacToe.TicTacToe._analysis_cache.clear()
+
+    stats = TicTacToe.GameStats()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        threaded = list(pool.map(lambda seed: playSeededGame(TicTacToe.TicTacBitboard, seed, stats), seeds))
+    assert threaded == sequential
+
+    snapshot = stats.snapshot()
+    num_moves = sum(len(history) for history, _, _ in sequential)
+    assert snapshot["timings"]["updateBoard"]["calls"] >= num_moves
+    assert snapshot["counters"]["analyzePosition.cache_hit"] + snapshot["counters"]["analyzePosition.cache_miss"] == num_moves
+
+
+def test_bitboard_board_is_read_only_and_counts_filled_spaces():
+    """Tests that changing a space of the bitboard's generated board raises instead of being lost, that whole
+    boards can still be assigned and copies changed, and that filled_spaces follows moves, undos and assigned
+    boards as on the list engine.
+    """
+    game = TicTacToe.TicTacBitboard()
+    reference = TicTacToe.TicTacToe()
+    for row, col, player in ((1, 1, game.PLAYER_0), (0, 0, game.PLAYER_1), (2, 2, game.BLANK_POS), (1, 1, game.PLAYER_1)):
+        game.updateBoard(row, col, player)
+        reference.updateBoard(row, col, player)
+        assert game.filled_spaces == reference.filled_spaces
+    assert game.filled_spaces == 2
+    game.undoMove()
+    reference.undoMove()
+    assert game.filled_spaces == reference.filled_spaces == 2
+
+    with pytest.raises(TypeError):
+        game.board[2][2] = game.PLAYER_1
+    with pytest.raises(TypeError):
+        game.board[2] = [game.PLAYER_1] * 3
+    assert game.board == reference.board and game.board[2][2] == game.BLANK_POS
+    assert game.board is game.board
+
+    board = [board_row[:] for board_row in game.board]
+    board[2][2] = game.PLAYER_1
+    game.board = board
+    assert game.board[2][2] == game.PLAYER_1 and game.filled_spaces == 3
+    game.resetGame()
+    assert game.filled_spaces == 0 and game.board == game.emptyBoard()
+
+
+def test_bitboard_board_setter_checks_the_new_board():
+    """Tests that assigning a won, drawn or open board to the bitboard engine gives the same game state, filled
+    spaces and hash as the list engine after checkBoard, and that moves made before cannot be undone.
+    """
+    boards = (
+        [[1, 1, 1], [-1, -1, 0], [0, 0, 0]],
+        [[-1, 1, -1], [-1, 1, 1], [1, -1, -1]],
+        [[0, 0, 0], [0, -1, 0], [0, 0, 1]]
+    )
+    states = (TicTacToe.TicTacToe.PLAYER_1_WINNER, TicTacToe.TicTacToe.DRAW_GAME, TicTacToe.TicTacToe.GAME_IN_PROGRESS)
+    for board, state in zip(boards, states):
+        game = TicTacToe.TicTacBitboard()
+        game.updateBoard(0, 0, game.PLAYER_0)
+        game.board = board
+        reference = TicTacToe.TicTacToe()
+        reference.board = [board_row[:] for board_row in board]
+        reference.checkBoard()
+        assert game.game_state == reference.game_state == state
+        assert game.filled_spaces == reference.filled_spaces
+        assert game.positionHash() == reference.positionHash()
+        with pytest.raises(RuntimeError):
+            game.undoMove()
@@ -0,0 +1,92 @@
+"""Contains tests for the TicTacVerify.py module.
+    - test_botChoices_enumerates_random_choices: Tests that every move the bot could pick at random is found.
+    - test_botMove_never_loses: Tests that the perfect-play bot never loses or moves illegally, in and across processes.
+    - test_verification_finds_losses_of_weaker_bots: Tests that the harness reports the lost games of a weaker bot.
+    - test_history_bots_explore_every_move_order: Tests that bots that read the move history are explored for every
+        move order reaching a position, not just the first.
+"""
+
+import random
+import TicTacToe
+from TicTacSolver import PerfectPlayTable
+from TicTacVerify import HISTORY_BOTS, botChoices, main, verifyBot, verifyOpening
+
+
+def test_botChoices_enumerates_random_choices():
+    """Tests that the moves found for botMove are exactly the perfect-play table's best moves,
+    and that the game's rng is restored afterwards.
+    """
+    game = TicTacToe.TicTacToe(rng=random.Random(0))
+    real_rng = game.rng
+    assert len(botChoices(game, "botMove", game.PLAYER_0)) == 9
+    game.updateBoard(0, 0, game.PLAYER_0)
+    best_moves = PerfectPlayTable.shared().bestMoves(game.positionIndex(), 1)
+    assert botChoices(game, "botMove", game.PLAYER_1) == {divmod(space, 3) for space in range(0, 9) if best_moves >> space & 1}
+    assert game.rng is real_rng
+
+
+def test_botMove_never_loses():
+    """Tests that every game botMove could play, from both sides, ends in a win or a draw for the bot,
+    and that spreading the openings over worker processes explores the same positions.
+    """
+    results = verifyBot("botMove", workers=1)
+    assert results["num_lost"] == 0 and results["num_illegal"] == 0
+    assert results["positions"] == 3051
+    assert verifyBot("botMove", workers=2)["positions"] == results["positions"]
+
+
+def test_verification_finds_losses_of_weaker_bots(capsys):
+    """Tests that the harness finds games the greedy bot loses, each of which really is a loss for the bot.
+
+    :param capsys: PyTest fixture capturing printed output
+    """
+    results = verifyBot("greedyBotMove", workers=1)
+    assert results["num_lost"] > 0
+    for moves in results["lost"]:
+        game = TicTacToe.TicTacToe()
+        player = game.PLAYER_0
+        for row, col in moves:
+            game.updateBoard(row, col, player)
+            player = -player
+        assert game.game_state in (game.PLAYER_0_WINNER, game.PLAYER_1_WINNER)
+
+    assert main(["--bot", "greedyBotMove", "--workers", "1"]) == 1
+    assert "games lost" in capsys.readouterr().out
+
+
+def test_history_bots_explore_every_move_order():
+    """Tests that heuristicBotMove picks differently in one position reached by two move orders, and that its
+    verification searches every move history where a position-only memo would have cut the second order off.
+    """
+    moves = {}
+    for history in (((0, 0), (0, 2), (0, 1)), ((0, 1), (0, 2), (0, 0))):
+        game = TicTacToe.TicTacToe()
+        player = game.PLAYER_0
+        for row, col in history:
+            game.updateBoard(row, col, player)
+            player = -player
+        moves[history] = botChoices(game, "heuristicBotMove", game.PLAYER_1)
+    first, second = moves.values()
+    assert first != second
+
+    assert "heuristicBotMove" in HISTORY_BOTS and "botMove" not in HISTORY_BOTS
+    # Every game the bot can play after the opening, counted without any memo
+    game = TicTacToe.TicTacToe()
+    game.updateBoard(0, 0, game.PLAYER_0)
+
+    def countNodes(player_value):
+        if game.game_state != game.GAME_IN_PROGRESS:
+            return 1
+        if player_value == game.PLAYER_1:
+            moves = botChoices(game, "heuristicBotMove", player_value)
+        else:
+            moves = game.legalMoves()
+        nodes = 1
+        for row, col in moves:
+            game.updateBoard(row, col, player_value)
+            nodes += countNodes(-player_value)
+            game.undoMove()
+        return nodes
+
+    results = verifyOpening(("heuristicBotMove", game.PLAYER_1, ((0, 0),)))
+    assert results["nodes"] == countNodes(game.PLAYER_1)
@@ -0,0 +1,25 @@
+"""Contains tests for the main.py launcher.
+    - test_launcher_imports_games_lazily: Tests that starting the launcher does not import any game.
+    - test_load_game_reuses_instance: Tests that a picked game is loaded once and reused.
+"""
+
+import subprocess
+import sys
+import main
+
+
+def test_launcher_imports_games_lazily():
+    """Tests that importing the launcher and printing its menu does not import any game module."""
+    code = "import sys, main; main.printMenu(); print('TicTacToe' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines()[-1] == "False"
+    assert "1: Tic-Tac-Toe" in result.stdout
+
+
+def test_load_game_reuses_instance():
+    """Tests that loading a game builds its terminal interface once and returns the same one afterwards."""
+    main.loaded_games.clear()
+    game = main.loadGame(0)
+    assert type(game).__name__ == "TicTacTerminal"
+    assert main.loadGame(0) is game
+    main.loaded_games.clear()